@@ -37,6 +37,10 @@ with app.app_context():
     from routes import register_routes
     register_routes(app)
 
+    # Register command-line tools (flask <command>)
+    from commands import register_commands
+    register_commands(app)
+
     db.create_all()
 
 logger.info("PostgreSQL Agent initialized successfully")
@@ -0,0 +1,115 @@
+"""
+Benchmark error categorisation: ERROR_MATCHER versus the per-pattern loop
+
+Also times a single alternation of all patterns, which CPython's re
+engine tries at every position of the text and which is therefore slower
+than the literal prefilter the matcher uses.
+
+Error texts are generated by padding realistic server messages with log
+noise up to the requested sizes, with the matching line placed near the end.
+
+Usage:
+    python -m benchmarks.bench_errors [--sizes 1024 4096 16384] [--repeat N]
+"""
+import re
+import time
+import random
+import argparse
+
+from config import ERROR_PATTERNS
+from services.error_service import ERROR_MATCHER
+
+MESSAGES = [
+    'ERROR:  relation "public.orders" does not exist',
+    'FATAL:  password authentication failed for user "app"',
+    'ERROR:  duplicate key value violates unique constraint "users_pkey"',
+    'ERROR:  insert or update on table "items" violates foreign key constraint "items_order_fk"',
+    'ERROR:  could not extend file "base/16384/24576": No space left on device',
+    'ERROR:  syntax error at or near "FORM"',
+    'ERROR:  canceling statement due to statement timeout',
+]
+
+NOISE = [
+    'LOG:  checkpoint starting: time',
+    'LOG:  automatic vacuum of table "app.public.events": index scans: 1',
+    'DETAIL:  Key (id)=(42) is referenced from table "line_items".',
+    'STATEMENT:  SELECT o.id, o.total FROM orders o JOIN customers c ON c.id = o.customer_id WHERE o.status = $1',
+    'HINT:  Check the logs for more details on the background worker.',
+]
+
+def legacy_error_type(error_text):
+    """
+    Previous implementation: one re.search per pattern, stopping at the first category
+    """
+    for err_type, patterns in ERROR_PATTERNS.items():
+        for pattern in patterns:
+            if re.search(pattern, error_text, re.IGNORECASE):
+                return err_type
+    return None
+
+def legacy_all_types(error_text):
+    """
+    The per-pattern loop extended to report every category, for a like-for-like comparison
+    """
+    return [
+        err_type for err_type, patterns in ERROR_PATTERNS.items()
+        if any(re.search(pattern, error_text, re.IGNORECASE) for pattern in patterns)
+    ]
+
+# All patterns in one alternation with a named group each
+ALTERNATION_RE = re.compile(
+    '|'.join(
+        f"(?P<p{index}>{pattern})"
+        for index, pattern in enumerate(pattern for patterns in ERROR_PATTERNS.values() for pattern in patterns)
+    ),
+    re.IGNORECASE
+)
+
+def alternation_all_types(error_text):
+    return [match.lastgroup for match in ALTERNATION_RE.finditer(error_text)]
+
+def make_text(size, message, rng):
+    lines = []
+    while sum(len(line) + 1 for line in lines) < size:
+        lines.append(rng.choice(NOISE))
+    lines.insert(max(0, len(lines) - 2), message)
+    return '\n'.join(lines)
+
+def time_calls(func, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    return (time.perf_counter() - start) * 1e6 / (repeat * len(texts))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1024, 4096, 16384])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+
+    for size in args.sizes:
+        texts = [make_text(size, message, rng) for message in MESSAGES]
+
+        # The matcher must agree with the loop on the reported error type and categories
+        mismatches = sum(
+            legacy_error_type(text) != ERROR_MATCHER.first(text)
+            or legacy_all_types(text) != list(ERROR_MATCHER.match(text))
+            for text in texts
+        )
+
+        legacy_first = time_calls(legacy_error_type, texts, args.repeat)
+        legacy_all = time_calls(legacy_all_types, texts, args.repeat)
+        alternation = time_calls(alternation_all_types, texts, args.repeat)
+        matcher = time_calls(ERROR_MATCHER.match, texts, args.repeat)
+
+        print(f"{size / 1024:.0f} KiB texts ({len(texts)} messages, {mismatches} mismatches)")
+        print(f"  loop, first category   {legacy_first:9.1f} us/text")
+        print(f"  loop, all categories   {legacy_all:9.1f} us/text")
+        print(f"  single alternation     {alternation:9.1f} us/text")
+        print(f"  matcher, all           {matcher:9.1f} us/text  ({legacy_all / matcher:.1f}x vs loop, all)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark extract_content against the previous descendants-based extractor
+
+Reports wall time and memory allocated per call on large reference pages.
+
+Usage:
+    python -m benchmarks.bench_extract [--source DIR] [--repeat N] [pages ...]
+"""
+import os
+import re
+import time
+import argparse
+import statistics
+import tracemalloc
+from bs4 import BeautifulSoup
+
+from config import DOC_MIRROR_DIR, POSTGRESQL_DOC_BASE_URL
+from utils.doc_parser import fetch_doc_page, extract_content
+
+DEFAULT_PAGES = [
+    "sql-createtable.html",
+    "functions-json.html",
+]
+
+def legacy_extract_content(element):
+    """
+    Previous implementation: visits every descendant and calls get_text()
+    on each formatted element, re-walking nested subtrees
+    """
+    if not element:
+        return ""
+
+    content_parts = []
+
+    for child in element.descendants:
+        if child.name == 'h1':
+            content_parts.append(f"\n\n== {child.get_text(strip=True)} ==\n\n")
+        elif child.name == 'h2':
+            content_parts.append(f"\n\n-- {child.get_text(strip=True)} --\n\n")
+        elif child.name == 'h3':
+            content_parts.append(f"\n\n* {child.get_text(strip=True)} *\n\n")
+        elif child.name == 'p':
+            content_parts.append(f"{child.get_text(strip=True)}\n\n")
+        elif child.name == 'pre' or child.name == 'code':
+            content_parts.append(f"\n```\n{child.get_text()}\n```\n")
+        elif child.name == 'li':
+            content_parts.append(f"  * {child.get_text(strip=True)}\n")
+        elif child.name == 'a' and child.has_attr('href'):
+            text = child.get_text(strip=True)
+            href = child.get('href')
+            content_parts.append(f"{text} [{href}]")
+        elif child.name is None and child.strip():
+            content_parts.append(child.strip())
+
+    content = "".join(content_parts)
+    content = re.sub(r'\n{3,}', '\n\n', content)
+
+    return content
+
+def load_page(page, source):
+    if source:
+        with open(os.path.join(source, page), encoding='utf-8') as f:
+            return f.read()
+    return fetch_doc_page(f"{POSTGRESQL_DOC_BASE_URL}{page}")
+
+def measure(func, element, repeat):
+    """
+    Time and trace allocations of an extractor
+
+    Returns:
+        tuple: (median ms, KiB allocated per call, output length)
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func(element)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    func(element)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(timings), peak / 1024, len(output)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', default=DOC_MIRROR_DIR if os.path.isdir(DOC_MIRROR_DIR) else None,
+                        help='Documentation snapshot directory (defaults to fetching from postgresql.org)')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('pages', nargs='*')
+    args = parser.parse_args()
+
+    for page in args.pages or DEFAULT_PAGES:
+        html_content = load_page(page, args.source)
+        if not html_content:
+            print(f"{page}: could not be loaded")
+            continue
+
+        soup = BeautifulSoup(html_content, 'html.parser')
+        element = soup.find('div', class_='sect1') or soup.find('div', class_='chapter') or soup.find('body')
+
+        print(f"{page} ({len(html_content) / 1024:.0f} KiB HTML)")
+        for label, func in (('legacy', legacy_extract_content), ('single-pass', extract_content)):
+            ms, kib, length = measure(func, element, args.repeat)
+            print(f"  {label:<12} {ms:9.2f} ms  peak alloc {kib:9.1f} KiB  output {length:>8} chars")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark partial parsing per call site
+
+For every call site, compares a full 'html.parser' parse (the previous
+behaviour) with the parser and SoupStrainer the call site now uses.
+
+Usage:
+    python -m benchmarks.bench_parse [--source DIR] [--repeat N]
+"""
+import os
+import time
+import argparse
+import statistics
+from bs4 import BeautifulSoup
+
+from config import DOC_MIRROR_DIR, POSTGRESQL_DOC_BASE_URL
+from utils.doc_parser import fetch_doc_page
+from utils.html_parser import (
+    HTML_PARSER, parse_html,
+    CONTENT_STRAINER, TOC_STRAINER, PRE_STRAINER, LINK_STRAINER
+)
+
+# Call site -> (page it parses, strainer it uses)
+CALL_SITES = {
+    'get_doc_content': ('sql-createtable.html', CONTENT_STRAINER),
+    'get_doc_sections': ('index.html', TOC_STRAINER),
+    'extract_code_examples': ('functions-json.html', PRE_STRAINER),
+    'find_related_docs': ('sql-select.html', LINK_STRAINER),
+}
+
+def load_page(page, source):
+    if source:
+        with open(os.path.join(source, page), encoding='utf-8') as f:
+            return f.read()
+    return fetch_doc_page(f"{POSTGRESQL_DOC_BASE_URL}{page}")
+
+def median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', default=DOC_MIRROR_DIR if os.path.isdir(DOC_MIRROR_DIR) else None,
+                        help='Documentation snapshot directory (defaults to fetching from postgresql.org)')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"parser: {HTML_PARSER}")
+    for site, (page, strainer) in CALL_SITES.items():
+        html_content = load_page(page, args.source)
+        if not html_content:
+            print(f"{site:<22} {page}: could not be loaded")
+            continue
+
+        full = median_ms(lambda: BeautifulSoup(html_content, 'html.parser'), args.repeat)
+        partial = median_ms(lambda: parse_html(html_content, only=strainer), args.repeat)
+        print(f"{site:<22} {page:<26} full {full:8.2f} ms  partial {partial:8.2f} ms  "
+              f"saved {100 * (1 - partial / full):5.1f}%")
+
+if __name__ == '__main__':
+    main()
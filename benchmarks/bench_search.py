@@ -0,0 +1,79 @@
+"""
+Benchmark documentation search: local BM25 index versus postgresql.org search
+
+Usage:
+    python -m benchmarks.bench_search [--index PATH] [--source DIR] [--live]
+"""
+import time
+import argparse
+import statistics
+
+from config import DOC_INDEX_PATH
+from utils.doc_index import DocIndex, iter_snapshot_pages
+from services.documentation_service import search_online_documentation
+
+DEFAULT_QUERIES = [
+    "create table",
+    "data types",
+    "indexing",
+    "join syntax",
+    "error codes",
+    "vacuum",
+    "jsonb operators",
+    "window functions",
+    "foreign key constraint",
+    "pg_stat_activity",
+]
+
+def time_calls(func, queries, repeat):
+    """
+    Time each query against a search function
+
+    Args:
+        func (callable): Search function taking a query string
+        queries (list): Queries to run
+        repeat (int): Number of passes over the queries
+
+    Returns:
+        list: Elapsed milliseconds per call
+    """
+    timings = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            func(query)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def report(label, timings):
+    timings = sorted(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{label:<8} calls={len(timings):<6} mean={statistics.mean(timings):9.3f} ms  "
+          f"p50={statistics.median(timings):9.3f} ms  p99={p99:9.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--index', default=DOC_INDEX_PATH, help='Prebuilt index file')
+    parser.add_argument('--source', help='Build the index in memory from this snapshot directory instead')
+    parser.add_argument('--repeat', type=int, default=100, help='Passes over the query set for the local index')
+    parser.add_argument('--live', action='store_true', help='Also time the postgresql.org search path (needs network)')
+    parser.add_argument('queries', nargs='*', help='Queries to run (defaults to a built-in set)')
+    args = parser.parse_args()
+
+    queries = args.queries or DEFAULT_QUERIES
+
+    start = time.perf_counter()
+    if args.source:
+        index = DocIndex.build(iter_snapshot_pages(args.source))
+        print(f"Built index of {len(index)} pages in {time.perf_counter() - start:.2f} s")
+    else:
+        index = DocIndex.load(args.index)
+        print(f"Loaded index of {len(index)} pages in {time.perf_counter() - start:.2f} s")
+
+    report('local', time_calls(index.search, queries, args.repeat))
+
+    if args.live:
+        report('live', time_calls(search_online_documentation, queries, 1))
+
+if __name__ == '__main__':
+    main()
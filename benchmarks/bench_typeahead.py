@@ -0,0 +1,94 @@
+"""
+Benchmark typeahead suggestions: p99 latency of prefix lookups per keystroke
+
+Every prefix of each query is looked up, as typed one character at a time,
+and the misspelt queries exercise the fuzzy fallback. The target is a p99
+below 1 ms.
+
+Usage:
+    python -m benchmarks.bench_typeahead [--index PATH | --source DIR] [--repeat N] [queries ...]
+"""
+import os
+import time
+import argparse
+import statistics
+
+from config import TYPEAHEAD_INDEX_PATH
+from utils.doc_index import iter_snapshot_pages
+from utils.typeahead import TypeaheadIndex
+
+TARGET_P99_MS = 1.0
+
+DEFAULT_QUERIES = [
+    "create index",
+    "alter table",
+    "set role",
+    "jsonb_path_query",
+    "array_agg",
+    "shared_buffers",
+    "work_mem",
+    "window functions",
+    "vacuum",
+    "pg_stat_activity",
+]
+
+# Misspellings that only the fuzzy matcher can answer
+FUZZY_QUERIES = [
+    "creat indx",
+    "jsonb_pth_query",
+    "shared_bufers",
+    "vacum",
+]
+
+def keystrokes(queries):
+    """
+    Expand queries into every prefix a user types on the way
+    """
+    return [query[:length] for query in queries for length in range(1, len(query) + 1)]
+
+def time_calls(func, queries, repeat):
+    """
+    Time each query against a suggestion function
+
+    Returns:
+        list: Elapsed milliseconds per call
+    """
+    timings = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            func(query)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def report(label, timings):
+    timings = sorted(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    verdict = 'ok' if p99 < TARGET_P99_MS else f'over the {TARGET_P99_MS:g} ms target'
+    print(f"{label:<8} calls={len(timings):<6} mean={statistics.mean(timings):8.4f} ms  "
+          f"p50={statistics.median(timings):8.4f} ms  p99={p99:8.4f} ms  ({verdict})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--index', default=TYPEAHEAD_INDEX_PATH, help='Prebuilt index file')
+    parser.add_argument('--source', help='Build the index in memory from this snapshot directory instead')
+    parser.add_argument('--repeat', type=int, default=50, help='Passes over the keystrokes')
+    parser.add_argument('queries', nargs='*', help='Queries to type (defaults to a built-in set)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.source:
+        index = TypeaheadIndex.build(iter_snapshot_pages(args.source))
+        print(f"Built index of {len(index)} entries in {time.perf_counter() - start:.2f} s")
+    elif os.path.exists(args.index):
+        index = TypeaheadIndex.load(args.index)
+        print(f"Loaded index of {len(index)} entries in {time.perf_counter() - start:.2f} s")
+    else:
+        index = TypeaheadIndex.default()
+        print(f"No index at {args.index}; using the built-in SQL commands ({len(index)} entries)")
+
+    report('prefix', time_calls(index.suggest, keystrokes(args.queries or DEFAULT_QUERIES), args.repeat))
+    report('fuzzy', time_calls(index.suggest, FUZZY_QUERIES, args.repeat))
+
+if __name__ == '__main__':
+    main()
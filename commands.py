@@ -0,0 +1,212 @@
+import os
+import json
+import logging
+import click
+
+from config import (
+    DOC_MIRROR_DIR, DOC_INDEX_PATH, DOC_GRAPH_PATH, DOC_TOC_PATH, EXAMPLE_INDEX_PATH, TYPEAHEAD_INDEX_PATH,
+    DOC_STORE_PATH, DOC_VERSIONS, POSTGRESQL_DOC_BASE_URL
+)
+from utils.doc_versions import DEFAULT_DOC_VERSION, normalize_doc_version, doc_base_url, doc_mirror_dir, versioned_path
+
+logger = logging.getLogger(__name__)
+
+def _doc_version(version):
+    try:
+        return normalize_doc_version(version)
+    except ValueError as e:
+        raise click.ClickException(f"{str(e)} (configured: {', '.join(DOC_VERSIONS)})")
+
+def register_commands(app):
+    @app.cli.command('build-doc-index')
+    @click.option('--version', default=DEFAULT_DOC_VERSION, show_default=True,
+                  help='Documentation version to index, e.g. 16.')
+    @click.option('--source', default=None,
+                  help='Directory containing a snapshot of the documentation HTML pages '
+                       '(defaults to the mirror directory of the version).')
+    @click.option('--output', default=None,
+                  help='Where to write the search index (defaults to the index path of the version).')
+    @click.option('--base-url', default=None,
+                  help='URL the snapshot pages are served from (defaults to the URL of the version).')
+    def build_doc_index_command(version, source, output, base_url):
+        """Build the offline documentation search index."""
+        from utils.doc_index import build_doc_index
+
+        version = _doc_version(version)
+        output = output or versioned_path(DOC_INDEX_PATH, version)
+        index = build_doc_index(
+            source or doc_mirror_dir(version),
+            output_path=output,
+            base_url=base_url or doc_base_url(version)
+        )
+        click.echo(f"Indexed {len(index)} pages ({len(index.postings)} terms) into {output}")
+
+    @app.cli.command('build-doc-store')
+    @click.option('--version', 'versions', multiple=True,
+                  help='Documentation version to import; repeatable. Defaults to every version with a mirror.')
+    @click.option('--mirror-dir', default=DOC_MIRROR_DIR, show_default=True,
+                  help='Mirror directory; versions other than current are read from subdirectories.')
+    @click.option('--output', default=DOC_STORE_PATH, show_default=True,
+                  help='Documentation store database.')
+    def build_doc_store_command(versions, mirror_dir, output):
+        """Import extracted pages of each documentation version into the deduplicated store."""
+        from utils.doc_store import DocStore, build_doc_store
+
+        if not output:
+            raise click.ClickException('The documentation store is disabled (DOC_STORE_PATH is empty)')
+
+        explicit = bool(versions)
+        versions = [_doc_version(version) for version in versions] or [DEFAULT_DOC_VERSION] + DOC_VERSIONS
+
+        store = DocStore(output)
+        for version in versions:
+            source = doc_mirror_dir(version, mirror_dir)
+            if not os.path.isdir(source):
+                if explicit:
+                    raise click.ClickException(f"No mirror of version {version} at {source}")
+                continue
+
+            count = build_doc_store(source, version, store)
+            click.echo(f"Stored {count} pages of version {version}")
+
+        stats = store.stats()
+        click.echo(f"{stats['pages']} pages, {stats['paragraphs']} distinct paragraphs, "
+                   f"{stats['stored_bytes']} of {stats['logical_bytes']} bytes stored (x{stats['dedup_ratio']})")
+
+    @app.cli.command('build-doc-graph')
+    @click.option('--source', default=DOC_MIRROR_DIR, show_default=True,
+                  help='Directory containing a snapshot of the documentation HTML pages.')
+    @click.option('--output', default=DOC_GRAPH_PATH, show_default=True,
+                  help='Where to write the link graph.')
+    @click.option('--base-url', default=POSTGRESQL_DOC_BASE_URL, show_default=True,
+                  help='URL the snapshot pages are served from.')
+    def build_doc_graph_command(source, output, base_url):
+        """Build the documentation link graph used for ranking and related pages."""
+        from utils.doc_graph import build_doc_graph
+
+        graph = build_doc_graph(source, output_path=output, base_url=base_url)
+        click.echo(f"Linked {len(graph)} pages ({graph.edge_count} links) into {output}")
+
+    @app.cli.command('build-typeahead-index')
+    @click.option('--source', default=DOC_MIRROR_DIR, show_default=True,
+                  help='Directory containing a snapshot of the documentation HTML pages.')
+    @click.option('--output', default=TYPEAHEAD_INDEX_PATH, show_default=True,
+                  help='Where to write the typeahead index.')
+    @click.option('--base-url', default=POSTGRESQL_DOC_BASE_URL, show_default=True,
+                  help='URL the snapshot pages are served from.')
+    def build_typeahead_index_command(source, output, base_url):
+        """Build the search-box suggestions from page titles, commands, functions and settings."""
+        from utils.typeahead import build_typeahead_index
+
+        index = build_typeahead_index(source, output_path=output, base_url=base_url)
+        click.echo(f"Indexed {len(index)} suggestions into {output}")
+
+    @app.cli.command('build-example-index')
+    @click.option('--source', default=DOC_MIRROR_DIR, show_default=True,
+                  help='Directory containing a snapshot of the documentation HTML pages.')
+    @click.option('--output', default=EXAMPLE_INDEX_PATH, show_default=True,
+                  help='Where to write the example index.')
+    @click.option('--base-url', default=POSTGRESQL_DOC_BASE_URL, show_default=True,
+                  help='URL the snapshot pages are served from.')
+    def build_example_index_command(source, output, base_url):
+        """Build the index of SQL examples from the documentation."""
+        from utils.example_index import build_example_index
+
+        index = build_example_index(source, output_path=output, base_url=base_url)
+        click.echo(f"Indexed {len(index)} examples of {len(index.by_command)} commands into {output}")
+
+    @app.cli.command('build-doc-toc')
+    @click.option('--source', default=None,
+                  help='Snapshot directory to read index.html from instead of postgresql.org.')
+    @click.option('--output', default=DOC_TOC_PATH, show_default=True,
+                  help='Where to write the prebuilt table of contents.')
+    def build_doc_toc_command(source, output):
+        """Prebuild the documentation table of contents."""
+        from utils.doc_parser import fetch_doc_page
+        from utils.doc_toc import parse_doc_sections, save_doc_sections
+
+        if source:
+            with open(os.path.join(source, 'index.html'), encoding='utf-8') as f:
+                html_content = f.read()
+        else:
+            html_content = fetch_doc_page(f"{POSTGRESQL_DOC_BASE_URL}index.html")
+
+        sections = parse_doc_sections(html_content) if html_content else None
+        if not sections:
+            raise click.ClickException('No table of contents found in the documentation index page')
+
+        save_doc_sections(sections, output)
+        click.echo(f"Wrote {len(sections)} sections to {output}")
+
+    @app.cli.command('crawl-docs')
+    @click.option('--version', default=DEFAULT_DOC_VERSION, show_default=True,
+                  help='Documentation version to crawl, e.g. 16.')
+    @click.option('--start-url', default=None,
+                  help='Page to start from; only pages under its directory are crawled '
+                       '(defaults to the index page of the version).')
+    @click.option('--mirror-dir', default=None,
+                  help='Directory the crawled pages are written to (defaults to the mirror directory of the version).')
+    @click.option('--source', default=None,
+                  help='Read pages from this local mirror directory instead of the network.')
+    @click.option('--workers', default=8, show_default=True, help='Concurrent fetches.')
+    @click.option('--parse-workers', default=None, type=int, help='Parser processes (defaults to the CPU count).')
+    @click.option('--full', is_flag=True, help='Refetch and reparse every page instead of only changed ones.')
+    @click.option('--max-pages', default=None, type=int, help='Stop after this many pages.')
+    def crawl_docs_command(version, start_url, mirror_dir, source, workers, parse_workers, full, max_pages):
+        """Crawl the documentation into the local mirror and cache."""
+        from utils.doc_crawler import crawl_docs
+
+        version = _doc_version(version)
+        try:
+            stats = crawl_docs(
+                start_url=start_url or f"{doc_base_url(version)}index.html",
+                mirror_dir=mirror_dir or doc_mirror_dir(version),
+                source_dir=source,
+                workers=workers,
+                parse_workers=parse_workers,
+                incremental=not full,
+                max_pages=max_pages
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Crawled {stats['fetched']} pages in {stats['elapsed_seconds']} s: "
+                   f"{stats['changed']} changed, {stats['unchanged']} unchanged, {stats['errors']} errors")
+
+    @app.cli.command('analyze-log')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'log_format', type=click.Choice(['stderr', 'csvlog', 'jsonlog']), default=None,
+                  help='Log format (detected from the first lines by default).')
+    @click.option('--log-line-prefix', default=None, help='log_line_prefix of stderr logs (defaults to LOG_LINE_PREFIX).')
+    @click.option('--bucket', type=click.Choice(['minute', 'hour', 'day']), default='hour', show_default=True,
+                  help='Time bucket size of the error timeline.')
+    @click.option('--mode', type=click.Choice(['errors', 'slow-queries']), default='errors', show_default=True,
+                  help='Aggregate errors, or report slow statements and auto_explain plans.')
+    @click.option('--top', default=20, show_default=True, help='Queries per ranking and worst plans (slow queries).')
+    @click.option('--workers', default=None, type=int, help='Worker processes (defaults to the CPU count).')
+    def analyze_log_command(path, log_format, log_line_prefix, bucket, mode, top, workers):
+        """Aggregate the errors or slow queries of a PostgreSQL server log and print them as JSON."""
+        from services.log_service import analyze_log_file, analyze_slow_queries
+
+        options = {'log_line_prefix': log_line_prefix} if log_line_prefix else {}
+        if mode == 'slow-queries':
+            report = analyze_slow_queries(path, log_format=log_format, top=top, workers=workers, **options)
+        else:
+            report = analyze_log_file(path, log_format=log_format, bucket=bucket, workers=workers, **options)
+        click.echo(json.dumps(report, indent=2))
+
+    @app.cli.command('snapshot-schema')
+    @click.argument('connection_string')
+    @click.option('--schema', 'schemas', multiple=True, help='Schema to include (repeatable, defaults to all user schemas).')
+    @click.option('--output', type=click.File('w'), default='-', help='Where to write the JSON snapshot (defaults to stdout).')
+    def snapshot_schema_command(connection_string, schemas, output):
+        """Write every table definition of a database as JSON."""
+        from services.schema_service import create_database_connection, stream_schema_snapshot
+
+        engine = create_database_connection(connection_string)
+        if isinstance(engine, dict) and 'error' in engine:
+            raise click.ClickException(engine['error'])
+
+        for fragment in stream_schema_snapshot(engine, list(schemas) or None):
+            output.write(fragment)
+
+    logger.info("Commands registered successfully")
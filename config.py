@@ -1,8 +1,43 @@
 import os
 
 # PostgreSQL Documentation Resources
-POSTGRESQL_DOC_BASE_URL = "https://www.postgresql.org/docs/current/"
-POSTGRESQL_ERROR_CODES_URL = "https://www.postgresql.org/docs/current/errcodes-appendix.html"
+POSTGRESQL_DOC_ROOT_URL = "https://www.postgresql.org/docs/"
+POSTGRESQL_DOC_BASE_URL = f"{POSTGRESQL_DOC_ROOT_URL}current/"
+POSTGRESQL_SEARCH_URL = "https://www.postgresql.org/search/"
+
+# Major versions whose documentation can be indexed side by side; "current" is always available
+DOC_VERSIONS = [version.strip() for version in os.getenv("DOC_VERSIONS", "13,14,15,16,17").split(",") if version.strip()]
+
+# Local data files (documentation snapshot and prebuilt indexes)
+DATA_DIR = os.getenv("PGAGENT_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance"))
+DOC_MIRROR_DIR = os.getenv("DOC_MIRROR_DIR", os.path.join(DATA_DIR, "docs"))
+DOC_INDEX_PATH = os.getenv("DOC_INDEX_PATH", os.path.join(DATA_DIR, "doc_index.json"))
+DOC_GRAPH_PATH = os.getenv("DOC_GRAPH_PATH", os.path.join(DATA_DIR, "doc_graph.json"))
+DOC_AUTHORITY_WEIGHT = float(os.getenv("DOC_AUTHORITY_WEIGHT", "0.3"))  # how much link authority boosts search scores, 0 disables
+TYPEAHEAD_INDEX_PATH = os.getenv("TYPEAHEAD_INDEX_PATH", os.path.join(DATA_DIR, "typeahead.json"))
+EXAMPLE_INDEX_PATH = os.getenv("EXAMPLE_INDEX_PATH", os.path.join(DATA_DIR, "example_index.json"))
+DOC_STORE_PATH = os.getenv("DOC_STORE_PATH", os.path.join(DATA_DIR, "doc_store.sqlite"))  # extracted pages of every version
+DOC_TOC_PATH = os.getenv("DOC_TOC_PATH", os.path.join(DATA_DIR, "doc_toc.json"))
+DOC_TOC_REFRESH_INTERVAL = int(os.getenv("DOC_TOC_REFRESH_INTERVAL", "21600"))  # seconds, 0 to parse only once
+
+# Persistent documentation page cache, shared by all worker processes on a host.
+# Set DOC_CACHE_PATH to an empty string to disable it.
+DOC_CACHE_PATH = os.getenv("DOC_CACHE_PATH", os.path.join(DATA_DIR, "doc_cache.sqlite"))
+DOC_CACHE_MAX_AGE = int(os.getenv("DOC_CACHE_MAX_AGE", "86400"))  # seconds before revalidation
+
+# In-process documentation page cache (per worker)
+DOC_MEMORY_CACHE_MAX_BYTES = int(os.getenv("DOC_MEMORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+DOC_MEMORY_CACHE_TTL = int(os.getenv("DOC_MEMORY_CACHE_TTL", "3600"))  # seconds
+DOC_MEMORY_CACHE_COMPRESS = os.getenv("DOC_MEMORY_CACHE_COMPRESS", "true").lower() in ("1", "true", "yes")
+DOC_CONTENT_CACHE_MAX_BYTES = int(os.getenv("DOC_CONTENT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # extracted page content
+
+# Outbound HTTP client for postgresql.org
+DOC_HTTP_RATE = float(os.getenv("DOC_HTTP_RATE", "10"))  # sustained requests per second per process
+DOC_HTTP_BURST = int(os.getenv("DOC_HTTP_BURST", "20"))  # requests sent without delay after an idle period
+DOC_HTTP_POOL_SIZE = int(os.getenv("DOC_HTTP_POOL_SIZE", "10"))  # keep-alive connections per host
+DOC_HTTP_TIMEOUT = float(os.getenv("DOC_HTTP_TIMEOUT", "10"))  # seconds
+DOC_HTTP_FAILURE_THRESHOLD = int(os.getenv("DOC_HTTP_FAILURE_THRESHOLD", "5"))  # consecutive failures that open the circuit
+DOC_HTTP_RESET_TIMEOUT = float(os.getenv("DOC_HTTP_RESET_TIMEOUT", "30"))  # seconds before a trial request is let through
 
 # Database Connection
 PG_HOST = os.getenv("PGHOST", "localhost")
@@ -11,6 +46,32 @@ PG_USER = os.getenv("PGUSER", "postgres")
 PG_PASSWORD = os.getenv("PGPASSWORD", "")
 PG_DATABASE = os.getenv("PGDATABASE", "postgres")
 
+# Engines of analyzed databases, shared by all requests of a worker process
+DB_ENGINE_MAX = int(os.getenv("DB_ENGINE_MAX", "8"))  # distinct databases kept connected
+DB_ENGINE_IDLE_TIMEOUT = float(os.getenv("DB_ENGINE_IDLE_TIMEOUT", "600"))  # seconds before an unused engine is disposed
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "2"))  # connections kept open per database
+DB_POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "3"))  # extra connections per database under load
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds before a pooled connection is replaced
+
+# Table analyses, reused while the table's catalog entries are unchanged
+SCHEMA_CACHE_MAX_BYTES = int(os.getenv("SCHEMA_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+SCHEMA_CACHE_TTL = int(os.getenv("SCHEMA_CACHE_TTL", "86400"))  # seconds, 0 to keep until evicted
+
+# Batch error analysis
+ERROR_BATCH_MAX_ITEMS = int(os.getenv("ERROR_BATCH_MAX_ITEMS", "10000"))  # error texts accepted per batch request
+ERROR_BATCH_RECORD_SIZE = int(os.getenv("ERROR_BATCH_RECORD_SIZE", "500"))  # distinct errors recorded per bulk insert
+
+# Server log analysis
+LOG_LINE_PREFIX = os.getenv("LOG_LINE_PREFIX", "%m [%p] ")  # log_line_prefix of analyzed stderr logs
+LOG_CHUNK_BYTES = int(os.getenv("LOG_CHUNK_BYTES", str(32 * 1024 * 1024)))  # log bytes per worker task
+LOG_ANALYSIS_WORKERS = int(os.getenv("LOG_ANALYSIS_WORKERS", "0"))  # worker processes, 0 for the CPU count
+# Directory whose log files the API may analyze by path; empty to accept uploads only
+LOG_ANALYSIS_ROOT = os.getenv("LOG_ANALYSIS_ROOT", "")
+# Largest log the API analyzes inside a request; bigger logs are left to `flask analyze-log`
+LOG_ANALYSIS_MAX_INLINE_BYTES = int(os.getenv("LOG_ANALYSIS_MAX_INLINE_BYTES", str(256 * 1024 * 1024)))
+LOG_ANALYSIS_WEB_WORKERS = int(os.getenv("LOG_ANALYSIS_WEB_WORKERS", "1"))  # worker processes per API request, 0 for LOG_ANALYSIS_WORKERS
+
 # Common PostgreSQL error patterns for detection
 ERROR_PATTERNS = {
     "connection_refused": [
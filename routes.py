@@ -1,12 +1,28 @@
-from flask import render_template, request, jsonify, redirect, url_for, flash
+from flask import render_template, request, jsonify, redirect, url_for, flash, Response, stream_with_context
+from sqlalchemy import insert
 from app import db
 from models import QueryHistory, ErrorReport, DocumentationAccess, Schema
+from config import (
+    ERROR_BATCH_MAX_ITEMS, ERROR_BATCH_RECORD_SIZE, LOG_ANALYSIS_ROOT, LOG_ANALYSIS_MAX_INLINE_BYTES,
+    LOG_ANALYSIS_WEB_WORKERS
+)
+import os
+import json
 import logging
+import tempfile
 
-from services.documentation_service import search_documentation, get_doc_sections
-from services.error_service import analyze_error, get_common_errors
+from services.documentation_service import (
+    search_documentation, get_doc_sections, get_documentation_stats, find_code_examples, get_related_pages,
+    suggest_documentation, get_doc_content, get_doc_versions
+)
+from utils.doc_versions import normalize_doc_version, DEFAULT_DOC_VERSION
+from services.error_service import analyze_error, analyze_errors, get_common_errors
+from services.log_service import analyze_log_file, analyze_slow_queries
 from services.query_service import generate_query, get_query_templates
-from services.schema_service import analyze_schema, get_table_info
+from services.schema_service import (
+    analyze_schema, get_table_info, get_table_stats, get_connection_stats, create_database_connection,
+    stream_schema_snapshot
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,14 +34,23 @@ def register_routes(app):
     @app.route('/documentation', methods=['GET', 'POST'])
     def documentation():
         search_results = []
+        related_pages = []
         search_term = ""
+        version = DEFAULT_DOC_VERSION
         
         if request.method == 'POST':
             search_term = request.form.get('search_term', '')
             logger.debug(f"Documentation search for: {search_term}")
             
+            try:
+                version = normalize_doc_version(request.form.get('version'))
+            except ValueError as e:
+                logger.warning(f"{str(e)}; searching the current documentation")
+            
             if search_term:
-                search_results = search_documentation(search_term)
+                search_results = search_documentation(search_term, version=version)
+                if search_results:
+                    related_pages = get_related_pages(search_results[0]['url'])
                 
                 # Record the search
                 doc_access = DocumentationAccess(
@@ -39,6 +64,9 @@ def register_routes(app):
         return render_template('documentation.html', 
                               search_results=search_results, 
                               search_term=search_term,
+                              related_pages=related_pages,
+                              doc_versions=get_doc_versions(),
+                              version=version,
                               doc_sections=doc_sections)
 
     @app.route('/query_generator', methods=['GET', 'POST'])
@@ -142,7 +170,12 @@ def register_routes(app):
         if not search_term:
             return jsonify({'error': 'Search term is required'}), 400
         
-        results = search_documentation(search_term)
+        try:
+            version = normalize_doc_version(data.get('version'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        results = search_documentation(search_term, version=version)
         
         # Record the search
         doc_access = DocumentationAccess(
@@ -154,6 +187,62 @@ def register_routes(app):
         
         return jsonify({'results': results})
 
+    @app.route('/api/documentation/page', methods=['GET'])
+    def api_documentation_page():
+        doc_path = request.args.get('path', '')
+        
+        if not doc_path:
+            return jsonify({'error': 'Page path is required'}), 400
+        
+        try:
+            version = normalize_doc_version(request.args.get('version'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        page = get_doc_content(doc_path, version=version)
+        page['version'] = version
+        
+        return jsonify(page)
+
+    @app.route('/api/documentation/examples', methods=['POST'])
+    def api_documentation_examples():
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            data = {}
+        query = data.get('query', '')
+        
+        if not query or not isinstance(query, str):
+            return jsonify({'error': 'Query is required'}), 400
+        
+        try:
+            limit = int(data.get('limit', 10))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'limit must be a number'}), 400
+        
+        examples = find_code_examples(query, limit=max(min(limit, 100), 1))
+        
+        return jsonify({'examples': examples})
+
+    @app.route('/api/documentation/suggest', methods=['GET'])
+    def api_documentation_suggest():
+        query = request.args.get('q', '')
+        limit = min(request.args.get('limit', 10, type=int), 50)
+        
+        return jsonify({'suggestions': suggest_documentation(query, limit=limit)})
+
+    @app.route('/api/documentation/related', methods=['GET'])
+    def api_documentation_related():
+        url = request.args.get('url', '')
+        
+        if not url:
+            return jsonify({'error': 'URL is required'}), 400
+        
+        return jsonify({'related': get_related_pages(url)})
+
+    @app.route('/api/documentation/stats', methods=['GET'])
+    def api_documentation_stats():
+        return jsonify(get_documentation_stats())
+
     @app.route('/api/query/generate', methods=['POST'])
     def api_query_generate():
         data = request.get_json()
@@ -206,6 +295,170 @@ def register_routes(app):
         
         return jsonify(analysis)
 
+    @app.route('/api/error/analyze/batch', methods=['POST'])
+    def api_error_analyze_batch():
+        """
+        Analyze many errors in one request
+        
+        The body is a JSON array (of error texts or {"error_text": ...} objects),
+        NDJSON with one such value per line, or text/plain with one raw error
+        text per line. Results are streamed back as NDJSON in input order
+        while the body is read, and the distinct error texts are recorded with
+        a bulk insert every ERROR_BATCH_RECORD_SIZE errors, and for the rest
+        when the stream ends or the client disconnects. Line-based input
+        beyond ERROR_BATCH_MAX_ITEMS lines is ignored.
+        """
+        ndjson = request.mimetype in ('application/x-ndjson', 'application/jsonl')
+        plain_text = request.mimetype == 'text/plain'
+        
+        if ndjson or plain_text:
+            items = (line for line in request.stream if line.strip())
+        else:
+            data = request.get_json(silent=True)
+            if isinstance(data, dict):
+                data = data.get('errors')
+            if not isinstance(data, list):
+                return jsonify({'error': 'Expected a JSON array of error texts or an NDJSON body'}), 400
+            if len(data) > ERROR_BATCH_MAX_ITEMS:
+                return jsonify({'error': f'At most {ERROR_BATCH_MAX_ITEMS} errors per batch'}), 400
+            items = iter(data)
+        
+        def error_texts():
+            for position, item in enumerate(items):
+                if position >= ERROR_BATCH_MAX_ITEMS:
+                    return
+                
+                try:
+                    if plain_text:
+                        item = item.decode('utf-8', errors='replace')
+                    elif ndjson:
+                        item = json.loads(item)
+                    if isinstance(item, dict):
+                        item = item.get('error_text')
+                except ValueError:
+                    item = None
+                
+                yield item if isinstance(item, str) and item.strip() else None
+        
+        def record(reports):
+            # Record distinct errors with one statement; the response is already streaming, so only log failures
+            try:
+                db.session.execute(insert(ErrorReport), reports)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error recording batch error reports: {str(e)}")
+        
+        def generate():
+            reports = []
+            
+            try:
+                for index, error_text, analysis, duplicate_of in analyze_errors(error_texts()):
+                    if error_text is None:
+                        yield json.dumps({'index': index, 'error': 'Error text is required'}) + '\n'
+                        continue
+                    
+                    if duplicate_of is None:
+                        reports.append({'error_text': error_text, 'solution': analysis.get('solution', '')})
+                        if len(reports) >= ERROR_BATCH_RECORD_SIZE:
+                            record(reports)
+                            reports = []
+                    
+                    yield json.dumps(dict(analysis, index=index, duplicate_of=duplicate_of)) + '\n'
+            finally:
+                # Also runs when the client disconnects and the generator is closed mid-stream
+                if reports:
+                    record(reports)
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    @app.route('/api/logs/analyze', methods=['POST'])
+    def api_logs_analyze():
+        """
+        Aggregate the errors or the slow queries of a server log
+        
+        The log is either uploaded as the log_file part of a multipart form
+        or named by path, which must be inside LOG_ANALYSIS_ROOT. Optional
+        fields: mode (errors or slow_queries), format (stderr, csvlog or
+        jsonlog), log_line_prefix, bucket (minute, hour or day, for errors)
+        and top (ranking size, for slow queries).
+        
+        The analysis runs inside the request, so logs larger than
+        LOG_ANALYSIS_MAX_INLINE_BYTES are refused; analyze those with
+        `flask analyze-log`. LOG_ANALYSIS_WEB_WORKERS processes are used.
+        """
+        def too_large():
+            return jsonify({
+                'error': f'Logs over {LOG_ANALYSIS_MAX_INLINE_BYTES // 1048576} MB are not analyzed inline; '
+                         f'use flask analyze-log'
+            }), 413
+        
+        # Refuse oversized uploads before the form is parsed and spooled to disk
+        if request.content_length and request.content_length > LOG_ANALYSIS_MAX_INLINE_BYTES:
+            return too_large()
+        
+        data = request.form if request.files or request.form else (request.get_json(silent=True) or {})
+        mode = data.get('mode') or 'errors'
+        options = {'log_format': data.get('format') or None, 'workers': LOG_ANALYSIS_WEB_WORKERS}
+        if data.get('log_line_prefix'):
+            options['log_line_prefix'] = data.get('log_line_prefix')
+        
+        if mode == 'errors':
+            analyzer = analyze_log_file
+            options['bucket'] = data.get('bucket') or 'hour'
+        elif mode == 'slow_queries':
+            analyzer = analyze_slow_queries
+            try:
+                options['top'] = min(int(data.get('top') or 20), 100)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'top must be a number'}), 400
+        else:
+            return jsonify({'error': 'mode must be errors or slow_queries'}), 400
+        
+        upload = request.files.get('log_file')
+        path = data.get('path', '')
+        
+        if upload is None and not path:
+            return jsonify({'error': 'A log file upload or path is required'}), 400
+        
+        if upload is None:
+            if not LOG_ANALYSIS_ROOT:
+                return jsonify({'error': 'Analyzing logs by path is disabled'}), 403
+            
+            root = os.path.realpath(LOG_ANALYSIS_ROOT)
+            path = os.path.realpath(os.path.join(root, path))
+            if os.path.commonpath([root, path]) != root:
+                return jsonify({'error': 'Path is outside the log directory'}), 403
+            if not os.path.isfile(path):
+                return jsonify({'error': 'Log file not found'}), 404
+            if os.path.getsize(path) > LOG_ANALYSIS_MAX_INLINE_BYTES:
+                return too_large()
+        
+        temporary_path = None
+        try:
+            if upload is not None:
+                # Werkzeug spools large uploads to disk; copy to a named file the workers can map
+                handle, temporary_path = tempfile.mkstemp(prefix='pglog-')
+                with os.fdopen(handle, 'wb') as temporary_file:
+                    upload.save(temporary_file)
+                path = temporary_path
+                
+                # Chunked uploads carry no Content-Length
+                if os.path.getsize(path) > LOG_ANALYSIS_MAX_INLINE_BYTES:
+                    return too_large()
+            
+            summary = analyzer(path, **options)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except OSError as e:
+            logger.error(f"Error analyzing log file: {str(e)}")
+            return jsonify({'error': 'Could not read the log file'}), 500
+        finally:
+            if temporary_path:
+                os.remove(temporary_path)
+        
+        return jsonify(summary)
+
     @app.route('/api/schema/analyze', methods=['POST'])
     def api_schema_analyze():
         data = request.get_json()
@@ -239,6 +492,51 @@ def register_routes(app):
         table_info = get_table_info(connection_string)
         return jsonify({'tables': table_info})
 
+    @app.route('/api/schema/snapshot', methods=['POST'])
+    def api_schema_snapshot():
+        """
+        Reflect every table of a database, streamed as one JSON document
+        
+        Optional "schemas" limits the snapshot to the listed schemas.
+        """
+        data = request.get_json(silent=True) or {}
+        connection_string = data.get('connection_string', '')
+        schemas = data.get('schemas')
+        
+        if not connection_string:
+            return jsonify({'error': 'Connection string is required'}), 400
+        if schemas is not None and not (isinstance(schemas, list) and all(isinstance(schema, str) for schema in schemas)):
+            return jsonify({'error': 'schemas must be a list of schema names'}), 400
+        
+        engine = create_database_connection(connection_string)
+        if isinstance(engine, dict) and 'error' in engine:
+            return jsonify(engine), 400
+        
+        return Response(stream_with_context(stream_schema_snapshot(engine, schemas)), mimetype='application/json')
+
+    @app.route('/api/schema/table-stats', methods=['POST'])
+    def api_schema_table_stats():
+        """
+        Storage and health statistics of one table, or of every table if "table_name" is omitted
+        """
+        data = request.get_json(silent=True) or {}
+        connection_string = data.get('connection_string', '')
+        table_name = data.get('table_name') or None
+        
+        if not connection_string:
+            return jsonify({'error': 'Connection string is required'}), 400
+        
+        stats = get_table_stats(connection_string, table_name)
+        
+        if stats.get('error'):
+            return jsonify(stats), 400
+        
+        return jsonify(stats)
+
+    @app.route('/api/schema/stats', methods=['GET'])
+    def api_schema_stats():
+        return jsonify({'connections': get_connection_stats()})
+
     @app.errorhandler(404)
     def page_not_found(e):
         return render_template('error.html', 
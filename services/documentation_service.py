@@ -1,29 +1,95 @@
 import re
-import requests
+import math
 import logging
 from bs4 import BeautifulSoup
-from config import POSTGRESQL_DOC_BASE_URL, DOCUMENTATION_SECTIONS
-from utils.doc_parser import fetch_doc_page, extract_content
+from config import (
+    POSTGRESQL_DOC_BASE_URL, POSTGRESQL_SEARCH_URL, DOCUMENTATION_SECTIONS,
+    DOC_TOC_PATH, DOC_TOC_REFRESH_INTERVAL, DOC_CONTENT_CACHE_MAX_BYTES, DOC_MEMORY_CACHE_TTL,
+    DOC_AUTHORITY_WEIGHT, DOC_INDEX_PATH, DOC_VERSIONS
+)
+from utils.doc_parser import (
+    fetch_doc_page, extract_doc_page, get_doc_cache_stats, get_doc_page_validator, DOC_FETCHES
+)
+from utils.doc_index import get_doc_index
+from utils.doc_graph import get_doc_graph
+from utils.example_index import get_example_index
+from utils.typeahead import get_typeahead_index
+from utils.doc_toc import DocSections
+from utils.doc_store import get_doc_store
+from utils.doc_versions import DEFAULT_DOC_VERSION, normalize_doc_version, doc_base_url, versioned_path
+from utils.html_parser import get_parse_stats
+from utils.http_client import http_client
+from utils.singleflight import SingleFlight
+from utils.lru_cache import BoundedCache
 
 logger = logging.getLogger(__name__)
 
-def search_documentation(search_term):
+# In-flight online searches, keyed by normalised search term
+SEARCHES = SingleFlight()
+
+# Extracted page content: URL -> (page validator, {'title', 'content'})
+DOC_CONTENT_CACHE = BoundedCache(DOC_CONTENT_CACHE_MAX_BYTES, ttl=DOC_MEMORY_CACHE_TTL)
+
+def _load_doc_index_page():
+    return fetch_doc_page(f"{POSTGRESQL_DOC_BASE_URL}index.html")
+
+# Documentation table of contents, refreshed in the background
+DOC_SECTIONS = DocSections(_load_doc_index_page, DOC_TOC_PATH, DOC_TOC_REFRESH_INTERVAL)
+
+def search_documentation(search_term, version=None):
     """
     Search PostgreSQL documentation for a given term
     
+    Uses the prebuilt local index of the version when available and falls
+    back to the postgresql.org site search otherwise. Local results are
+    re-ranked with the link authority of each page when the link graph has
+    been built.
+    
     Args:
         search_term (str): The term to search for in the documentation
+        version (str, optional): Documentation version such as "16", the current version by default
         
     Returns:
         list: A list of dict containing search results with title, url, and snippet
     """
-    logger.debug(f"Searching documentation for: {search_term}")
+    version = normalize_doc_version(version)
+    logger.debug(f"Searching documentation ({version}) for: {search_term}")
     
-    # Use PostgreSQL's search function via their website
-    search_url = f"https://www.postgresql.org/search/?q={search_term}"
+    doc_index = get_doc_index(versioned_path(DOC_INDEX_PATH, version))
+    if doc_index is not None:
+        doc_graph = get_doc_graph()
+        if doc_graph is None or not DOC_AUTHORITY_WEIGHT:
+            return doc_index.search(search_term, limit=10)
+        
+        # Re-rank a wider candidate set so authoritative pages can move into the top 10.
+        # The graph is built from the current docs; pages keep their file names across versions.
+        base_url = doc_base_url(version)
+        results = doc_index.search(search_term, limit=30)
+        for result in results:
+            authority = doc_graph.authority(result['url'].replace(base_url, POSTGRESQL_DOC_BASE_URL, 1))
+            result['score'] = round(result['score'] * (1 + DOC_AUTHORITY_WEIGHT * math.log1p(authority)), 4)
+        results.sort(key=lambda result: result['score'], reverse=True)
+        return results[:10]
     
+    # Identical concurrent searches share one request to postgresql.org
+    key = f"{version}:{' '.join(search_term.lower().split())}"
+    return SEARCHES.do(key, search_online_documentation, search_term, version)
+
+def search_online_documentation(search_term, version=None):
+    """
+    Search PostgreSQL documentation through the postgresql.org site search
+    
+    Args:
+        search_term (str): The term to search for in the documentation
+        version (str, optional): Documentation version to restrict the search to
+        
+    Returns:
+        list: A list of dict containing search results with title, url, and snippet
+    """
+    # Use PostgreSQL's search function via their website
     try:
-        response = requests.get(search_url)
+        params = {'q': search_term, 'u': f"/docs/{normalize_doc_version(version)}/"}
+        response = http_client.get(POSTGRESQL_SEARCH_URL, params=params)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -60,46 +126,58 @@ def search_documentation(search_term):
         logger.error(f"Error searching documentation: {str(e)}")
         return []
 
-def get_doc_content(doc_path):
+def get_doc_content(doc_path, version=None):
     """
     Get the full content of a specific documentation page
     
+    Pages of pinned versions imported into the documentation store are
+    served from it; others are fetched from postgresql.org. The current
+    version changes upstream, so it is always fetched and revalidated,
+    and the store only stands in when the page cannot be loaded.
+    
     Args:
         doc_path (str): The path to the documentation page
+        version (str, optional): Documentation version such as "16", the current version by default
         
     Returns:
         dict: A dictionary containing the title and content of the documentation
     """
-    logger.debug(f"Getting documentation content for: {doc_path}")
+    logger.debug(f"Getting documentation content for: {doc_path} (version {version or DEFAULT_DOC_VERSION})")
     
     try:
+        version = normalize_doc_version(version)
+        
         # Make sure we have a valid doc path
         if not doc_path.endswith('.html'):
             doc_path = f"{doc_path}.html"
+        
+        doc_store = get_doc_store()
+        if doc_store and version != DEFAULT_DOC_VERSION:
+            stored = doc_store.get_page(version, doc_path)
+            if stored:
+                return stored
             
-        full_url = f"{POSTGRESQL_DOC_BASE_URL}{doc_path}"
+        full_url = f"{doc_base_url(version)}{doc_path}"
         html_content = fetch_doc_page(full_url)
         
         if not html_content:
-            return {'title': 'Not Found', 'content': 'Documentation page could not be loaded.'}
-            
-        soup = BeautifulSoup(html_content, 'html.parser')
+            stored = doc_store.get_page(version, doc_path) if doc_store and version == DEFAULT_DOC_VERSION else None
+            return stored or {'title': 'Not Found', 'content': 'Documentation page could not be loaded.'}
         
-        title_elem = soup.find('title')
-        title = title_elem.get_text() if title_elem else 'PostgreSQL Documentation'
+        # Serve the extracted content if the page has not changed since it was extracted
+        validator = get_doc_page_validator(full_url, html_content)
+        cached = DOC_CONTENT_CACHE.get(full_url)
+        if cached and cached[0] == validator:
+            return dict(cached[1])
         
-        # Extract the main content
-        content_elem = soup.find('div', class_='sect1') or soup.find('div', class_='chapter')
+        result = extract_doc_page(html_content, site='get_doc_content')
+        DOC_CONTENT_CACHE.set(
+            full_url,
+            (validator, result),
+            size=len(result['title']) + len(result['content']) + len(validator)
+        )
         
-        if not content_elem:
-            content_elem = soup.find('body')
-            
-        content = extract_content(content_elem) if content_elem else 'Content not available'
-        
-        return {
-            'title': title,
-            'content': content
-        }
+        return dict(result)
         
     except Exception as e:
         logger.error(f"Error getting doc content: {str(e)}")
@@ -108,51 +186,98 @@ def get_doc_content(doc_path):
             'content': f'Failed to retrieve documentation: {str(e)}'
         }
 
+def get_doc_versions():
+    """
+    Get the documentation versions that can be selected
+    
+    Returns:
+        list: "current" followed by the configured major versions, newest first
+    """
+    return [DEFAULT_DOC_VERSION] + sorted(DOC_VERSIONS, key=lambda version: int(version) if version.isdigit() else 0, reverse=True)
+
 def get_doc_sections():
     """
     Get structured sections of PostgreSQL documentation
     
+    The table of contents is parsed in the background and kept in memory,
+    so this is a lookup rather than an HTML parse.
+    
     Returns:
         dict: A dictionary of documentation sections
     """
-    logger.debug("Getting documentation sections")
+    return DOC_SECTIONS.get() or DOCUMENTATION_SECTIONS
+
+def suggest_documentation(query, limit=10):
+    """
+    Suggest documentation titles, SQL commands, functions and settings for a partial query
     
-    try:
-        # Get the main index page
-        index_url = f"{POSTGRESQL_DOC_BASE_URL}index.html"
-        html_content = fetch_doc_page(index_url)
+    Cheap enough to call on every keystroke: answered from memory, without network.
+    
+    Args:
+        query (str): Text typed so far
+        limit (int): Maximum number of suggestions
         
-        if not html_content:
-            return DOCUMENTATION_SECTIONS
-            
-        # Parse sections from the documentation index
-        soup = BeautifulSoup(html_content, 'html.parser')
-        toc_div = soup.find('div', class_='toc')
+    Returns:
+        list: A list of dict containing label, kind, url and fuzzy
+    """
+    return get_typeahead_index().suggest(query, limit=limit)
+
+def get_related_pages(url, limit=8):
+    """
+    Get documentation pages linked from or to a page
+    
+    Answered from the prebuilt link graph in memory, without network.
+    
+    Args:
+        url (str): URL of the documentation page
+        limit (int): Maximum number of pages
         
-        # If we can't parse the TOC, return the predefined sections
-        if not toc_div:
-            return DOCUMENTATION_SECTIONS
-            
-        sections = {}
-        current_section = None
-        
-        for element in toc_div.find_all(['dt', 'dd']):
-            if element.name == 'dt':
-                current_section = element.get_text(strip=True)
-                sections[current_section] = []
-            elif element.name == 'dd' and current_section:
-                link = element.find('a')
-                if link:
-                    url = link.get('href', '')
-                    title = link.get_text(strip=True)
-                    sections[current_section].append({
-                        'title': title,
-                        'url': url
-                    })
-        
-        # If sections is empty, fall back to predefined sections
-        return sections if sections else DOCUMENTATION_SECTIONS
+    Returns:
+        list: A list of dict containing title, url and authority; empty if the graph has not been built
+    """
+    doc_graph = get_doc_graph()
+    if doc_graph is None:
+        return []
+    
+    # The graph is built from the current docs; pages keep their file names across versions
+    return doc_graph.related(re.sub(r'/docs/[^/]+/', '/docs/current/', url, count=1), limit=limit)
+
+def find_code_examples(query, limit=10):
+    """
+    Find SQL examples from the documentation
+    
+    Answered from the prebuilt example index in memory, without network.
+    
+    Args:
+        query (str): A command such as "CREATE INDEX" or the name of a table, function or setting
+        limit (int): Maximum number of examples
         
-    except Exception as e:
-        logger.error(f"Error getting doc sections: {str(e)}")
-        return DOCUMENTATION_SECTIONS
+    Returns:
+        list: A list of dict containing command, sql and url; empty if the index has not been built
+    """
+    example_index = get_example_index()
+    if example_index is None:
+        logger.warning("Example index requested but not built; run 'flask build-example-index'")
+        return []
+    
+    return example_index.search(query, limit=limit)
+
+def get_documentation_stats():
+    """
+    Get runtime statistics of the documentation subsystem
+    
+    Returns:
+        dict: Cache statistics, useful to see how much outbound traffic is saved
+    """
+    doc_store = get_doc_store()
+    return {
+        'cache': get_doc_cache_stats(),
+        'content_cache': DOC_CONTENT_CACHE.stats(),
+        'http': http_client.stats(),
+        'store': doc_store.stats() if doc_store else None,
+        'parsing': get_parse_stats(),
+        'coalescing': {
+            'fetch': DOC_FETCHES.stats(),
+            'search': SEARCHES.stats()
+        }
+    }
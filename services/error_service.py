@@ -1,12 +1,35 @@
 import re
 import logging
 import requests
-from bs4 import BeautifulSoup
-from config import POSTGRESQL_ERROR_CODES_URL, ERROR_PATTERNS
-from utils.doc_parser import fetch_doc_page
+from config import ERROR_PATTERNS
+from utils.error_matcher import ErrorMatcher
+from utils.sqlstate import extract_sqlstate, lookup_sqlstate
 
 logger = logging.getLogger(__name__)
 
+# All error patterns compiled into one matcher
+ERROR_MATCHER = ErrorMatcher(ERROR_PATTERNS)
+
+# Error type of messages no pattern matches, by SQLSTATE (exact code first, then class)
+SQLSTATE_ERROR_TYPES = {
+    '08001': 'connection_refused',
+    '08006': 'connection_refused',
+    '57P03': 'connection_refused',
+    '28000': 'authentication_failed',
+    '28P01': 'authentication_failed',
+    '42501': 'permission_denied',
+    '42P01': 'relation_not_found',
+    '42601': 'syntax_error',
+    '23505': 'duplicate_key',
+    '42P07': 'duplicate_key',
+    '42710': 'duplicate_key',
+    '23503': 'foreign_key_violation',
+    '53200': 'out_of_memory',
+    '53100': 'disk_full',
+    '08': 'connection_refused',
+    '28': 'authentication_failed'
+}
+
 def analyze_error(error_text):
     """
     Analyze a PostgreSQL error message and provide troubleshooting information
@@ -15,7 +38,9 @@ def analyze_error(error_text):
         error_text (str): The error message to analyze
         
     Returns:
-        dict: Analysis results with error type, explanation, and solution
+        dict: Analysis results with error type, explanation, and solution, plus every
+            matching category with the offsets of its matches; the error type is the
+            first matching category in ERROR_PATTERNS order
     """
     logger.debug(f"Analyzing error: {error_text[:50]}...")
     
@@ -26,22 +51,12 @@ def analyze_error(error_text):
             'solution': 'Please provide the complete error message for analysis.'
         }
     
-    # Extract error code if present
-    error_code_match = re.search(r'ERROR:\s+\d+', error_text)
-    error_code = None
-    
-    if error_code_match:
-        error_code = error_code_match.group(0).split(':')[1].strip()
+    # Extract the SQLSTATE if present (psql verbose, pgAdmin, JDBC, jsonlog and driver formats)
+    error_code = extract_sqlstate(error_text)
     
-    # Look for known error patterns
-    error_type = 'Unknown'
-    for err_type, patterns in ERROR_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, error_text, re.IGNORECASE):
-                error_type = err_type
-                break
-        if error_type != 'Unknown':
-            break
+    # Look for known error patterns, scanning the text once
+    matches = ERROR_MATCHER.match(error_text)
+    error_type = sqlstate_error_type(next(iter(matches), None), error_code)
     
     # Get detailed explanation and solution based on error type
     explanation, solution = get_error_details(error_type, error_code, error_text)
@@ -50,9 +65,82 @@ def analyze_error(error_text):
         'error_type': error_type.replace('_', ' ').title(),
         'explanation': explanation,
         'solution': solution,
-        'error_code': error_code
+        'error_code': error_code,
+        'categories': [
+            {
+                'error_type': category.replace('_', ' ').title(),
+                'matches': [{'start': start, 'end': end, 'text': error_text[start:end]} for start, end in spans]
+            }
+            for category, spans in matches.items()
+        ]
     }
 
+def sqlstate_error_type(error_type, error_code):
+    """
+    Fall back to the SQLSTATE when no error pattern matched
+    
+    Args:
+        error_type (str or None): Category found by ERROR_MATCHER
+        error_code (str or None): SQLSTATE of the error
+        
+    Returns:
+        str: The error type, 'Unknown' if neither identifies one
+    """
+    if error_type is None and error_code:
+        error_type = SQLSTATE_ERROR_TYPES.get(error_code) or SQLSTATE_ERROR_TYPES.get(error_code[:2])
+    return error_type or 'Unknown'
+
+def classify_error(error_text, error_code=None):
+    """
+    Get the error type and SQLSTATE of an error message without building an analysis
+    
+    Used where many messages are counted rather than explained, e.g. server logs.
+    
+    Args:
+        error_text (str): The error message
+        error_code (str, optional): SQLSTATE already known from elsewhere, e.g. a log field
+        
+    Returns:
+        tuple: (error type as shown by analyze_error, SQLSTATE or None)
+    """
+    error_code = error_code or extract_sqlstate(error_text)
+    error_type = sqlstate_error_type(ERROR_MATCHER.first(error_text), error_code)
+    return error_type.replace('_', ' ').title(), error_code
+
+def analyze_errors(error_texts):
+    """
+    Analyze a batch of PostgreSQL error messages
+    
+    Each distinct message is analyzed once; repeated messages reuse the
+    first analysis. Results are produced as the input is consumed, so the
+    input can be a stream.
+    
+    Args:
+        error_texts (iterable): Error messages; None entries (invalid input) are passed
+            through with no analysis so indexes stay aligned with the input
+        
+    Yields:
+        tuple: (index, error text, analysis, index of the first identical message or None)
+    """
+    analyzed = {}
+    
+    for index, error_text in enumerate(error_texts):
+        if error_text is None:
+            yield index, None, None, None
+            continue
+        
+        # Messages differing only in surrounding whitespace are the same error
+        key = error_text.strip()
+        
+        if key in analyzed:
+            first_index, analysis = analyzed[key]
+            yield index, error_text, analysis, first_index
+            continue
+        
+        analysis = analyze_error(error_text)
+        analyzed[key] = (index, analysis)
+        yield index, error_text, analysis, None
+
 def get_error_details(error_type, error_code=None, error_text=''):
     """
     Get detailed explanation and solution for a specific error type
@@ -169,31 +257,19 @@ def get_error_code_info(error_code):
     Get information about a specific PostgreSQL error code
     
     Args:
-        error_code (str): The PostgreSQL error code
+        error_code (str): The PostgreSQL error code (SQLSTATE)
         
     Returns:
         str: Description of the error code or None if not found
     """
-    try:
-        html_content = fetch_doc_page(POSTGRESQL_ERROR_CODES_URL)
-        
-        if not html_content:
-            return None
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Look for the error code in the table
-        for table in soup.find_all('table', class_='table'):
-            for row in table.find_all('tr'):
-                cells = row.find_all('td')
-                if len(cells) >= 2 and error_code in cells[0].get_text():
-                    return cells[1].get_text(strip=True)
-        
-        return None
-        
-    except Exception as e:
-        logger.error(f"Error getting error code info: {str(e)}")
+    info = lookup_sqlstate(error_code)
+    if not info:
         return None
+    
+    if info['condition']:
+        return f"{info['code']} {info['condition']} (Class {info['class']}: {info['class_name']})"
+    
+    return f"{info['code']} (Class {info['class']}: {info['class_name']})"
 
 def get_common_errors():
     """
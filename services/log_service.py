@@ -0,0 +1,406 @@
+import os
+import mmap
+import time
+import heapq
+import logging
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from config import LOG_LINE_PREFIX, LOG_CHUNK_BYTES, LOG_ANALYSIS_WORKERS
+from services.error_service import classify_error
+from utils.log_parser import (
+    LOG_FORMATS, ERROR_SEVERITIES, TIME_BUCKETS, detect_log_format, entry_start_matcher, parse_log_entries, time_bucket,
+    parse_duration_message, strip_query_literals, normalize_query, query_fingerprint
+)
+from utils.sqlstate import lookup_sqlstate
+from utils.process_pool import pool_context
+
+# Vectorised percentiles when numpy is installed
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+# Bytes read to detect the log format
+FORMAT_SAMPLE_BYTES = 64 * 1024
+
+# Distinct messages a worker remembers the classification of
+CLASSIFY_CACHE_SIZE = 10000
+
+# Counters kept per chunk and merged into the summary
+COUNTERS = ('severities', 'categories', 'sqlstates', 'users', 'databases', 'timeline')
+
+# Slow statements and plans are logged at LOG level, over several lines
+SLOW_QUERY_SEVERITIES = ERROR_SEVERITIES | {'LOG'}
+
+# Statement shapes (literals stripped) a worker remembers the normalized form of
+NORMALIZE_CACHE_SIZE = 10000
+
+PERCENTILES = (50, 95, 99)
+
+def _align(mm, offset, is_entry_start):
+    """
+    Move an offset forward to the start of the next log entry
+    """
+    if offset <= 0:
+        return 0
+    if offset >= len(mm):
+        return len(mm)
+
+    # Finish the line the offset falls in; an offset right after a newline stays where it is
+    mm.seek(offset - 1)
+    mm.readline()
+
+    while True:
+        position = mm.tell()
+        line = mm.readline()
+        if not line or is_entry_start(line):
+            return position
+
+def _iter_lines(mm, start, end):
+    mm.seek(start)
+    while mm.tell() < end:
+        line = mm.readline()
+        if not line:
+            return
+        yield line.decode('utf-8', 'replace')
+
+def _map_chunks(worker, path, log_format, workers, chunk_bytes, *args):
+    """
+    Run a chunk worker over every byte range of a log file
+
+    Args:
+        worker (callable): Top-level function called as worker(path, start, end, log_format, *args)
+        path (str): Log file
+        log_format (str or None): One of LOG_FORMATS, detected when None
+        workers (int or None): Worker processes, defaults to LOG_ANALYSIS_WORKERS or the CPU count
+        chunk_bytes (int): Log bytes per task
+
+    Returns:
+        tuple: (dict of format, bytes, chunks and workers; list of worker results in file order)
+    """
+    size = os.path.getsize(path)
+
+    with open(path, 'rb') as log_file:
+        sample = log_file.read(FORMAT_SAMPLE_BYTES)
+    log_format = log_format or detect_log_format(sample)
+
+    chunk_bytes = max(chunk_bytes, FORMAT_SAMPLE_BYTES)
+    tasks = [
+        (path, start, min(start + chunk_bytes, size), log_format) + args
+        for start in range(0, size, chunk_bytes)
+    ]
+
+    workers = min(workers or LOG_ANALYSIS_WORKERS or os.cpu_count() or 1, max(len(tasks), 1))
+    if workers > 1:
+        # Never fork the caller: a web server worker has threads (and locks) a forked child would inherit
+        with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context()) as executor:
+            results = list(executor.map(worker, *zip(*tasks)))
+    else:
+        results = [worker(*task) for task in tasks]
+
+    return {'format': log_format, 'bytes': size, 'chunks': len(tasks), 'workers': workers}, results
+
+def _entries(path, start, end, log_format, log_line_prefix, continued_severities=ERROR_SEVERITIES):
+    """
+    Parse the entries of a byte range of a log file
+
+    The range is widened or narrowed to entry boundaries with the same rule
+    for both ends, so consecutive ranges cover every entry exactly once.
+    """
+    with open(path, 'rb') as log_file, mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        is_entry_start = entry_start_matcher(log_format, log_line_prefix)
+        start = _align(mm, start, is_entry_start)
+        end = _align(mm, end, is_entry_start)
+
+        yield from parse_log_entries(_iter_lines(mm, start, end), log_format, log_line_prefix, continued_severities)
+
+def _count_chunk(path, start, end, log_format, log_line_prefix, bucket):
+    """
+    Count the entries of a byte range of a log file; runs in a worker process
+
+    Returns:
+        dict: Entry and error totals plus one Counter per name in COUNTERS
+    """
+    counts = {name: Counter() for name in COUNTERS}
+    entries = errors = 0
+    classified = {}
+
+    for entry in _entries(path, start, end, log_format, log_line_prefix):
+        entries += 1
+        severity = entry['severity']
+        counts['severities'][severity] += 1
+
+        if severity not in ERROR_SEVERITIES:
+            continue
+        errors += 1
+
+        # 00000 is logged by %e for entries without an error report
+        sqlstate = entry['sqlstate'] if entry['sqlstate'] != '00000' else None
+        key = (entry['message'], sqlstate)
+        if key not in classified:
+            if len(classified) >= CLASSIFY_CACHE_SIZE:
+                classified.clear()
+            classified[key] = classify_error(f"{severity}:  {entry['message']}", sqlstate)
+        error_type, error_code = classified[key]
+
+        counts['categories'][error_type] += 1
+        counts['sqlstates'][error_code] += 1
+        counts['users'][entry['user']] += 1
+        counts['databases'][entry['database']] += 1
+        counts['timeline'][time_bucket(entry['timestamp'], bucket)] += 1
+
+    counts['entries'] = entries
+    counts['errors'] = errors
+    return counts
+
+def _ranked(counter):
+    return {str(key) if key is not None else 'unknown': count for key, count in counter.most_common()}
+
+def analyze_log_file(path, log_format=None, log_line_prefix=LOG_LINE_PREFIX, bucket='hour',
+                     workers=None, chunk_bytes=LOG_CHUNK_BYTES):
+    """
+    Aggregate the errors of a PostgreSQL server log
+
+    The file is memory-mapped and split into chunks that worker processes
+    parse and count independently; only the counters travel back. Memory
+    use depends on the chunk size and the number of distinct users,
+    databases, SQLSTATEs and time buckets, not on the size of the log.
+
+    Args:
+        path (str): Log file
+        log_format (str, optional): One of LOG_FORMATS, detected from the first lines when omitted
+        log_line_prefix (str): log_line_prefix of stderr logs
+        bucket (str): Time bucket size, one of TIME_BUCKETS
+        workers (int, optional): Worker processes, defaults to LOG_ANALYSIS_WORKERS or the CPU count
+        chunk_bytes (int): Log bytes per worker task
+
+    Returns:
+        dict: Entry and error totals with error counts per category, SQLSTATE, user,
+            database and time bucket, plus entry counts per severity
+
+    Raises:
+        ValueError: For an unknown format or bucket size
+    """
+    if log_format is not None and log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format '{log_format}', expected one of {', '.join(LOG_FORMATS)}")
+    if bucket not in TIME_BUCKETS:
+        raise ValueError(f"Unknown time bucket '{bucket}', expected one of {', '.join(TIME_BUCKETS)}")
+
+    started = time.monotonic()
+    run, results = _map_chunks(_count_chunk, path, log_format, workers, chunk_bytes, log_line_prefix, bucket)
+
+    totals = {name: Counter() for name in COUNTERS}
+    entries = errors = 0
+    for counts in results:
+        entries += counts['entries']
+        errors += counts['errors']
+        for name in COUNTERS:
+            totals[name].update(counts[name])
+
+    run['elapsed'] = round(time.monotonic() - started, 3)
+    logger.info(f"Analyzed {run['bytes']} bytes of {run['format']} log in {run['chunks']} chunks "
+                f"with {run['workers']} workers in {run['elapsed']:.1f}s: {entries} entries, {errors} errors")
+
+    return {
+        **run,
+        'entries': entries,
+        'errors': errors,
+        'severities': _ranked(totals['severities']),
+        'categories': _ranked(totals['categories']),
+        'sqlstates': [
+            {
+                'code': code,
+                'condition': (lookup_sqlstate(code) or {}).get('condition'),
+                'count': count
+            }
+            for code, count in totals['sqlstates'].most_common()
+        ],
+        'users': _ranked(totals['users']),
+        'databases': _ranked(totals['databases']),
+        'bucket': bucket,
+        'timeline': [
+            {'bucket': key, 'count': totals['timeline'][key]}
+            for key in sorted(totals['timeline'], key=lambda key: (key is None, key or ''))
+        ]
+    }
+
+def _collect_chunk(path, start, end, log_format, log_line_prefix, top):
+    """
+    Collect the slow statements and plans of a byte range of a log file; runs in a worker process
+
+    Returns:
+        dict: 'statements' and 'plans' map a fingerprint to [normalized query, example,
+            durations]; 'worst_plans' holds the top slowest plans as (duration, entry) pairs
+    """
+    collected = {'statement': {}, 'plan': {}}
+    worst_plans = []
+    normalized = {}
+
+    for position, entry in enumerate(_entries(path, start, end, log_format, log_line_prefix, SLOW_QUERY_SEVERITIES)):
+        if entry['severity'] != 'LOG' or not entry['message'].startswith('duration:'):
+            continue
+
+        parsed = parse_duration_message(entry['message'])
+        if parsed is None or not parsed['query']:
+            continue
+
+        # Executions differ in their literals; the rest of the normalization is cached by shape
+        query = parsed['query']
+        shape = strip_query_literals(query)
+        if shape not in normalized:
+            if len(normalized) >= NORMALIZE_CACHE_SIZE:
+                normalized.clear()
+            normalized_query = normalize_query(shape, literals_stripped=True)
+            normalized[shape] = (query_fingerprint(normalized_query), normalized_query)
+        fingerprint, normalized_query = normalized[shape]
+
+        queries = collected[parsed['kind']]
+        if fingerprint not in queries:
+            queries[fingerprint] = [normalized_query, query, array('d')]
+        queries[fingerprint][2].append(parsed['duration'])
+
+        if parsed['plan'] is not None:
+            plan = (parsed['duration'], position, {
+                'duration_ms': parsed['duration'],
+                'fingerprint': fingerprint,
+                'query': query,
+                'plan': parsed['plan'],
+                'timestamp': entry['timestamp'],
+                'user': entry['user'],
+                'database': entry['database']
+            })
+            if len(worst_plans) < top:
+                heapq.heappush(worst_plans, plan)
+            elif plan[0] > worst_plans[0][0]:
+                heapq.heapreplace(worst_plans, plan)
+
+    return {
+        'statements': collected['statement'],
+        'plans': collected['plan'],
+        'worst_plans': [(duration, record) for duration, _, record in worst_plans]
+    }
+
+def duration_percentiles(durations, points=PERCENTILES):
+    """
+    Compute percentiles of durations, interpolating linearly like numpy's default
+
+    Args:
+        durations (array): Durations in ms, as array('d')
+        points (tuple): Percentiles to compute
+
+    Returns:
+        list: One value per point, None values if there are no durations
+    """
+    if not durations:
+        return [None] * len(points)
+
+    if numpy is not None:
+        return numpy.percentile(numpy.frombuffer(durations, dtype=numpy.float64), points).tolist()
+
+    ordered = sorted(durations)
+    values = []
+    for point in points:
+        rank = (len(ordered) - 1) * point / 100
+        lower = int(rank)
+        upper = min(lower + 1, len(ordered) - 1)
+        values.append(ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower))
+    return values
+
+def _query_stats(fingerprint, normalized_query, example, durations, total_time):
+    total = sum(durations)
+    p50, p95, p99 = duration_percentiles(durations)
+    return {
+        'fingerprint': fingerprint,
+        'query': normalized_query,
+        'example': example,
+        'calls': len(durations),
+        'total_ms': round(total, 3),
+        'mean_ms': round(total / len(durations), 3),
+        'min_ms': min(durations),
+        'max_ms': max(durations),
+        'p50_ms': round(p50, 3),
+        'p95_ms': round(p95, 3),
+        'p99_ms': round(p99, 3),
+        'share': round(100 * total / total_time, 2) if total_time else None  # percent of all logged time
+    }
+
+def analyze_slow_queries(path, log_format=None, log_line_prefix=LOG_LINE_PREFIX, top=20,
+                         workers=None, chunk_bytes=LOG_CHUNK_BYTES):
+    """
+    Report the slow statements of a PostgreSQL server log
+
+    Reads the durations logged by log_min_duration_statement and the plans
+    logged by auto_explain. Statements are grouped by normalized text, so
+    executions differing only in their values count as one query. When the
+    log has no statement durations, the durations of the explained plans are
+    used instead. Chunks are processed by worker processes like
+    analyze_log_file; memory grows with the number of slow statements only.
+
+    Args:
+        path (str): Log file
+        log_format (str, optional): One of LOG_FORMATS, detected from the first lines when omitted
+        log_line_prefix (str): log_line_prefix of stderr logs
+        top (int): Queries per ranking and number of worst plans
+        workers (int, optional): Worker processes, defaults to LOG_ANALYSIS_WORKERS or the CPU count
+        chunk_bytes (int): Log bytes per worker task
+
+    Returns:
+        dict: Totals, overall percentiles, queries ranked by total time and by calls, and the slowest plans
+
+    Raises:
+        ValueError: For an unknown format or a ranking size below 1
+    """
+    if log_format is not None and log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format '{log_format}', expected one of {', '.join(LOG_FORMATS)}")
+    if top < 1:
+        raise ValueError("The ranking size must be at least 1")
+
+    started = time.monotonic()
+    run, results = _map_chunks(_collect_chunk, path, log_format, workers, chunk_bytes, log_line_prefix, top)
+
+    merged = {'statements': {}, 'plans': {}}
+    worst_plans = []
+    for collected in results:
+        for kind, queries in merged.items():
+            for fingerprint, (normalized_query, example, durations) in collected[kind].items():
+                if fingerprint in queries:
+                    queries[fingerprint][2].extend(durations)
+                else:
+                    queries[fingerprint] = [normalized_query, example, durations]
+        worst_plans.extend(collected['worst_plans'])
+
+    source = 'statements' if merged['statements'] or not merged['plans'] else 'plans'
+    queries = merged[source]
+
+    all_durations = array('d')
+    for _, _, durations in queries.values():
+        all_durations.extend(durations)
+    total_time = sum(all_durations)
+
+    def ranking(key):
+        fingerprints = heapq.nlargest(top, queries, key=key)
+        return [_query_stats(fingerprint, *queries[fingerprint], total_time) for fingerprint in fingerprints]
+
+    run['elapsed'] = round(time.monotonic() - started, 3)
+    logger.info(f"Analyzed {run['bytes']} bytes of {run['format']} log for slow queries in {run['chunks']} chunks "
+                f"with {run['workers']} workers in {run['elapsed']:.1f}s: {len(all_durations)} {source}")
+
+    return {
+        **run,
+        'source': source,
+        'statements': len(all_durations),
+        'queries': len(queries),
+        'plans': sum(len(durations) for _, _, durations in merged['plans'].values()),
+        'total_ms': round(total_time, 3),
+        'percentiles': {
+            f"p{point}_ms": round(value, 3) if value is not None else None
+            for point, value in zip(PERCENTILES, duration_percentiles(all_durations))
+        },
+        'by_total_time': ranking(lambda fingerprint: sum(queries[fingerprint][2])),
+        'by_calls': ranking(lambda fingerprint: len(queries[fingerprint][2])),
+        'worst_plans': [record for _, record in heapq.nlargest(top, worst_plans, key=lambda plan: plan[0])]
+    }
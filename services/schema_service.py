@@ -1,14 +1,68 @@
 import os
+import copy
+import json
+import hashlib
 import logging
 import sqlalchemy
 from sqlalchemy import MetaData, inspect, text
-from sqlalchemy.engine import create_engine
-from urllib.parse import urlparse
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.exc import ArgumentError
 
-from config import PG_HOST, PG_PORT, PG_USER, PG_PASSWORD, PG_DATABASE
+from config import (
+    PG_HOST, PG_PORT, PG_USER, PG_PASSWORD, PG_DATABASE, DB_ENGINE_MAX, DB_ENGINE_IDLE_TIMEOUT, DB_POOL_SIZE,
+    DB_POOL_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, SCHEMA_CACHE_MAX_BYTES, SCHEMA_CACHE_TTL
+)
+from utils.engine_registry import EngineRegistry
+from utils.lru_cache import BoundedCache
 
 logger = logging.getLogger(__name__)
 
+# Engines of analyzed databases, reused across requests
+ENGINES = EngineRegistry(
+    max_engines=DB_ENGINE_MAX,
+    idle_timeout=DB_ENGINE_IDLE_TIMEOUT,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_POOL_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE
+)
+
+# Table analyses, keyed by a hash of database URL and table name, stored with the catalog fingerprint they were built at
+SCHEMA_CACHE = BoundedCache(SCHEMA_CACHE_MAX_BYTES, ttl=SCHEMA_CACHE_TTL or None)
+
+# Catalog fingerprint of the relation a table name refers to, resolved like the inspector does
+# (an unqualified name in the default schema): the xmin of its pg_class and
+# pg_namespace rows, of its pg_attribute and pg_attrdef rows, of the constraints on or
+# referencing it and of its indexes. Any DDL affecting an analysis writes a new version of
+# one of these rows and so changes its xmin. relfilenode is left out: it also changes on
+# TRUNCATE and VACUUM FULL, which do not change the schema.
+SCHEMA_FINGERPRINT_SQL = text("""
+    WITH rel AS (
+        SELECT c.oid, c.xmin AS class_xmin, n.xmin AS namespace_xmin
+          FROM pg_class c
+          JOIN pg_namespace n ON n.oid = c.relnamespace
+         WHERE c.relname = :table_name
+           AND n.nspname = COALESCE(CAST(:schema_name AS text), current_schema())
+           AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+    )
+    SELECT (SELECT count(*) FROM rel) AS relations,
+           md5(concat_ws('|',
+               (SELECT string_agg(oid::text || ':' || class_xmin::text || ':' || namespace_xmin::text, ',' ORDER BY oid)
+                  FROM rel),
+               (SELECT string_agg(a.attrelid::text || '.' || a.attnum::text || ':' || a.xmin::text, ','
+                                  ORDER BY a.attrelid, a.attnum)
+                  FROM pg_attribute a JOIN rel ON a.attrelid = rel.oid
+                 WHERE a.attnum > 0),
+               (SELECT string_agg(d.oid::text || ':' || d.xmin::text, ',' ORDER BY d.oid)
+                  FROM pg_attrdef d JOIN rel ON d.adrelid = rel.oid),
+               (SELECT string_agg(k.oid::text || ':' || k.xmin::text, ',' ORDER BY k.oid)
+                  FROM pg_constraint k
+                 WHERE k.conrelid IN (SELECT oid FROM rel) OR k.confrelid IN (SELECT oid FROM rel)),
+               (SELECT string_agg(i.oid::text || ':' || i.xmin::text || ':' || x.xmin::text, ',' ORDER BY i.oid)
+                  FROM pg_index x JOIN rel ON x.indrelid = rel.oid JOIN pg_class i ON i.oid = x.indexrelid)
+           )) AS fingerprint
+""")
+
 def analyze_schema(connection_string, table_name):
     """
     Analyze the schema of a PostgreSQL table
@@ -29,6 +83,17 @@ def analyze_schema(connection_string, table_name):
         if isinstance(engine, dict) and 'error' in engine:
             return engine
         
+        # Reuse the previous analysis while the table's catalog entries are unchanged
+        cache_key = schema_cache_key(engine, table_name)
+        fingerprint = get_schema_fingerprint(engine, table_name)
+        
+        if fingerprint is not None:
+            cached = SCHEMA_CACHE.get(cache_key)
+            if cached is not None and cached[0] == fingerprint:
+                logger.debug(f"Schema analysis of {table_name} served from cache")
+                # A copy, so callers cannot alter the cached analysis
+                return add_table_stats(engine, table_name, copy.deepcopy(cached[1]))
+        
         # Get table information
         inspector = inspect(engine)
         
@@ -49,7 +114,7 @@ def analyze_schema(connection_string, table_name):
         # Sample data structure
         sample_data_structure = get_sample_data_structure(columns)
         
-        return {
+        analysis = {
             'table_name': table_name,
             'columns': columns,
             'primary_key': primary_key,
@@ -60,13 +125,86 @@ def analyze_schema(connection_string, table_name):
             'sample_data_structure': sample_data_structure
         }
         
+        # The fingerprint was read before reflecting; DDL in between only makes the next lookup miss
+        if fingerprint is not None:
+            SCHEMA_CACHE.set(
+                cache_key,
+                (fingerprint, copy.deepcopy(analysis)),
+                size=len(fingerprint) + len(json.dumps(analysis, default=str))
+            )
+        
+        return add_table_stats(engine, table_name, analysis)
+        
     except Exception as e:
         logger.error(f"Error analyzing schema: {str(e)}")
         return {'error': f"Error analyzing schema: {str(e)}"}
 
+def schema_cache_key(engine, table_name):
+    """
+    Get the schema cache key of a table
+    
+    Analyses are cached per credentials as well as per database, but the
+    key is a hash so the password is not kept in memory with the cache.
+    
+    Args:
+        engine (Engine): SQLAlchemy engine
+        table_name (str): Name of the table, optionally schema-qualified
+        
+    Returns:
+        str: Hex digest of the database URL and table name
+    """
+    url = engine.url.render_as_string(hide_password=False)
+    return hashlib.sha256(f"{url}\n{table_name}".encode('utf-8')).hexdigest()
+
+def split_table_name(table_name):
+    """
+    Split an optionally schema-qualified table name
+    
+    An unqualified name gets no schema; the catalog queries then resolve it
+    in current_schema(), the default schema the inspector uses.
+    
+    Args:
+        table_name (str): Name of the table, optionally schema-qualified
+        
+    Returns:
+        tuple: (schema or None, table)
+    """
+    if '.' in table_name:
+        schema, table = table_name.split('.')
+        return schema, table
+    return None, table_name
+
+def get_schema_fingerprint(engine, table_name):
+    """
+    Get a fingerprint of the catalog entries describing a table
+    
+    One small query; the fingerprint changes whenever DDL alters the
+    table's columns, defaults, constraints, indexes or name.
+    
+    Args:
+        engine (Engine): SQLAlchemy engine
+        table_name (str): Name of the table, optionally schema-qualified
+        
+    Returns:
+        str or None: The fingerprint, None if the table does not exist or the catalog cannot be read
+    """
+    schema, table = split_table_name(table_name)
+    
+    try:
+        with engine.connect() as conn:
+            row = conn.execute(SCHEMA_FINGERPRINT_SQL, {'table_name': table, 'schema_name': schema}).one()
+    except Exception as e:
+        logger.warning(f"Error reading schema fingerprint: {str(e)}")
+        return None
+    
+    return row.fingerprint if row.relations else None
+
 def create_database_connection(connection_string):
     """
-    Create a database connection from connection string or parameters
+    Get a database engine from connection string or parameters
+    
+    Engines come from the process-wide registry, so the same database is
+    probed once and its pooled connections are reused by later requests.
     
     Args:
         connection_string (str): Database connection string or parameters
@@ -77,13 +215,12 @@ def create_database_connection(connection_string):
     try:
         # Check if connection_string is a URL or a custom format
         if '://' in connection_string:
-            # Parse the URL
-            parsed_url = urlparse(connection_string)
+            try:
+                url = make_url(connection_string)
+            except ArgumentError:
+                return {'error': 'Invalid connection URL.'}
             
-            # Extract parameters if needed
-            if parsed_url.scheme in ('postgresql', 'postgres'):
-                engine = create_engine(connection_string)
-            else:
+            if url.get_backend_name() not in ('postgresql', 'postgres'):
                 return {'error': 'Unsupported database type. Only PostgreSQL is supported.'}
         else:
             # Assume it's in format host:port/database
@@ -99,23 +236,33 @@ def create_database_connection(connection_string):
                     port = PG_PORT
                     database = PG_DATABASE
                 
-                # Create connection URL
-                conn_str = f"postgresql://{PG_USER}:{PG_PASSWORD}@{host}:{port}/{database}"
-                engine = create_engine(conn_str)
+                url = URL.create(
+                    'postgresql',
+                    username=PG_USER,
+                    password=PG_PASSWORD or None,
+                    host=host,
+                    port=int(port),
+                    database=database
+                )
                 
             except Exception:
                 return {'error': 'Invalid connection format. Use "host:port/database" or a full connection URL.'}
         
-        # Test connection
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        
-        return engine
+        return ENGINES.get(url)
         
     except Exception as e:
         logger.error(f"Error creating database connection: {str(e)}")
         return {'error': f"Error creating database connection: {str(e)}"}
 
+def get_connection_stats():
+    """
+    Get statistics of the shared database engines and their pools
+    
+    Returns:
+        dict: Registry counters and per-database pool occupancy, plus the schema analysis cache counters
+    """
+    return dict(ENGINES.stats(), schema_cache=SCHEMA_CACHE.stats())
+
 def table_exists(inspector, table_name):
     """
     Check if a table exists in the database
@@ -160,8 +307,18 @@ def get_table_columns(inspector, table_name):
         table = table_name
         
     columns = inspector.get_columns(table, schema=schema)
+    return format_columns(columns)
+
+def format_columns(columns):
+    """
+    Format reflected columns
     
-    # Format column information
+    Args:
+        columns (list): Columns as returned by the inspector
+        
+    Returns:
+        list: List of column information dictionaries
+    """
     formatted_columns = []
     for column in columns:
         formatted_columns.append({
@@ -212,13 +369,24 @@ def get_foreign_keys(inspector, table_name):
         table = table_name
         
     foreign_keys = inspector.get_foreign_keys(table, schema=schema)
+    return format_foreign_keys(foreign_keys)
+
+def format_foreign_keys(foreign_keys):
+    """
+    Format reflected foreign keys
     
-    # Format foreign key information
+    Args:
+        foreign_keys (list): Foreign keys as returned by the inspector
+        
+    Returns:
+        list: List of foreign key information dictionaries
+    """
     formatted_fks = []
     for fk in foreign_keys:
         formatted_fks.append({
             'name': fk.get('name', 'unnamed_fk'),
             'columns': fk.get('constrained_columns', []),
+            'referred_schema': fk.get('referred_schema'),
             'referred_table': fk.get('referred_table', ''),
             'referred_columns': fk.get('referred_columns', [])
         })
@@ -243,8 +411,18 @@ def get_indexes(inspector, table_name):
         table = table_name
         
     indexes = inspector.get_indexes(table, schema=schema)
+    return format_indexes(indexes)
+
+def format_indexes(indexes):
+    """
+    Format reflected indexes
     
-    # Format index information
+    Args:
+        indexes (list): Indexes as returned by the inspector
+        
+    Returns:
+        list: List of index information dictionaries
+    """
     formatted_indexes = []
     for index in indexes:
         formatted_indexes.append({
@@ -473,13 +651,145 @@ def get_sample_data_structure(columns):
             sample[column['name']] = "unknown_type"
     
     # Format as JSON string
-    import json
     return json.dumps(sample, indent=2)
 
+def iter_schema_snapshot(engine, schemas=None):
+    """
+    Reflect every table of a database
+    
+    Each schema is reflected with the inspector's get_multi_* methods,
+    which fetch one kind of object for all tables of the schema in a
+    single query, so the number of round trips depends on the number of
+    schemas rather than tables. Tables are yielded as soon as their schema
+    is reflected.
+    
+    Columns, primary key, foreign keys and indexes have the format of
+    analyze_schema. Constraints do not: the inspector reports neither
+    deferrability nor primary and foreign keys as constraints, so each
+    unique or check constraint is one entry with name, type, definition
+    and its columns as a list (empty for check constraints), where
+    analyze_schema has one entry per column with column, deferrable and
+    deferred.
+    
+    Args:
+        engine (Engine): SQLAlchemy engine
+        schemas (list, optional): Schemas to reflect, defaults to every schema
+            except pg_* and information_schema
+        
+    Yields:
+        dict: Table with its schema, name, schema-qualified name, columns,
+            primary key, foreign keys, indexes, unique and check constraints
+            and CREATE TABLE statement
+    """
+    inspector = inspect(engine)
+    
+    if schemas is None:
+        schemas = [schema for schema in inspector.get_schema_names() if schema != 'information_schema']
+    
+    for schema in schemas:
+        columns = inspector.get_multi_columns(schema=schema)
+        primary_keys = inspector.get_multi_pk_constraint(schema=schema)
+        foreign_keys = inspector.get_multi_foreign_keys(schema=schema)
+        indexes = inspector.get_multi_indexes(schema=schema)
+        unique_constraints = inspector.get_multi_unique_constraints(schema=schema)
+        check_constraints = inspector.get_multi_check_constraints(schema=schema)
+        
+        for key in sorted(columns):
+            table_name = key[1]
+            full_name = f"{schema}.{table_name}" if schema != 'public' else table_name
+            
+            table_columns = format_columns(columns[key])
+            primary_key = primary_keys.get(key, {}).get('constrained_columns', [])
+            table_foreign_keys = format_foreign_keys(foreign_keys.get(key, []))
+            constraints = [
+                {
+                    'name': constraint['name'],
+                    'type': 'UNIQUE',
+                    'columns': constraint['column_names'],
+                    'definition': f"({', '.join(constraint['column_names'])})"
+                }
+                for constraint in unique_constraints.get(key, [])
+            ] + [
+                {
+                    'name': constraint['name'],
+                    'type': 'CHECK',
+                    'columns': [],
+                    'definition': f"({constraint['sqltext']})"
+                }
+                for constraint in check_constraints.get(key, [])
+            ]
+            
+            yield {
+                'schema': schema,
+                'table_name': table_name,
+                'full_name': full_name,
+                'columns': table_columns,
+                'primary_key': primary_key,
+                'foreign_keys': table_foreign_keys,
+                'indexes': format_indexes(indexes.get(key, [])),
+                'constraints': constraints,
+                'create_table_sql': build_create_table_sql(
+                    full_name, table_columns, primary_key, table_foreign_keys, constraints
+                )
+            }
+
+def stream_schema_snapshot(engine, schemas=None):
+    """
+    Serialize a whole-database snapshot as one JSON document, table by table
+    
+    The document is {"tables": [...], "table_count": n}; if reflection
+    fails midway, the tables so far are kept and an "error" field is added.
+    
+    Args:
+        engine (Engine): SQLAlchemy engine
+        schemas (list, optional): Schemas to reflect, defaults to every user schema
+        
+    Yields:
+        str: JSON text fragments
+    """
+    count = 0
+    error = None
+    
+    yield '{"tables": ['
+    try:
+        for table in iter_schema_snapshot(engine, schemas):
+            yield (',\n' if count else '\n') + json.dumps(table)
+            count += 1
+    except Exception as e:
+        logger.error(f"Error taking schema snapshot: {str(e)}")
+        error = f"Error taking schema snapshot: {str(e)}"
+    
+    yield f'\n], "table_count": {count}' + (f', "error": {json.dumps(error)}' if error else '') + '}\n'
+
+# Every user table with its column count and primary key columns, in one round trip.
+# Same scope as the inspector: ordinary and partitioned tables outside pg_* schemas and information_schema.
+TABLE_INFO_SQL = text("""
+    SELECT n.nspname AS schema,
+           c.relname AS name,
+           (SELECT count(*)
+              FROM pg_attribute a
+             WHERE a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped) AS column_count,
+           COALESCE((SELECT array_agg(a.attname::text ORDER BY k.ord)
+                       FROM pg_constraint p
+                      CROSS JOIN LATERAL unnest(p.conkey) WITH ORDINALITY AS k(attnum, ord)
+                       JOIN pg_attribute a ON a.attrelid = p.conrelid AND a.attnum = k.attnum
+                      WHERE p.conrelid = c.oid AND p.contype = 'p'), '{}') AS primary_key
+      FROM pg_class c
+      JOIN pg_namespace n ON n.oid = c.relnamespace
+     WHERE c.relkind IN ('r', 'p')
+       AND n.nspname NOT LIKE 'pg\\_%'
+       AND n.nspname <> 'information_schema'
+     ORDER BY n.nspname, c.relname
+""")
+
 def get_table_info(connection_string):
     """
     Get list of tables and their basic information
     
+    The listing comes from a single pg_catalog query rather than inspector
+    calls per schema and per table, so it costs one round trip whatever
+    the number of tables.
+    
     Args:
         connection_string (str): Database connection string or parameters
         
@@ -493,32 +803,171 @@ def get_table_info(connection_string):
         if isinstance(engine, dict) and 'error' in engine:
             return []
         
-        inspector = inspect(engine)
-        tables = []
+        with engine.connect() as conn:
+            rows = conn.execute(TABLE_INFO_SQL).all()
+        
+        return [
+            {
+                'schema': row.schema,
+                'name': row.name,
+                'column_count': row.column_count,
+                'primary_key': list(row.primary_key),
+                'full_name': f"{row.schema}.{row.name}" if row.schema != 'public' else row.name
+            }
+            for row in rows
+        ]
         
-        # Get all schemas
-        schemas = inspector.get_schema_names()
+    except Exception as e:
+        logger.error(f"Error getting table info: {str(e)}")
+        return []
+
+# Storage and activity statistics of user tables, in one round trip for one table or all of them.
+# Sizes are in bytes; heap is the main fork only, TOAST includes the TOAST index. reltuples is -1
+# for a table never vacuumed or analyzed. Partitioned parents hold no storage of their own.
+TABLE_STATS_SQL = text("""
+    SELECT n.nspname AS schema,
+           c.relname AS name,
+           size.total_bytes,
+           size.heap_bytes,
+           size.index_bytes,
+           size.toast_bytes,
+           CAST(NULLIF(c.reltuples, -1) AS bigint) AS estimated_rows,
+           s.n_live_tup AS live_tuples,
+           s.n_dead_tup AS dead_tuples,
+           s.last_vacuum,
+           s.last_autovacuum,
+           s.last_analyze,
+           s.last_autoanalyze,
+           s.vacuum_count,
+           s.autovacuum_count,
+           s.analyze_count,
+           s.autoanalyze_count,
+           s.seq_scan,
+           s.seq_tup_read,
+           s.idx_scan,
+           s.idx_tup_fetch,
+           s.n_tup_ins AS inserts,
+           s.n_tup_upd AS updates,
+           s.n_tup_del AS deletes,
+           s.n_tup_hot_upd AS hot_updates
+      FROM pg_class c
+      JOIN pg_namespace n ON n.oid = c.relnamespace
+      LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+     CROSS JOIN LATERAL (
+           SELECT pg_total_relation_size(c.oid) AS total_bytes,
+                  pg_relation_size(c.oid) AS heap_bytes,
+                  pg_indexes_size(c.oid) AS index_bytes,
+                  COALESCE(pg_total_relation_size(NULLIF(c.reltoastrelid, 0)), 0) AS toast_bytes
+           ) size
+     WHERE c.relkind IN ('r', 'p', 'm')
+       AND n.nspname NOT LIKE 'pg\\_%'
+       AND n.nspname <> 'information_schema'
+       AND (CAST(:table_name AS text) IS NULL
+            OR (c.relname = :table_name AND n.nspname = COALESCE(CAST(:schema_name AS text), current_schema())))
+     ORDER BY size.total_bytes DESC, n.nspname, c.relname
+""")
+
+def ratio(part, whole):
+    return round(part / whole, 4) if part is not None and whole else None
+
+def format_table_stats(row):
+    """
+    Format a row of TABLE_STATS_SQL, adding the derived ratios
+    
+    Args:
+        row (Row): Result row
         
-        for schema in schemas:
-            # Skip system schemas
-            if schema in ['pg_catalog', 'information_schema']:
-                continue
-                
-            for table_name in inspector.get_table_names(schema=schema):
-                # Get basic information about the table
-                columns = inspector.get_columns(table_name, schema=schema)
-                pk = inspector.get_pk_constraint(table_name, schema=schema)
-                
-                tables.append({
-                    'schema': schema,
-                    'name': table_name,
-                    'column_count': len(columns),
-                    'primary_key': pk.get('constrained_columns', []),
-                    'full_name': f"{schema}.{table_name}" if schema != 'public' else table_name
-                })
+    Returns:
+        dict: Table statistics; timestamps as ISO 8601 strings, counters None if the table has no activity statistics
+    """
+    stats = dict(row._mapping)
+    
+    for key in ('last_vacuum', 'last_autovacuum', 'last_analyze', 'last_autoanalyze'):
+        if stats[key] is not None:
+            stats[key] = stats[key].isoformat()
+    
+    stats['full_name'] = f"{row.schema}.{row.name}" if row.schema != 'public' else row.name
+    stats['dead_tuple_ratio'] = ratio(row.dead_tuples, (row.live_tuples or 0) + (row.dead_tuples or 0))
+    stats['index_scan_ratio'] = ratio(row.idx_scan, (row.seq_scan or 0) + (row.idx_scan or 0))
+    stats['hot_update_ratio'] = ratio(row.hot_updates, row.updates)
+    
+    return stats
+
+def query_table_stats(engine, table_name=None):
+    """
+    Get storage and health statistics of one table or of every user table
+    
+    Args:
+        engine (Engine): SQLAlchemy engine
+        table_name (str, optional): Name of the table, optionally schema-qualified; all tables if omitted
         
-        return tables
+    Returns:
+        list: Statistics per table, largest first
+    """
+    schema, table = split_table_name(table_name) if table_name else (None, None)
+    
+    with engine.connect() as conn:
+        rows = conn.execute(TABLE_STATS_SQL, {'table_name': table, 'schema_name': schema}).all()
+    
+    return [format_table_stats(row) for row in rows]
+
+def add_table_stats(engine, table_name, analysis):
+    """
+    Attach the table's current storage and health statistics to an analysis
+    
+    The statistics change with every write, so they are read on each call
+    and never cached with the analysis.
+    
+    Args:
+        engine (Engine): SQLAlchemy engine
+        table_name (str): Name of the table, optionally schema-qualified
+        analysis (dict): Schema analysis of the table
         
+    Returns:
+        dict: The analysis with a 'storage' entry, None if the statistics cannot be read
+    """
+    try:
+        tables = query_table_stats(engine, table_name)
+        storage = tables[0] if tables else None
     except Exception as e:
-        logger.error(f"Error getting table info: {str(e)}")
-        return []
+        logger.warning(f"Error reading table statistics: {str(e)}")
+        storage = None
+    
+    return dict(analysis, storage=storage)
+
+def get_table_stats(connection_string, table_name=None):
+    """
+    Get storage and health statistics of one table or of the whole database
+    
+    Sizes, tuple estimates, live and dead tuples, (auto)vacuum and analyze
+    history, scan counts and HOT update ratio all come from one query.
+    
+    Args:
+        connection_string (str): Database connection string or parameters
+        table_name (str, optional): Name of the table, optionally schema-qualified; all tables if omitted
+        
+    Returns:
+        dict: Statistics per table, largest first, with database totals
+    """
+    try:
+        # Create connection
+        engine = create_database_connection(connection_string)
+        
+        if isinstance(engine, dict) and 'error' in engine:
+            return engine
+        
+        tables = query_table_stats(engine, table_name)
+        
+        if table_name and not tables:
+            return {'error': f"Table '{table_name}' not found in the database."}
+        
+        return {
+            'tables': tables,
+            'table_count': len(tables),
+            'total_bytes': sum(table['total_bytes'] for table in tables),
+            'dead_tuples': sum(table['dead_tuples'] or 0 for table in tables)
+        }
+        
+    except Exception as e:
+        logger.error(f"Error getting table statistics: {str(e)}")
+        return {'error': f"Error getting table statistics: {str(e)}"}
@@ -21,6 +21,12 @@ document.addEventListener('DOMContentLoaded', function() {
   
   // Setup copy buttons for code blocks
   setupCopyButtons();
+  
+  // Suggestions while typing in search boxes
+  setupTypeahead();
+  
+  // Server log upload on the error troubleshooter
+  setupLogAnalysis();
 });
 
 /**
@@ -253,6 +259,12 @@ function displaySchemaAnalysis(data, container) {
     `;
   }
   
+  // Generate storage and health display
+  let storageHtml = '';
+  if (data.storage) {
+    storageHtml = displayTableStorage(data.storage);
+  }
+
   // Generate CREATE TABLE SQL
   let sqlHtml = '';
   if (data.create_table_sql) {
@@ -291,6 +303,7 @@ function displaySchemaAnalysis(data, container) {
         ${columnsHtml}
         ${fkHtml}
         ${indexesHtml}
+        ${storageHtml}
         ${sqlHtml}
         ${sampleDataHtml}
       </div>
@@ -303,6 +316,58 @@ function displaySchemaAnalysis(data, container) {
   setupCopyButtons();
 }
 
+/**
+ * Format a size in bytes with binary units
+ */
+function formatBytes(bytes) {
+  const units = ['bytes', 'KiB', 'MiB', 'GiB', 'TiB'];
+  let value = bytes;
+  let unit = 0;
+  while (value >= 1024 && unit < units.length - 1) {
+    value /= 1024;
+    unit++;
+  }
+  return unit === 0 ? `${value} bytes` : `${value.toFixed(1)} ${units[unit]}`;
+}
+
+/**
+ * Render the storage and health statistics of a table
+ */
+function displayTableStorage(storage) {
+  const value = item => item === null || item === undefined ? '-' : item;
+  const percent = ratio => ratio === null || ratio === undefined ? '' : ` (${(ratio * 100).toFixed(1)}%)`;
+  const row = (label, content) => `<tr><td>${label}</td><td class="text-end">${content}</td></tr>`;
+
+  return `
+    <h6 class="mt-4">Storage &amp; Health:</h6>
+    <div class="row">
+      <div class="col-md-6">
+        <table class="table table-sm">
+          <tbody>
+            ${row('Total size', formatBytes(storage.total_bytes))}
+            ${row('Heap', formatBytes(storage.heap_bytes))}
+            ${row('Indexes', formatBytes(storage.index_bytes))}
+            ${row('TOAST', formatBytes(storage.toast_bytes))}
+            ${row('Estimated rows', storage.estimated_rows === null ? 'never analyzed' : storage.estimated_rows)}
+            ${row('Live / dead tuples', `${value(storage.live_tuples)} / ${value(storage.dead_tuples)}${percent(storage.dead_tuple_ratio).replace(')', ' dead)')}`)}
+          </tbody>
+        </table>
+      </div>
+      <div class="col-md-6">
+        <table class="table table-sm">
+          <tbody>
+            ${row('Last vacuum / autovacuum', `${value(storage.last_vacuum)} / ${value(storage.last_autovacuum)}`)}
+            ${row('Last analyze / autoanalyze', `${value(storage.last_analyze)} / ${value(storage.last_autoanalyze)}`)}
+            ${row('Sequential / index scans', `${value(storage.seq_scan)} / ${value(storage.idx_scan)}`)}
+            ${row('Rows read by sequential scans', value(storage.seq_tup_read))}
+            ${row('HOT updates', `${value(storage.hot_updates)} of ${value(storage.updates)}${percent(storage.hot_update_ratio)}`)}
+          </tbody>
+        </table>
+      </div>
+    </div>
+  `;
+}
+
 /**
  * Display documentation search results
  */
@@ -419,6 +484,195 @@ function setupCopyButtons() {
   });
 }
 
+/**
+ * Setup typeahead suggestions for inputs with a data-typeahead URL
+ */
+function setupTypeahead() {
+  const inputs = document.querySelectorAll('input[data-typeahead]');
+  
+  inputs.forEach(input => {
+    const datalist = document.getElementById(input.getAttribute('list'));
+    if (!datalist) return;
+    
+    let controller = null;
+    
+    input.addEventListener('input', function() {
+      const query = this.value.trim();
+      
+      // Only the latest keystroke's suggestions matter
+      if (controller) controller.abort();
+      
+      if (!query) {
+        datalist.innerHTML = '';
+        return;
+      }
+      
+      controller = new AbortController();
+      
+      fetch(`${input.dataset.typeahead}?q=${encodeURIComponent(query)}&limit=8`, { signal: controller.signal })
+        .then(response => response.json())
+        .then(data => {
+          datalist.innerHTML = '';
+          (data.suggestions || []).forEach(suggestion => {
+            const option = document.createElement('option');
+            option.value = suggestion.label;
+            option.label = suggestion.kind;
+            datalist.appendChild(option);
+          });
+        })
+        .catch(error => {
+          if (error.name !== 'AbortError') {
+            console.error('Typeahead error:', error);
+          }
+        });
+    });
+  });
+}
+
+/**
+ * Setup the server log analysis form, which uploads a file and so cannot be sent as JSON
+ */
+function setupLogAnalysis() {
+  const form = document.getElementById('logForm');
+  if (!form) return;
+  
+  const submitButton = form.querySelector('button[type="submit"]');
+  const resultContainer = document.getElementById(form.dataset.resultContainer);
+  const originalText = submitButton.innerHTML;
+  
+  form.addEventListener('submit', function(e) {
+    e.preventDefault();
+    
+    submitButton.disabled = true;
+    submitButton.innerHTML = '<span class="spinner-border spinner-border-sm" role="status" aria-hidden="true"></span> Analyzing...';
+    
+    fetch(form.action, { method: 'POST', body: new FormData(form) })
+      .then(response => response.json())
+      .then(data => {
+        if (!data.error && form.elements.mode.value === 'slow_queries') {
+          displaySlowQueryReport(data, resultContainer);
+        } else {
+          displayLogAnalysis(data, resultContainer);
+        }
+      })
+      .catch(error => {
+        console.error('Error:', error);
+        resultContainer.innerHTML = `<div class="alert alert-danger">An error occurred: ${error.message}</div>`;
+      })
+      .finally(() => {
+        submitButton.disabled = false;
+        submitButton.innerHTML = originalText;
+      });
+  });
+}
+
+/**
+ * Escape text taken from analyzed data before inserting it as HTML
+ */
+function escapeHtml(text) {
+  const element = document.createElement('span');
+  element.textContent = text;
+  return element.innerHTML;
+}
+
+/**
+ * Display aggregated server log errors
+ */
+function displayLogAnalysis(data, container) {
+  if (data.error) {
+    container.innerHTML = `<div class="alert alert-danger">${escapeHtml(data.error)}</div>`;
+    return;
+  }
+  
+  const countTable = (title, rows) => `
+    <div class="col-md-6 mb-3">
+      <h6 class="text-muted">${title}</h6>
+      <table class="table table-sm table-dark mb-0">
+        <tbody>
+          ${rows.length ? rows.map(([label, count]) => `
+            <tr><td>${escapeHtml(label)}</td><td class="text-end">${count}</td></tr>
+          `).join('') : '<tr><td class="text-muted">None</td></tr>'}
+        </tbody>
+      </table>
+    </div>
+  `;
+  const ranked = counts => Object.entries(counts).sort((a, b) => b[1] - a[1]).slice(0, 10);
+  
+  container.innerHTML = `
+    <div class="card border-info mb-4">
+      <div class="card-header bg-info bg-opacity-25">
+        <h5 class="mb-0">Log Analysis: ${data.errors} errors in ${data.entries} entries</h5>
+      </div>
+      <div class="card-body">
+        <p class="text-muted small">
+          ${escapeHtml(data.format)} log, ${(data.bytes / 1048576).toFixed(1)} MB in ${data.elapsed}s
+        </p>
+        <div class="row">
+          ${countTable('By Category', ranked(data.categories))}
+          ${countTable('By SQLSTATE', data.sqlstates.slice(0, 10).map(item => [
+            item.code ? `${item.code}${item.condition ? ' ' + item.condition : ''}` : 'unknown', item.count
+          ]))}
+          ${countTable('By User', ranked(data.users))}
+          ${countTable('By Database', ranked(data.databases))}
+          ${countTable(`Errors per ${data.bucket}`, data.timeline.map(item => [item.bucket || 'unknown', item.count]))}
+        </div>
+      </div>
+    </div>
+  `;
+}
+
+/**
+ * Display slow statements ranked by total time and calls, and the slowest plans
+ */
+function displaySlowQueryReport(data, container) {
+  const ms = value => value === null ? '-' : `${value.toFixed(1)} ms`;
+  const queryTable = (title, rows) => `
+    <h6 class="text-muted mt-3">${title}</h6>
+    <div class="table-responsive">
+      <table class="table table-sm table-dark">
+        <thead>
+          <tr><th>Query</th><th class="text-end">Calls</th><th class="text-end">Total</th><th class="text-end">p50</th><th class="text-end">p95</th><th class="text-end">p99</th></tr>
+        </thead>
+        <tbody>
+          ${rows.length ? rows.map(row => `
+            <tr>
+              <td><code title="${escapeHtml(row.example)}">${escapeHtml(row.query)}</code></td>
+              <td class="text-end">${row.calls}</td>
+              <td class="text-end">${ms(row.total_ms)}${row.share !== null ? ` (${row.share}%)` : ''}</td>
+              <td class="text-end">${ms(row.p50_ms)}</td>
+              <td class="text-end">${ms(row.p95_ms)}</td>
+              <td class="text-end">${ms(row.p99_ms)}</td>
+            </tr>
+          `).join('') : '<tr><td colspan="6" class="text-muted">No slow statements found</td></tr>'}
+        </tbody>
+      </table>
+    </div>
+  `;
+  
+  container.innerHTML = `
+    <div class="card border-info mb-4">
+      <div class="card-header bg-info bg-opacity-25">
+        <h5 class="mb-0">Slow Queries: ${data.statements} ${data.source} of ${data.queries} queries</h5>
+      </div>
+      <div class="card-body">
+        <p class="text-muted small">
+          ${escapeHtml(data.format)} log, ${(data.bytes / 1048576).toFixed(1)} MB in ${data.elapsed}s &middot;
+          p50 ${ms(data.percentiles.p50_ms)}, p95 ${ms(data.percentiles.p95_ms)}, p99 ${ms(data.percentiles.p99_ms)}
+        </p>
+        ${queryTable('Top Queries by Total Time', data.by_total_time)}
+        ${queryTable('Top Queries by Calls', data.by_calls)}
+        <h6 class="text-muted mt-3">Slowest Plans</h6>
+        ${data.worst_plans.length ? data.worst_plans.map(plan => `
+          <div class="mb-3">
+            <div class="small text-muted">${ms(plan.duration_ms)} &middot; ${escapeHtml(plan.timestamp || '')} ${escapeHtml(plan.user || '')}${plan.database ? '@' + escapeHtml(plan.database) : ''}</div>
+            <pre class="bg-dark text-light p-3 rounded small mb-0">${escapeHtml(plan.plan)}</pre>
+          </div>
+        `).join('') : '<p class="text-muted">No auto_explain plans found.</p>'}
+      </div>
+    </div>
+  `;
+}
+
 /**
  * Dynamic form fields based on query type
  */
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Keep test runs out of the tracked development database; set before the app is imported
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+# Import the application modules from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,58 @@
+import re
+
+from bs4 import BeautifulSoup
+
+from benchmarks.bench_extract import legacy_extract_content
+from utils.doc_parser import extract_content
+
+PAGE = """
+<div id="docContent">
+  <h2>CREATE INDEX</h2>
+  <p>Use <code>CREATE INDEX</code> on a <a href="sql-createtable.html">table</a> column.</p>
+  <ul>
+    <li>See <a href="indexes.html"><code class="literal">Indexes</code></a> for details.</li>
+    <li><p>Nested paragraph.</p></li>
+  </ul>
+  <pre class="programlisting">CREATE INDEX ON t (<code>a</code>);</pre>
+</div>
+"""
+
+LINK_RE = re.compile(r'(\w+) \[([^\]\s]+)\]')
+HREF_RE = re.compile(r' \[([^\]\s]+)\]')
+CODE_BLOCK_RE = re.compile(r'```\n(.*?)\n```', re.DOTALL)
+
+def extract_both(html):
+    element = BeautifulSoup(html, 'html.parser').find(id='docContent')
+    return legacy_extract_content(element), extract_content(element)
+
+def test_links_keep_their_annotation():
+    legacy, content = extract_both(PAGE)
+
+    assert HREF_RE.findall(content) == HREF_RE.findall(legacy)
+    assert LINK_RE.findall(content) == [('table', 'sql-createtable.html'), ('Indexes', 'indexes.html')]
+
+def test_inline_code_keeps_its_code_block():
+    legacy, content = extract_both(PAGE)
+
+    # Code nested in a code block was repeated by the old extractor; everything else is kept
+    assert CODE_BLOCK_RE.findall(content) == ['CREATE INDEX', 'Indexes', 'CREATE INDEX ON t (a);']
+    assert CODE_BLOCK_RE.findall(legacy) == CODE_BLOCK_RE.findall(content) + ['a']
+
+def test_nested_text_is_emitted_once():
+    legacy, content = extract_both(PAGE)
+
+    for text in ('column.', 'for details.', 'Nested paragraph.'):
+        assert legacy.count(text) > 1
+        assert content.count(text) == 1
+
+    assert content == (
+        "\n\n-- CREATE INDEX --\n\n"
+        "UseCREATE INDEXon atablecolumn.\n\n"
+        "```\nCREATE INDEX\n```\n"
+        "table [sql-createtable.html]"
+        "  * SeeIndexesfor details.\n"
+        "Indexes [indexes.html]\n"
+        "```\nIndexes\n```\n"
+        "  * Nested paragraph.\n\n"
+        "```\nCREATE INDEX ON t (a);\n```\n"
+    )
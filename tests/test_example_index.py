@@ -0,0 +1,32 @@
+from utils.example_index import ExampleIndex, classify_example
+
+def test_classify_example_commands():
+    assert classify_example('ALTER DEFAULT PRIVILEGES IN SCHEMA s GRANT SELECT ON TABLES TO r;') == 'ALTER DEFAULT PRIVILEGES'
+    assert classify_example("COMMENT ON TABLE t IS 'x';") == 'COMMENT'
+    assert classify_example('CREATE UNIQUE INDEX i ON t (a);') == 'CREATE INDEX'
+    assert classify_example('CREATE OR REPLACE FUNCTION f() RETURNS int AS $$ SELECT 1 $$ LANGUAGE sql;') == 'CREATE FUNCTION'
+
+EXAMPLES = [
+    "CREATE UNIQUE INDEX orders_code ON orders (code);",
+    "CREATE INDEX orders_qty ON orders (qty);",
+    "SELECT jsonb_agg(o) FROM orders o;",
+    "SELECT count(*) FROM orders;",
+    "INSERT INTO orders (code) VALUES ('a') RETURNING id;",
+    "INSERT INTO orders (code) VALUES ('b');",
+]
+
+def build_index():
+    return ExampleIndex([[sql, 'https://example.com/page.html', classify_example(sql)] for sql in EXAMPLES])
+
+def found(query):
+    return [example['sql'] for example in build_index().search(query)]
+
+def test_search_strips_command_modifiers():
+    assert sorted(found('create unique index')) == sorted(EXAMPLES[:2])
+
+def test_search_ignores_sql_keywords_in_terms():
+    assert found('select jsonb_agg') == [EXAMPLES[2]]
+    assert found('jsonb_agg orders') == [EXAMPLES[2]]
+
+def test_search_keyword_only_query():
+    assert found('insert returning') == [EXAMPLES[4]]
@@ -0,0 +1,9 @@
+from utils.log_parser import normalize_query
+
+def test_in_lists_collapse_whatever_their_length():
+    assert normalize_query("SELECT * FROM t WHERE id IN (1)") == "select * from t where id in (...)"
+    assert normalize_query("SELECT * FROM t WHERE id IN (1, 2, 3)") == "select * from t where id in (...)"
+    assert normalize_query("SELECT * FROM t WHERE id IN ($1)") == normalize_query("SELECT * FROM t WHERE id IN ($1, $2)")
+
+def test_multi_row_values_collapse():
+    assert normalize_query("INSERT INTO t VALUES (1, 'a'), (2, 'b');") == "insert into t values (...)"
@@ -0,0 +1,169 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+CachedPage = namedtuple('CachedPage', ['url', 'body', 'etag', 'last_modified', 'fetched_at'])
+
+SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS doc_pages (
+        url TEXT PRIMARY KEY,
+        body TEXT NOT NULL,
+        etag TEXT,
+        last_modified TEXT,
+        fetched_at REAL NOT NULL
+    )
+"""
+
+class DocCache:
+    """
+    Persistent documentation page cache backed by SQLite
+
+    The database runs in WAL mode so every worker process on a host can
+    share one file: readers never block each other or the writer. Entries
+    keep the upstream ETag/Last-Modified validators so stale pages can be
+    revalidated with a conditional GET instead of downloaded again.
+
+    Counters are kept per process.
+    """
+
+    def __init__(self, path, max_age):
+        self.path = path
+        self.max_age = max_age
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'revalidations': 0,
+            'refreshes': 0,
+            'stale_served': 0,
+            'bytes_saved': 0
+        }
+
+    def _connection(self):
+        """
+        Get the SQLite connection for the current thread and process
+        """
+        conn = getattr(self._local, 'conn', None)
+
+        # Connections must not be shared across a fork (gunicorn preload)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(SCHEMA_SQL)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+
+        return conn
+
+    def record(self, stat, body=None):
+        """
+        Increment a cache counter
+
+        Args:
+            stat (str): Counter name
+            body (str, optional): Page body served without a download, counted as bytes saved
+        """
+        with self._stats_lock:
+            self._stats[stat] += 1
+            if body is not None:
+                self._stats['bytes_saved'] += len(body)
+
+    def is_fresh(self, page):
+        """
+        Check whether a cached page can be served without revalidation
+
+        Args:
+            page (CachedPage): The cached page
+
+        Returns:
+            bool: True if the page is younger than the maximum age
+        """
+        return time.time() - page.fetched_at < self.max_age
+
+    def get(self, url):
+        """
+        Look up a page
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            CachedPage or None: The cached page or None if not cached
+        """
+        try:
+            row = self._connection().execute(
+                "SELECT url, body, etag, last_modified, fetched_at FROM doc_pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading documentation cache: {str(e)}")
+            return None
+
+        return CachedPage(*row) if row else None
+
+    def put(self, url, body, etag=None, last_modified=None):
+        """
+        Store or replace a page
+
+        Args:
+            url (str): Page URL
+            body (str): Page HTML
+            etag (str, optional): ETag response header
+            last_modified (str, optional): Last-Modified response header
+        """
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO doc_pages (url, body, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, time.time())
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Error writing documentation cache: {str(e)}")
+
+    def touch(self, url):
+        """
+        Mark a page as freshly validated after a 304 Not Modified
+
+        Args:
+            url (str): Page URL
+        """
+        try:
+            self._connection().execute(
+                "UPDATE doc_pages SET fetched_at = ? WHERE url = ?",
+                (time.time(), url)
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Error updating documentation cache: {str(e)}")
+
+    def stats(self):
+        """
+        Get cache statistics
+
+        Returns:
+            dict: Per-process counters plus the size of the shared cache
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        # Revalidations and refreshes happen in the background after a stale hit
+        lookups = stats['hits'] + stats['stale_served'] + stats['misses']
+        stats['hit_ratio'] = round((stats['hits'] + stats['stale_served']) / lookups, 4) if lookups else 0.0
+
+        try:
+            entries, total_bytes = self._connection().execute(
+                "SELECT count(*), coalesce(sum(length(body)), 0) FROM doc_pages"
+            ).fetchone()
+            stats['entries'] = entries
+            stats['bytes'] = total_bytes
+        except sqlite3.Error as e:
+            logger.error(f"Error reading documentation cache stats: {str(e)}")
+
+        return stats
@@ -0,0 +1,266 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from urllib.parse import urldefrag
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from config import POSTGRESQL_DOC_BASE_URL, DOC_MIRROR_DIR
+from utils.doc_parser import find_related_docs, PERSISTENT_DOC_CACHE
+from utils.http_client import http_client
+from utils.process_pool import pool_context
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = '_manifest.json'
+
+def _parse_links(url, html_content):
+    """
+    Extract in-scope documentation links from a page (runs in a worker process)
+
+    Args:
+        url (str): URL of the page
+        html_content (str): HTML content of the page
+
+    Returns:
+        list: Sorted, de-duplicated absolute URLs without fragments
+    """
+    return sorted({urldefrag(link['url'])[0] for link in find_related_docs(html_content, url)})
+
+class DocCrawler:
+    """
+    Crawl the documentation site into a local mirror
+
+    Pages are fetched concurrently by a bounded thread pool that goes
+    through the shared rate-limited HTTP client, and parsed for links in a
+    process pool. Every page is written to the mirror directory and the
+    persistent documentation cache, so it can be served without network.
+
+    A manifest in the mirror directory records validators, content hashes
+    and outgoing links of every page: incremental crawls send conditional
+    GETs and skip parsing and writing pages that have not changed.
+    """
+
+    def __init__(self, start_url=POSTGRESQL_DOC_BASE_URL, mirror_dir=DOC_MIRROR_DIR, source_dir=None,
+                 workers=8, parse_workers=None, incremental=True, max_pages=None):
+        """
+        Args:
+            start_url (str): First page, or a directory URL for its index.html; only pages under its directory are crawled
+            mirror_dir (str): Directory the pages and manifest are written to
+            source_dir (str, optional): Read pages from this local mirror instead of the network
+            workers (int): Concurrent fetches
+            parse_workers (int, optional): Parser processes, defaults to the CPU count
+            incremental (bool): Reuse the manifest to skip unchanged pages
+            max_pages (int, optional): Stop after this many pages
+        """
+        self.start_url = self._page_url(start_url)
+        self.base_url = self.start_url.rsplit('/', 1)[0] + '/'
+        self.mirror_dir = mirror_dir
+        self.source_dir = source_dir
+        self.workers = workers
+        self.parse_workers = parse_workers
+        self.incremental = incremental
+        self.max_pages = max_pages
+
+        if self._relative_path(self.start_url) is None:
+            raise ValueError(f"Start URL is not an HTML documentation page: {start_url}")
+
+        self.manifest_path = os.path.join(mirror_dir, MANIFEST_NAME)
+        self.manifest = self._load_manifest() if incremental else {}
+        self.stats = {'fetched': 0, 'changed': 0, 'unchanged': 0, 'errors': 0}
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self):
+        os.makedirs(self.mirror_dir, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, separators=(',', ':'))
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def _page_url(url):
+        """
+        Map a directory URL such as .../docs/current/ to its index page
+        """
+        return url + 'index.html' if url.endswith('/') else url
+
+    def _relative_path(self, url):
+        """
+        Map an in-scope URL to its path in a mirror directory, None if out of scope
+        """
+        if not url.startswith(self.base_url):
+            return None
+
+        path = url[len(self.base_url):].split('?', 1)[0]
+        if not path.endswith(('.html', '.htm')) or '..' in path.split('/'):
+            return None
+
+        return path
+
+    def _fetch(self, url):
+        """
+        Fetch one page (runs in a fetch thread)
+
+        Returns:
+            tuple: (HTML content or None if unchanged, response headers)
+        """
+        entry = self.manifest.get(url)
+
+        if self.source_dir:
+            with open(os.path.join(self.source_dir, self._relative_path(url)), encoding='utf-8', errors='replace') as f:
+                return f.read(), {}
+
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = http_client.get(url, headers=headers)
+        if entry and response.status_code == 304:
+            return None, response.headers
+
+        response.raise_for_status()
+        return response.text, response.headers
+
+    def _refresh_validators(self, url, headers):
+        """
+        Record the validators of an unchanged page so later crawls send current ones
+        """
+        entry = self.manifest[url]
+        if headers.get('ETag'):
+            entry['etag'] = headers['ETag']
+        if headers.get('Last-Modified'):
+            entry['last_modified'] = headers['Last-Modified']
+
+    def _store(self, url, html_content, headers):
+        """
+        Write a changed page to the mirror and the persistent cache
+
+        Returns:
+            bool: True if the content differs from the previous crawl
+        """
+        digest = hashlib.sha1(html_content.encode('utf-8')).hexdigest()
+        entry = self.manifest.get(url)
+
+        if entry and entry.get('sha1') == digest:
+            self._refresh_validators(url, headers)
+            return False
+
+        path = os.path.join(self.mirror_dir, self._relative_path(url))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+
+        if PERSISTENT_DOC_CACHE:
+            PERSISTENT_DOC_CACHE.put(
+                url,
+                html_content,
+                etag=headers.get('ETag'),
+                last_modified=headers.get('Last-Modified')
+            )
+
+        self.manifest[url] = {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'sha1': digest,
+            'links': (entry or {}).get('links', [])
+        }
+        return True
+
+    def crawl(self):
+        """
+        Run the crawl
+
+        Returns:
+            dict: Counts of fetched, changed, unchanged and failed pages plus elapsed seconds
+        """
+        start = time.monotonic()
+        seen = {self.start_url}
+        pending = {}
+
+        try:
+            self._crawl(seen, pending)
+        finally:
+            # Keep the progress made so far even if the crawl is interrupted
+            self._save_manifest()
+
+        self.stats['elapsed_seconds'] = round(time.monotonic() - start, 2)
+        return self.stats
+
+    def _crawl(self, seen, pending):
+        # The fetch threads are already running when parser processes start, so the parsers must not be forked
+        with ThreadPoolExecutor(max_workers=self.workers) as fetchers, \
+                ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=pool_context()) as parsers:
+
+            def enqueue(urls):
+                for link in map(self._page_url, urls):
+                    if link in seen or self._relative_path(link) is None:
+                        continue
+                    if self.max_pages and len(seen) >= self.max_pages:
+                        return
+                    seen.add(link)
+                    pending[fetchers.submit(self._fetch, link)] = ('fetch', link)
+
+            pending[fetchers.submit(self._fetch, self.start_url)] = ('fetch', self.start_url)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    kind, url = pending.pop(future)
+
+                    if kind == 'fetch':
+                        try:
+                            html_content, headers = future.result()
+                            changed = html_content is not None and self._store(url, html_content, headers)
+                        except Exception as e:
+                            logger.error(f"Error crawling documentation page {url}: {str(e)}")
+                            self.stats['errors'] += 1
+                            continue
+
+                        self.stats['fetched'] += 1
+
+                        if changed:
+                            self.stats['changed'] += 1
+                            pending[parsers.submit(_parse_links, url, html_content)] = ('parse', url)
+                        else:
+                            # Unchanged: follow the links recorded by the previous crawl
+                            if html_content is None:
+                                self._refresh_validators(url, headers)
+                            self.stats['unchanged'] += 1
+                            enqueue(self.manifest.get(url, {}).get('links', []))
+                    else:
+                        try:
+                            links = future.result()
+                        except Exception as e:
+                            logger.error(f"Error parsing documentation page {url}: {str(e)}")
+                            self.stats['errors'] += 1
+                            # Forget the hash so the next incremental crawl parses the page again
+                            self.manifest[url].pop('sha1', None)
+                            continue
+
+                        self.manifest[url]['links'] = links
+                        enqueue(links)
+
+def crawl_docs(**kwargs):
+    """
+    Crawl the documentation into the local mirror
+
+    Args:
+        **kwargs: DocCrawler options
+
+    Returns:
+        dict: Crawl statistics
+    """
+    stats = DocCrawler(**kwargs).crawl()
+    logger.info(f"Documentation crawl finished: {stats}")
+    return stats
@@ -0,0 +1,294 @@
+import os
+import json
+import logging
+import threading
+from array import array
+from urllib.parse import urldefrag
+
+from config import DOC_GRAPH_PATH, POSTGRESQL_DOC_BASE_URL
+from utils.doc_parser import find_related_docs
+from utils.doc_index import iter_snapshot_pages, TITLE_PREFIX_RE
+from utils.html_parser import extract_title
+
+logger = logging.getLogger(__name__)
+
+GRAPH_FORMAT_VERSION = 1
+
+# PageRank parameters
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-9
+
+def _csr(edges, node_count):
+    """
+    Pack (source, target) pairs into compressed sparse row arrays
+
+    Args:
+        edges (list): (source, target) node id pairs
+        node_count (int): Number of nodes
+
+    Returns:
+        tuple: (offsets, targets) arrays; the neighbours of node i are targets[offsets[i]:offsets[i + 1]]
+    """
+    offsets = array('i', [0]) * (node_count + 1)
+    for source, _ in edges:
+        offsets[source + 1] += 1
+    for node in range(node_count):
+        offsets[node + 1] += offsets[node]
+
+    targets = array('i', [0]) * len(edges)
+    fill = array('i', offsets[:-1])
+    for source, target in edges:
+        targets[fill[source]] = target
+        fill[source] += 1
+
+    return offsets, targets
+
+def pagerank(out_offsets, out_targets, in_offsets, in_targets, damping=DAMPING,
+             max_iterations=MAX_ITERATIONS, tolerance=TOLERANCE):
+    """
+    Compute PageRank by power iteration over CSR adjacency arrays
+
+    Rank of pages without outgoing links is spread evenly over all pages.
+
+    Returns:
+        array: Rank per node, summing to 1
+    """
+    node_count = len(out_offsets) - 1
+    if node_count == 0:
+        return array('d')
+
+    out_degree = [out_offsets[node + 1] - out_offsets[node] for node in range(node_count)]
+    ranks = [1.0 / node_count] * node_count
+    base = (1.0 - damping) / node_count
+
+    for _ in range(max_iterations):
+        shares = [rank / degree if degree else 0.0 for rank, degree in zip(ranks, out_degree)]
+        dangling = sum(rank for rank, degree in zip(ranks, out_degree) if not degree)
+        teleport = base + damping * dangling / node_count
+
+        new_ranks = [
+            teleport + damping * sum(shares[source] for source in in_targets[in_offsets[node]:in_offsets[node + 1]])
+            for node in range(node_count)
+        ]
+
+        delta = sum(abs(new - old) for new, old in zip(new_ranks, ranks))
+        ranks = new_ranks
+        if delta < tolerance:
+            break
+
+    return array('d', ranks)
+
+class DocGraph:
+    """
+    Link graph of the documentation pages with a PageRank authority per page
+
+    Outgoing and incoming links are stored as compressed sparse row arrays,
+    so the graph of the whole manual takes a few hundred kilobytes.
+    """
+
+    def __init__(self, urls, titles, edges):
+        """
+        Args:
+            urls (list): Page URL per node id
+            titles (list): Page title per node id
+            edges (list): (source, target) node id pairs, without duplicates
+        """
+        self.urls = urls
+        self.titles = titles
+        self.node_ids = {url: node for node, url in enumerate(urls)}
+
+        self.out_offsets, self.out_targets = _csr(edges, len(urls))
+        self.in_offsets, self.in_targets = _csr([(target, source) for source, target in edges], len(urls))
+        self.ranks = pagerank(self.out_offsets, self.out_targets, self.in_offsets, self.in_targets)
+
+        # Authority relative to the average page, so 1.0 means "as linked-to as usual"
+        self._scale = len(urls)
+
+    def __len__(self):
+        return len(self.urls)
+
+    @property
+    def edge_count(self):
+        return len(self.out_targets)
+
+    @classmethod
+    def build(cls, pages, base_url=POSTGRESQL_DOC_BASE_URL):
+        """
+        Build the graph from documentation pages
+
+        Args:
+            pages (iterable): (file name, HTML content) pairs
+            base_url (str): URL the file names are relative to
+
+        Returns:
+            DocGraph: The built graph
+        """
+        titles = {}
+        links = {}
+
+        for file_name, html_content in pages:
+            url = f"{base_url}{file_name}"
+            titles[url] = TITLE_PREFIX_RE.sub('', extract_title(html_content) or '') or file_name
+            links[url] = {urldefrag(link['url'])[0] for link in find_related_docs(html_content, url)}
+
+        urls = sorted(titles)
+        node_ids = {url: node for node, url in enumerate(urls)}
+
+        # Only links between pages of the snapshot; self links carry no authority
+        edges = [
+            (node_ids[url], node_ids[target])
+            for url in urls
+            for target in sorted(links[url])
+            if target != url and target in node_ids
+        ]
+
+        return cls(urls, [titles[url] for url in urls], edges)
+
+    def authority(self, url):
+        """
+        Get the authority of a page
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            float: PageRank relative to the average page, 0.0 for unknown pages
+        """
+        node = self.node_ids.get(urldefrag(url)[0])
+        return self.ranks[node] * self._scale if node is not None else 0.0
+
+    def related(self, url, limit=8):
+        """
+        Get the pages linked from or to a page, most authoritative first
+
+        Pages linking both ways come before one-way neighbours.
+
+        Args:
+            url (str): Page URL
+            limit (int): Maximum number of pages
+
+        Returns:
+            list: A list of dict containing title, url and authority
+        """
+        node = self.node_ids.get(urldefrag(url)[0])
+        if node is None:
+            return []
+
+        outgoing = set(self.out_targets[self.out_offsets[node]:self.out_offsets[node + 1]])
+        incoming = set(self.in_targets[self.in_offsets[node]:self.in_offsets[node + 1]])
+        mutual = outgoing & incoming
+
+        neighbours = sorted(
+            outgoing | incoming,
+            key=lambda other: (other in mutual, self.ranks[other]),
+            reverse=True
+        )
+
+        return [
+            {
+                'title': self.titles[other],
+                'url': self.urls[other],
+                'authority': round(self.ranks[other] * self._scale, 3)
+            }
+            for other in neighbours[:limit]
+        ]
+
+    def save(self, path):
+        """
+        Write the graph to a JSON file; ranks are recomputed on load
+
+        Args:
+            path (str): Destination file path
+        """
+        edges = [
+            [source, target]
+            for source in range(len(self.urls))
+            for target in self.out_targets[self.out_offsets[source]:self.out_offsets[source + 1]]
+        ]
+        data = {
+            'format': GRAPH_FORMAT_VERSION,
+            'urls': self.urls,
+            'titles': self.titles,
+            'edges': edges
+        }
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load the graph from a JSON file
+
+        Args:
+            path (str): Graph file path
+
+        Returns:
+            DocGraph: The loaded graph
+        """
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        if data.get('format') != GRAPH_FORMAT_VERSION:
+            raise ValueError(f"Unsupported documentation graph format: {data.get('format')}")
+
+        return cls(data['urls'], data['titles'], [tuple(edge) for edge in data['edges']])
+
+# Loaded graph, shared by all request threads
+_DOC_GRAPH = None
+_DOC_GRAPH_MTIME = None
+_DOC_GRAPH_LOCK = threading.Lock()
+
+def build_doc_graph(source_dir, output_path=DOC_GRAPH_PATH, base_url=POSTGRESQL_DOC_BASE_URL):
+    """
+    Build the documentation link graph from a snapshot directory and save it
+
+    Args:
+        source_dir (str): Directory containing the documentation HTML files
+        output_path (str): Where to write the graph
+        base_url (str): URL the snapshot file names are relative to
+
+    Returns:
+        DocGraph: The built graph
+    """
+    graph = DocGraph.build(iter_snapshot_pages(source_dir), base_url=base_url)
+    graph.save(output_path)
+    logger.info(f"Built documentation graph with {len(graph)} pages and {graph.edge_count} links")
+    return graph
+
+def get_doc_graph(path=DOC_GRAPH_PATH):
+    """
+    Get the prebuilt documentation link graph, loading it on first use or after a rebuild
+
+    Args:
+        path (str): Graph file path
+
+    Returns:
+        DocGraph or None: The graph or None if it has not been built
+    """
+    global _DOC_GRAPH, _DOC_GRAPH_MTIME
+
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    if _DOC_GRAPH is not None and mtime == _DOC_GRAPH_MTIME:
+        return _DOC_GRAPH
+
+    with _DOC_GRAPH_LOCK:
+        if _DOC_GRAPH is None or mtime != _DOC_GRAPH_MTIME:
+            try:
+                _DOC_GRAPH = DocGraph.load(path)
+                _DOC_GRAPH_MTIME = mtime
+                logger.info(f"Loaded documentation graph with {len(_DOC_GRAPH)} pages")
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Error loading documentation graph {path}: {str(e)}")
+                return _DOC_GRAPH
+
+    return _DOC_GRAPH
@@ -0,0 +1,314 @@
+import os
+import re
+import json
+import math
+import heapq
+import logging
+import threading
+from collections import Counter
+from operator import itemgetter
+
+from config import DOC_INDEX_PATH, POSTGRESQL_DOC_BASE_URL
+from utils.html_parser import parse_html
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Term frequency weights per field, so matches in titles and headings rank higher
+FIELD_WEIGHTS = {
+    'title': 5.0,
+    'headings': 2.0,
+    'body': 1.0
+}
+
+SNIPPET_LENGTH = 240
+
+TOKEN_RE = re.compile(r"[a-z0-9_]+")
+TITLE_PREFIX_RE = re.compile(r"^PostgreSQL:\s*Documentation:\s*[^:]+:\s*")
+WHITESPACE_RE = re.compile(r"\s+")
+
+STOPWORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'for', 'from', 'if', 'in',
+    'into', 'is', 'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was',
+    'which', 'will', 'with'
+])
+
+# Loaded indexes (one per documentation version), shared by all request threads: path -> (mtime, index)
+_DOC_INDEXES = {}
+_DOC_INDEX_LOCK = threading.Lock()
+
+def tokenize(text):
+    """
+    Split text into lowercase index terms
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        list: List of terms with stopwords removed
+    """
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+def extract_index_fields(html_content):
+    """
+    Extract the searchable fields of a documentation page
+
+    Args:
+        html_content (str): HTML content of the page
+
+    Returns:
+        tuple: (title, headings, body) text of the page
+    """
+    soup = parse_html(html_content)
+
+    title_elem = soup.find('title')
+    title = title_elem.get_text(strip=True) if title_elem else ''
+    title = TITLE_PREFIX_RE.sub('', title)
+
+    # postgresql.org wraps the manual in site chrome; the offline tarball does not
+    content_elem = soup.find(id='docContent') or soup.find('body') or soup
+
+    for nav in content_elem.find_all('div', class_=['navheader', 'navfooter']):
+        nav.decompose()
+
+    headings = ' '.join(h.get_text(' ', strip=True) for h in content_elem.find_all(['h1', 'h2', 'h3']))
+    body = WHITESPACE_RE.sub(' ', content_elem.get_text(' ', strip=True))
+
+    return title, headings, body
+
+def iter_snapshot_pages(source_dir):
+    """
+    Iterate over the HTML pages of a documentation snapshot directory
+
+    Args:
+        source_dir (str): Directory containing the documentation HTML files
+
+    Yields:
+        tuple: (file name, HTML content)
+    """
+    for file_name in sorted(os.listdir(source_dir)):
+        if not file_name.endswith(('.html', '.htm')):
+            continue
+
+        with open(os.path.join(source_dir, file_name), encoding='utf-8', errors='replace') as f:
+            yield file_name, f.read()
+
+class DocIndex:
+    """
+    BM25-ranked inverted index over documentation pages
+
+    Postings are stored as parallel lists of document ids and field-weighted
+    term frequencies, so a query only touches the documents containing its terms.
+    """
+
+    def __init__(self, docs, postings, lengths, base_url=POSTGRESQL_DOC_BASE_URL, k1=BM25_K1, b=BM25_B):
+        self.docs = docs
+        self.postings = postings
+        self.lengths = lengths
+        self.base_url = base_url
+        self.k1 = k1
+        self.b = b
+
+        avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+        # Precompute the per-document length normalisation used by BM25
+        self._norms = [
+            k1 * (1 - b + b * (length / avg_length)) if avg_length else k1
+            for length in lengths
+        ]
+
+    def __len__(self):
+        return len(self.docs)
+
+    @classmethod
+    def build(cls, pages, base_url=POSTGRESQL_DOC_BASE_URL):
+        """
+        Build an index from documentation pages
+
+        Args:
+            pages (iterable): (file name, HTML content) pairs
+            base_url (str): URL the file names are relative to
+
+        Returns:
+            DocIndex: The built index
+        """
+        docs = []
+        lengths = []
+        postings = {}
+
+        for file_name, html_content in pages:
+            title, headings, body = extract_index_fields(html_content)
+
+            if not body and not title:
+                continue
+
+            doc_id = len(docs)
+            docs.append([f"{base_url}{file_name}", title or file_name, body[:SNIPPET_LENGTH]])
+
+            weighted_tf = Counter()
+            length = 0.0
+            for field, text in (('title', title), ('headings', headings), ('body', body)):
+                weight = FIELD_WEIGHTS[field]
+                tokens = tokenize(text)
+                length += weight * len(tokens)
+                for token in tokens:
+                    weighted_tf[token] += weight
+
+            lengths.append(length)
+            for term, tf in weighted_tf.items():
+                posting = postings.setdefault(term, ([], []))
+                posting[0].append(doc_id)
+                posting[1].append(tf)
+
+        return cls(docs, postings, lengths, base_url=base_url)
+
+    def search(self, query, limit=10):
+        """
+        Search the index
+
+        Args:
+            query (str): Free-text search query
+            limit (int): Maximum number of results
+
+        Returns:
+            list: A list of dict containing title, url, snippet and score
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.docs:
+            return []
+
+        total_docs = len(self.docs)
+        k1_plus_one = self.k1 + 1
+        norms = self._norms
+        scores = {}
+
+        for term in terms:
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+
+            doc_ids, tfs = posting
+            df = len(doc_ids)
+            idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+
+            for doc_id, tf in zip(doc_ids, tfs):
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * k1_plus_one / (tf + norms[doc_id])
+
+        results = []
+        for doc_id, score in heapq.nlargest(limit, scores.items(), key=itemgetter(1)):
+            url, title, snippet = self.docs[doc_id]
+            results.append({
+                'title': title,
+                'url': url,
+                'snippet': snippet,
+                'score': round(score, 4)
+            })
+
+        return results
+
+    def save(self, path):
+        """
+        Write the index to a JSON file
+
+        Args:
+            path (str): Destination file path
+        """
+        data = {
+            'format': INDEX_FORMAT_VERSION,
+            'base_url': self.base_url,
+            'k1': self.k1,
+            'b': self.b,
+            'docs': self.docs,
+            'lengths': self.lengths,
+            'postings': self.postings
+        }
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        # Write to a temporary file first so running workers never read a partial index
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an index from a JSON file
+
+        Args:
+            path (str): Index file path
+
+        Returns:
+            DocIndex: The loaded index
+        """
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        if data.get('format') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported documentation index format: {data.get('format')}")
+
+        return cls(
+            data['docs'],
+            data['postings'],
+            data['lengths'],
+            base_url=data.get('base_url', POSTGRESQL_DOC_BASE_URL),
+            k1=data.get('k1', BM25_K1),
+            b=data.get('b', BM25_B)
+        )
+
+def build_doc_index(source_dir, output_path=DOC_INDEX_PATH, base_url=POSTGRESQL_DOC_BASE_URL):
+    """
+    Build the documentation index from a snapshot directory and save it
+
+    Args:
+        source_dir (str): Directory containing the documentation HTML files
+        output_path (str): Where to write the index
+        base_url (str): URL the snapshot file names are relative to
+
+    Returns:
+        DocIndex: The built index
+    """
+    index = DocIndex.build(iter_snapshot_pages(source_dir), base_url=base_url)
+    index.save(output_path)
+    logger.info(f"Built documentation index with {len(index)} pages and {len(index.postings)} terms")
+    return index
+
+def get_doc_index(path=DOC_INDEX_PATH):
+    """
+    Get the prebuilt documentation index, loading it on first use
+
+    The index is reloaded when the file on disk is replaced by a rebuild.
+
+    Args:
+        path (str): Index file path
+
+    Returns:
+        DocIndex or None: The index or None if it has not been built
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    loaded = _DOC_INDEXES.get(path)
+    if loaded is not None and loaded[0] == mtime:
+        return loaded[1]
+
+    with _DOC_INDEX_LOCK:
+        loaded = _DOC_INDEXES.get(path)
+        if loaded is None or loaded[0] != mtime:
+            try:
+                index = DocIndex.load(path)
+                _DOC_INDEXES[path] = (mtime, index)
+                logger.info(f"Loaded documentation index {path} with {len(index)} pages")
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Error loading documentation index {path}: {str(e)}")
+                return loaded[1] if loaded else None
+
+    return _DOC_INDEXES[path][1]
@@ -2,19 +2,54 @@ import os
 import logging
 import requests
 import re
-from bs4 import BeautifulSoup
+import threading
 from urllib.parse import urljoin
-import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    DOC_CACHE_PATH, DOC_CACHE_MAX_AGE,
+    DOC_MEMORY_CACHE_MAX_BYTES, DOC_MEMORY_CACHE_TTL, DOC_MEMORY_CACHE_COMPRESS
+)
+from utils.doc_cache import DocCache, CachedPage
+from utils.lru_cache import BoundedCache
+from utils.http_client import http_client
+from utils.singleflight import SingleFlight
+from utils.html_parser import (
+    parse_html, extract_title, CONTENT_STRAINER, BODY_STRAINER, PRE_STRAINER, LINK_STRAINER
+)
 
 logger = logging.getLogger(__name__)
 
-# Cache for documentation pages to avoid repeated requests
-DOC_CACHE = {}
+# Cache for documentation pages to avoid repeated requests, bounded in size
+DOC_CACHE = BoundedCache(
+    DOC_MEMORY_CACHE_MAX_BYTES,
+    ttl=DOC_MEMORY_CACHE_TTL,
+    compress=DOC_MEMORY_CACHE_COMPRESS
+)
+
+# Upstream validator of each page held in DOC_CACHE, set together with the page
+DOC_VALIDATORS = BoundedCache(1024 * 1024, ttl=DOC_MEMORY_CACHE_TTL)
+
+# Persistent cache shared by all worker processes, survives restarts
+PERSISTENT_DOC_CACHE = DocCache(DOC_CACHE_PATH, DOC_CACHE_MAX_AGE) if DOC_CACHE_PATH else None
+
+# In-flight page loads, keyed by URL
+DOC_FETCHES = SingleFlight()
+
+# Background revalidation of stale pages
+_REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='doc-refresh')
+_PENDING_REFRESHES = set()
+_REFRESH_LOCK = threading.Lock()
 
 def fetch_doc_page(url):
     """
     Fetch a PostgreSQL documentation page
     
+    Pages are looked up in the in-process cache, then in the persistent
+    cache. Persistent entries older than DOC_CACHE_MAX_AGE are served stale
+    while a background conditional GET revalidates them, so unchanged pages
+    cost a 304 instead of a download and callers never wait on upstream.
+    
     Args:
         url (str): URL of the documentation page
         
@@ -22,33 +57,180 @@ def fetch_doc_page(url):
         str or None: HTML content of the page or None if there was an error
     """
     # Check cache first
-    if url in DOC_CACHE:
-        return DOC_CACHE[url]
+    body = DOC_CACHE.get(url)
+    if body is not None:
+        return body
+    
+    # Concurrent misses for the same URL share a single load
+    return DOC_FETCHES.do(url, _load_doc_page, url)
+
+def _load_doc_page(url):
+    """
+    Load a documentation page from the persistent cache or postgresql.org
+    
+    Args:
+        url (str): URL of the documentation page
+        
+    Returns:
+        str or None: HTML content of the page or None if there was an error
+    """
+    cached = PERSISTENT_DOC_CACHE.get(url) if PERSISTENT_DOC_CACHE else None
+    
+    if cached is None:
+        return _download_doc_page(url)
+    
+    if PERSISTENT_DOC_CACHE.is_fresh(cached):
+        PERSISTENT_DOC_CACHE.record('hits', cached.body)
+    else:
+        # Stale-while-revalidate: answer now, refresh in the background
+        PERSISTENT_DOC_CACHE.record('stale_served', cached.body)
+        _schedule_refresh(url, cached)
+    
+    _cache_page(url, cached.body, cached)
+    return cached.body
+
+def _cache_page(url, body, page=None):
+    """
+    Store a page and its upstream validator in the in-process caches
+    
+    Args:
+        url (str): URL of the documentation page
+        body (str): HTML content of the page
+        page (CachedPage or Response, optional): Source of the ETag/Last-Modified validator
+    """
+    validator = None
+    if isinstance(page, CachedPage):
+        validator = page.etag or (f"lm:{page.last_modified}" if page.last_modified else None)
+    elif page is not None:
+        last_modified = page.headers.get('Last-Modified')
+        validator = page.headers.get('ETag') or (f"lm:{last_modified}" if last_modified else None)
+    
+    DOC_CACHE.set(url, body)
+    if validator:
+        DOC_VALIDATORS.set(url, validator)
+    else:
+        DOC_VALIDATORS.pop(url)
+
+def get_doc_page_validator(url, html_content):
+    """
+    Get a validator identifying the current version of a page
+    
+    Args:
+        url (str): URL of the documentation page
+        html_content (str): HTML content returned by fetch_doc_page
+        
+    Returns:
+        str: The upstream ETag/Last-Modified, or a content fingerprint when unknown
+    """
+    return DOC_VALIDATORS.get(url) or f"h:{hash(html_content)}"
+
+def _schedule_refresh(url, cached):
+    """
+    Revalidate a stale page in the background, at most once at a time per URL
+    
+    Args:
+        url (str): URL of the documentation page
+        cached (CachedPage): The stale cached copy
+    """
+    with _REFRESH_LOCK:
+        if url in _PENDING_REFRESHES:
+            return
+        _PENDING_REFRESHES.add(url)
     
+    _REFRESH_EXECUTOR.submit(_refresh_doc_page, url, cached)
+
+def _refresh_doc_page(url, cached):
+    try:
+        _download_doc_page(url, cached)
+    except Exception as e:
+        logger.error(f"Error refreshing documentation page {url}: {str(e)}")
+    finally:
+        with _REFRESH_LOCK:
+            _PENDING_REFRESHES.discard(url)
+
+def _download_doc_page(url, cached=None):
+    """
+    Download a documentation page and store it in both caches
+    
+    Args:
+        url (str): URL of the documentation page
+        cached (CachedPage, optional): Existing copy to revalidate with a conditional GET
+        
+    Returns:
+        str or None: HTML content of the page or None if there was an error
+    """
     try:
-        # Add a small delay to avoid overwhelming the docs server
-        time.sleep(0.1)
+        headers = {}
+        
+        # Ask the server to confirm our copy is still current
+        if cached:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
         
-        headers = {
-            'User-Agent': 'PostgreSQL-Agent/1.0 (Documentation Helper)'
-        }
+        # Shared keep-alive client, rate limited to avoid overwhelming the docs server
+        response = http_client.get(url, headers=headers)
+        
+        if cached and response.status_code == 304:
+            PERSISTENT_DOC_CACHE.touch(url)
+            PERSISTENT_DOC_CACHE.record('revalidations', cached.body)
+            _cache_page(url, cached.body, cached)
+            return cached.body
         
-        response = requests.get(url, headers=headers, timeout=10)
         response.raise_for_status()
         
         # Cache the result
-        DOC_CACHE[url] = response.text
+        _cache_page(url, response.text, response)
+        
+        if PERSISTENT_DOC_CACHE:
+            PERSISTENT_DOC_CACHE.put(
+                url,
+                response.text,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified')
+            )
+            PERSISTENT_DOC_CACHE.record('refreshes' if cached else 'misses')
         
         return response.text
         
     except requests.RequestException as e:
         logger.error(f"Error fetching documentation page {url}: {str(e)}")
-        return None
+        
+        # An outdated page is better than none
+        return cached.body if cached else None
+
+def get_doc_cache_stats():
+    """
+    Get documentation cache statistics
+    
+    Returns:
+        dict: In-process and persistent cache statistics
+    """
+    return {
+        'memory': DOC_CACHE.stats(),
+        'persistent': PERSISTENT_DOC_CACHE.stats() if PERSISTENT_DOC_CACHE else None
+    }
+
+# Output format of block elements whose stripped text is emitted as a unit
+TEXT_BLOCK_FORMATS = {
+    'h1': "\n\n== {} ==\n\n",
+    'h2': "\n\n-- {} --\n\n",
+    'h3': "\n\n* {} *\n\n",
+    'p': "{}\n\n",
+    'li': "  * {}\n"
+}
 
 def extract_content(element):
     """
     Extract text content from HTML element, preserving some formatting
     
+    The tree is walked once with an explicit stack. A formatted element
+    emits its whole text; inside it, text nodes and nested headings,
+    paragraphs and list items are not emitted again, but links still add
+    their `text [href]` annotation and inline code its code block. Code
+    nested in a code block is not repeated either.
+    
     Args:
         element (BeautifulSoup element): The HTML element to extract content from
         
@@ -61,29 +243,38 @@ def extract_content(element):
     # Use a list to build the content to avoid string concatenation in a loop
     content_parts = []
     
-    for child in element.descendants:
-        # Handle different tag types to preserve some formatting
-        if child.name == 'h1':
-            content_parts.append(f"\n\n== {child.get_text(strip=True)} ==\n\n")
-        elif child.name == 'h2':
-            content_parts.append(f"\n\n-- {child.get_text(strip=True)} --\n\n")
-        elif child.name == 'h3':
-            content_parts.append(f"\n\n* {child.get_text(strip=True)} *\n\n")
-        elif child.name == 'p':
-            content_parts.append(f"{child.get_text(strip=True)}\n\n")
-        elif child.name == 'pre' or child.name == 'code':
+    # (node, enclosing formatted element kind): None outside, 'text' inside an element
+    # whose text was emitted, 'code' inside a code block
+    stack = [(child, None) for child in reversed(element.contents)]
+    
+    while stack:
+        node, inside = stack.pop()
+        name = node.name
+        
+        if name is None:
+            # This is a text node, already part of any enclosing element's text
+            if inside is None:
+                text = node.strip()
+                if text:
+                    content_parts.append(text)
+            continue
+        
+        if name in TEXT_BLOCK_FORMATS:
+            if inside is None:
+                content_parts.append(TEXT_BLOCK_FORMATS[name].format(node.get_text(strip=True)))
+            inside = inside or 'text'
+        elif name == 'pre' or name == 'code':
             # Preserve code blocks
-            content_parts.append(f"\n```\n{child.get_text()}\n```\n")
-        elif child.name == 'li':
-            content_parts.append(f"  * {child.get_text(strip=True)}\n")
-        elif child.name == 'a' and child.has_attr('href'):
+            if inside != 'code':
+                content_parts.append(f"\n```\n{node.get_text()}\n```\n")
+            inside = 'code'
+        elif name == 'a' and node.has_attr('href'):
             # Include links
-            text = child.get_text(strip=True)
-            href = child.get('href')
-            content_parts.append(f"{text} [{href}]")
-        elif child.name is None and child.strip():
-            # This is a text node with content
-            content_parts.append(child.strip())
+            content_parts.append(f"{node.get_text(strip=True)} [{node.get('href')}]")
+            inside = inside or 'text'
+        
+        # Visit children in document order for nested links and inline code
+        stack.extend((child, inside) for child in reversed(node.contents))
     
     # Join all parts and clean up
     content = "".join(content_parts)
@@ -93,6 +284,45 @@ def extract_content(element):
     
     return content
 
+def extract_doc_page(html_content, site='get_doc_content'):
+    """
+    Extract the title and formatted main content of a documentation page
+    
+    Args:
+        html_content (str): HTML content of the page
+        site (str): Call site name for parse-time statistics
+        
+    Returns:
+        dict: A dictionary containing the title and content of the page
+    """
+    title = extract_title(html_content) or 'PostgreSQL Documentation'
+    
+    # Extract the main content, parsing only the content divisions
+    soup = parse_html(html_content, only=CONTENT_STRAINER, site=site)
+    content_elem = soup.find('div', class_='sect1') or soup.find('div', class_='chapter')
+    
+    if not content_elem:
+        soup = parse_html(html_content, only=BODY_STRAINER, site=site)
+        content_elem = soup.find('body')
+        
+    content = extract_content(content_elem) if content_elem else 'Content not available'
+    
+    return {
+        'title': title,
+        'content': content
+    }
+
+# A line that starts an SQL statement, optionally after a psql prompt such as "mydb=>"
+SQL_STATEMENT_RE = re.compile(
+    r'^\s*(?:\w+[=-][>#]\s*)?'
+    r'(?:SELECT|INSERT|UPDATE|DELETE|MERGE|WITH|VALUES|TABLE|CREATE|ALTER|DROP|TRUNCATE|GRANT|REVOKE|'
+    r'COPY|EXPLAIN|ANALYZE|VACUUM|REINDEX|CLUSTER|COMMENT|BEGIN|COMMIT|ROLLBACK|SAVEPOINT|PREPARE|'
+    r'EXECUTE|DECLARE|FETCH|LOCK|SET|SHOW|RESET|CALL|DO|LISTEN|NOTIFY|REFRESH)\b'
+    # Lowercase only for unambiguous commands, so shell or prose lines like "do ..." do not match
+    r'|^\s*(?:\w+[=-][>#]\s*)?(?:select|insert into|update|delete from|create|alter|explain)\s',
+    re.MULTILINE
+)
+
 def extract_code_examples(html_content):
     """
     Extract code examples from documentation HTML
@@ -104,14 +334,17 @@ def extract_code_examples(html_content):
         list: List of code examples
     """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = parse_html(html_content, only=PRE_STRAINER, site='extract_code_examples')
         examples = []
         
-        # Find code blocks
+        # Find code blocks, skipping command grammar summaries
         for pre in soup.find_all('pre'):
-            # Check if this is a SQL example
+            if 'synopsis' in (pre.get('class') or []):
+                continue
+            
+            # Check if this is a SQL example: a line starting with an SQL command
             text = pre.get_text()
-            if any(keyword in text.lower() for keyword in ['select', 'insert', 'update', 'delete', 'create', 'alter']):
+            if SQL_STATEMENT_RE.search(text):
                 examples.append(text)
         
         return examples
@@ -132,7 +365,7 @@ def find_related_docs(html_content, base_url):
         list: List of related documentation links
     """
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = parse_html(html_content, only=LINK_STRAINER, site='find_related_docs')
         related_links = []
         
         # Look for links in the document
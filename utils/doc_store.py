@@ -0,0 +1,282 @@
+import os
+import sqlite3
+import hashlib
+import logging
+import threading
+
+from config import DOC_STORE_PATH
+from utils.lru_cache import BoundedCache
+from utils.doc_index import iter_snapshot_pages
+from utils.doc_parser import extract_doc_page
+
+logger = logging.getLogger(__name__)
+
+# Paragraphs are separated by a blank line in extracted content; splitting and joining on it is lossless
+PARAGRAPH_SEPARATOR = '\n\n'
+
+# Bound on SQLite host parameters per statement
+LOOKUP_BATCH_SIZE = 500
+
+SCHEMA_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS doc_paragraphs (
+        hash TEXT PRIMARY KEY,
+        text TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS doc_versions (
+        version TEXT NOT NULL,
+        path TEXT NOT NULL,
+        title TEXT NOT NULL,
+        paragraphs TEXT NOT NULL,
+        length INTEGER NOT NULL,
+        PRIMARY KEY (version, path)
+    )
+    """
+)
+
+_DOC_STORE = None
+_DOC_STORE_LOCK = threading.Lock()
+
+def paragraph_hash(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+class DocStore:
+    """
+    Extracted documentation pages of several versions, deduplicated by paragraph
+
+    A page is stored as its title and the list of its paragraph hashes;
+    each distinct paragraph is stored once however many versions contain
+    it. Most of the manual is unchanged between major versions, so adding
+    a version mostly adds hashes. Paragraph texts read back are kept in a
+    shared in-memory cache, so they are also held once in memory.
+    """
+
+    def __init__(self, path, memory_max_bytes=16 * 1024 * 1024):
+        self.path = path
+        self._local = threading.local()
+        self._paragraphs = BoundedCache(memory_max_bytes)
+
+    def _connection(self):
+        """
+        Get the SQLite connection for the current thread and process
+        """
+        conn = getattr(self._local, 'conn', None)
+
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in SCHEMA_SQL:
+                conn.execute(statement)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+
+        return conn
+
+    def put_pages(self, version, pages):
+        """
+        Replace the stored pages of a version in one transaction
+
+        Args:
+            version (str): Documentation version
+            pages (iterable): (path, title, content) triples
+
+        Returns:
+            int: Number of pages stored
+        """
+        conn = self._connection()
+        count = 0
+
+        conn.execute("BEGIN")
+        try:
+            conn.execute("DELETE FROM doc_versions WHERE version = ?", (version,))
+
+            for path, title, content in pages:
+                paragraphs = content.split(PARAGRAPH_SEPARATOR)
+                hashes = [paragraph_hash(paragraph) for paragraph in paragraphs]
+
+                conn.executemany(
+                    "INSERT OR IGNORE INTO doc_paragraphs (hash, text) VALUES (?, ?)",
+                    zip(hashes, paragraphs)
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO doc_versions (version, path, title, paragraphs, length) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (version, path, title, ','.join(hashes), len(content))
+                )
+                count += 1
+
+            # Paragraphs no page refers to anymore, e.g. text changed since the version was last imported
+            self._prune(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        self._paragraphs.clear()
+        return count
+
+    def _prune(self, conn):
+        referenced = set()
+        for (paragraphs,) in conn.execute("SELECT paragraphs FROM doc_versions"):
+            referenced.update(paragraphs.split(','))
+
+        unreferenced = [
+            (digest,) for (digest,) in conn.execute("SELECT hash FROM doc_paragraphs")
+            if digest not in referenced
+        ]
+        conn.executemany("DELETE FROM doc_paragraphs WHERE hash = ?", unreferenced)
+
+    def _load_paragraphs(self, hashes):
+        """
+        Get paragraph texts by hash, from memory where possible
+        """
+        texts = {}
+        missing = []
+        for digest in set(hashes):
+            text = self._paragraphs.get(digest)
+            if text is None:
+                missing.append(digest)
+            else:
+                texts[digest] = text
+
+        conn = self._connection()
+        for start in range(0, len(missing), LOOKUP_BATCH_SIZE):
+            batch = missing[start:start + LOOKUP_BATCH_SIZE]
+            rows = conn.execute(
+                f"SELECT hash, text FROM doc_paragraphs WHERE hash IN ({','.join('?' * len(batch))})",
+                batch
+            )
+            for digest, text in rows:
+                texts[digest] = text
+                self._paragraphs.set(digest, text)
+
+        return texts
+
+    def get_page(self, version, path):
+        """
+        Get an extracted page
+
+        Args:
+            version (str): Documentation version
+            path (str): Page path relative to the version's base URL, e.g. sql-select.html
+
+        Returns:
+            dict or None: Title and content, None if the page is not stored
+        """
+        try:
+            row = self._connection().execute(
+                "SELECT title, paragraphs FROM doc_versions WHERE version = ? AND path = ?",
+                (version, path)
+            ).fetchone()
+            if not row:
+                return None
+
+            title, paragraphs = row
+            hashes = paragraphs.split(',')
+            texts = self._load_paragraphs(hashes)
+        except sqlite3.Error as e:
+            logger.error(f"Error reading documentation store: {str(e)}")
+            return None
+
+        return {
+            'title': title,
+            'content': PARAGRAPH_SEPARATOR.join(texts.get(digest, '') for digest in hashes)
+        }
+
+    def versions(self):
+        """
+        Get the stored versions and their page counts
+
+        Returns:
+            dict: Version -> number of pages
+        """
+        try:
+            rows = self._connection().execute(
+                "SELECT version, COUNT(*) FROM doc_versions GROUP BY version ORDER BY version"
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading documentation store: {str(e)}")
+            return {}
+
+        return dict(rows)
+
+    def stats(self):
+        """
+        Get storage statistics
+
+        Returns:
+            dict: Pages, distinct and referenced paragraphs, stored and logical bytes, dedup ratio
+        """
+        try:
+            conn = self._connection()
+            pages, references, logical_bytes = conn.execute(
+                "SELECT COUNT(*), "
+                "COALESCE(SUM(LENGTH(paragraphs) - LENGTH(REPLACE(paragraphs, ',', '')) + 1), 0), "
+                "COALESCE(SUM(length), 0) "
+                "FROM doc_versions"
+            ).fetchone()
+            paragraphs, stored_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(text)), 0) FROM doc_paragraphs"
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading documentation store: {str(e)}")
+            return {}
+
+        return {
+            'versions': self.versions(),
+            'pages': pages,
+            'paragraphs': paragraphs,
+            'paragraph_references': references,
+            'stored_bytes': stored_bytes,
+            'logical_bytes': logical_bytes,  # extracted content as served, before deduplication
+            'dedup_ratio': round(logical_bytes / stored_bytes, 2) if stored_bytes else None,
+            'memory': self._paragraphs.stats()
+        }
+
+def build_doc_store(source_dir, version, store):
+    """
+    Extract the pages of a documentation snapshot and add them to the store
+
+    Args:
+        source_dir (str): Directory containing the documentation HTML files of the version
+        version (str): Documentation version
+        store (DocStore): Destination store
+
+    Returns:
+        int: Number of pages stored
+    """
+    def pages():
+        for file_name, html_content in iter_snapshot_pages(source_dir):
+            page = extract_doc_page(html_content)
+            yield file_name, page['title'], page['content']
+
+    count = store.put_pages(version, pages())
+    logger.info(f"Stored {count} documentation pages of version {version}")
+    return count
+
+def get_doc_store(path=DOC_STORE_PATH):
+    """
+    Get the documentation store, opening it on first use
+
+    Args:
+        path (str): Store file path
+
+    Returns:
+        DocStore or None: The store or None if no version has been imported
+    """
+    global _DOC_STORE
+
+    # Only open a store 'flask build-doc-store' has created; opening it would create an empty file
+    if not path or not os.path.exists(path):
+        return None
+
+    if _DOC_STORE is None:
+        with _DOC_STORE_LOCK:
+            if _DOC_STORE is None:
+                _DOC_STORE = DocStore(path)
+
+    return _DOC_STORE
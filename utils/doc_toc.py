@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import logging
+import threading
+from types import MappingProxyType
+from collections import namedtuple
+
+from utils.html_parser import parse_html, TOC_STRAINER
+
+logger = logging.getLogger(__name__)
+
+DocLink = namedtuple('DocLink', ['title', 'url'])
+
+def parse_doc_sections(html_content):
+    """
+    Parse the section tree from the documentation index page
+
+    Args:
+        html_content (str): HTML content of the docs index.html
+
+    Returns:
+        dict or None: Section title -> list of DocLink, None if no TOC was found
+    """
+    soup = parse_html(html_content, only=TOC_STRAINER, site='get_doc_sections')
+    toc_div = soup.find('div', class_='toc')
+
+    if not toc_div:
+        return None
+
+    sections = {}
+    current_section = None
+
+    for element in toc_div.find_all(['dt', 'dd']):
+        if element.name == 'dt':
+            current_section = element.get_text(strip=True)
+            sections[current_section] = []
+        elif element.name == 'dd' and current_section:
+            link = element.find('a')
+            if link:
+                sections[current_section].append(DocLink(link.get_text(strip=True), link.get('href', '')))
+
+    return sections or None
+
+def freeze_doc_sections(sections):
+    """
+    Turn a parsed section tree into a compact read-only structure
+
+    Args:
+        sections (dict): Section title -> list of (title, url) pairs
+
+    Returns:
+        MappingProxyType: Section title -> tuple of DocLink
+    """
+    return MappingProxyType({
+        name: tuple(DocLink(*link) for link in links)
+        for name, links in sections.items()
+    })
+
+def save_doc_sections(sections, path):
+    """
+    Write a section tree to a JSON file
+
+    Args:
+        sections (Mapping): Section title -> sequence of (title, url) pairs
+        path (str): Destination file path
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({name: [list(link) for link in links] for name, links in sections.items()}, f)
+    os.replace(tmp_path, path)
+
+def load_doc_sections(path):
+    """
+    Load a prebuilt section tree
+
+    Args:
+        path (str): JSON file written by save_doc_sections
+
+    Returns:
+        MappingProxyType or None: The frozen section tree or None if unavailable
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            return freeze_doc_sections(json.load(f))
+    except (OSError, ValueError, TypeError) as e:
+        logger.debug(f"No prebuilt documentation sections at {path}: {str(e)}")
+        return None
+
+class DocSections:
+    """
+    Documentation table of contents, parsed once and refreshed in the background
+
+    Readers get the current immutable tree without parsing anything. A
+    daemon thread re-reads the index page every `interval` seconds and
+    swaps in a new tree only when the page has changed.
+    """
+
+    def __init__(self, load_html, path, interval):
+        """
+        Args:
+            load_html (callable): Returns the docs index.html content or None
+            path (str): Prebuilt section tree file, rewritten after each parse
+            interval (float): Seconds between refreshes, 0 to refresh only once
+        """
+        self.load_html = load_html
+        self.path = path
+        self.interval = interval
+        self._sections = None
+        self._html_hash = None
+        self._started = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Get the current section tree, starting the refresher on first use
+
+        Returns:
+            MappingProxyType or None: The section tree or None if not available yet
+        """
+        if not self._started:
+            with self._lock:
+                if not self._started:
+                    self._sections = load_doc_sections(self.path)
+                    threading.Thread(target=self._run, name='doc-toc-refresh', daemon=True).start()
+                    self._started = True
+
+        return self._sections
+
+    def refresh(self):
+        """
+        Re-parse the index page if it changed since the last parse
+
+        Returns:
+            bool: True if a new tree was installed
+        """
+        html_content = self.load_html()
+        if not html_content:
+            return False
+
+        html_hash = hash(html_content)
+        if html_hash == self._html_hash:
+            return False
+
+        sections = parse_doc_sections(html_content)
+        if not sections:
+            return False
+
+        self._sections = freeze_doc_sections(sections)
+        self._html_hash = html_hash
+
+        try:
+            save_doc_sections(self._sections, self.path)
+        except OSError as e:
+            logger.error(f"Error saving documentation sections: {str(e)}")
+
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                if self.refresh():
+                    logger.info(f"Refreshed documentation sections ({len(self._sections)} sections)")
+            except Exception as e:
+                logger.error(f"Error refreshing documentation sections: {str(e)}")
+
+            if not self.interval:
+                return
+
+            time.sleep(self.interval)
@@ -0,0 +1,59 @@
+import os
+
+from config import POSTGRESQL_DOC_ROOT_URL, DOC_VERSIONS, DOC_MIRROR_DIR
+
+DEFAULT_DOC_VERSION = 'current'
+
+def normalize_doc_version(version):
+    """
+    Validate a documentation version
+
+    Args:
+        version (str or None): A configured major version such as "16", or "current"
+
+    Returns:
+        str: The version, "current" when none was given
+
+    Raises:
+        ValueError: If the version is not configured
+    """
+    version = str(version or DEFAULT_DOC_VERSION).strip().lower()
+
+    if version != DEFAULT_DOC_VERSION and version not in DOC_VERSIONS:
+        raise ValueError(f"Unsupported documentation version: {version}")
+
+    return version
+
+def doc_base_url(version=None):
+    """
+    Get the URL the pages of a documentation version are served from
+    """
+    return f"{POSTGRESQL_DOC_ROOT_URL}{normalize_doc_version(version)}/"
+
+def doc_mirror_dir(version=None, mirror_dir=DOC_MIRROR_DIR):
+    """
+    Get the local mirror directory of a documentation version
+
+    The current version lives directly in the mirror directory, other
+    versions in a subdirectory named after the version.
+    """
+    version = normalize_doc_version(version)
+    return mirror_dir if version == DEFAULT_DOC_VERSION else os.path.join(mirror_dir, version)
+
+def versioned_path(path, version=None):
+    """
+    Get the path of a prebuilt file for a documentation version
+
+    Args:
+        path (str): Path of the file for the current version, e.g. .../doc_index.json
+        version (str, optional): Documentation version
+
+    Returns:
+        str: The path itself for the current version, otherwise e.g. .../doc_index-16.json
+    """
+    version = normalize_doc_version(version)
+    if version == DEFAULT_DOC_VERSION:
+        return path
+
+    root, ext = os.path.splitext(path)
+    return f"{root}-{version}{ext}"
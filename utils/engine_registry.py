@@ -0,0 +1,230 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POSTGRESQL_PORT = 5432
+
+def normalize_dsn(url):
+    """
+    Normalise a database URL so equivalent spellings share one engine
+
+    The postgres:// alias becomes postgresql://, the host is lowercased,
+    the default port is made explicit and query parameters are sorted.
+
+    Args:
+        url (str or URL): Database URL
+
+    Returns:
+        URL: Normalised URL
+    """
+    url = make_url(url)
+
+    drivername = url.drivername
+    if drivername == 'postgres' or drivername.startswith('postgres+'):
+        drivername = 'postgresql' + drivername[len('postgres'):]
+
+    return url.set(
+        drivername=drivername,
+        host=url.host.lower() if url.host else url.host,
+        port=url.port or (DEFAULT_POSTGRESQL_PORT if url.host else None),
+        query=dict(sorted(url.query.items()))
+    )
+
+class EngineRegistry:
+    """
+    Process-wide SQLAlchemy engines, one per target database
+
+    Engines are keyed by normalised URL and kept warm between requests, so
+    repeat analyses of a database reuse pooled connections instead of
+    paying a new connection handshake. Every pool is bounded; engines
+    unused for idle_timeout seconds are disposed, and when more than
+    max_engines targets are in use the least recently used is disposed.
+    """
+
+    def __init__(self, max_engines=8, idle_timeout=600, pool_size=2, max_overflow=3,
+                 pool_timeout=10, pool_recycle=1800, connect_timeout=10):
+        """
+        Args:
+            max_engines (int): Distinct targets kept at once
+            idle_timeout (float): Seconds an unused engine is kept, 0 to keep until evicted
+            pool_size (int): Connections each pool keeps open
+            max_overflow (int): Connections each pool may open beyond pool_size under load
+            pool_timeout (float): Seconds to wait for a free connection
+            pool_recycle (float): Seconds after which a pooled connection is replaced
+            connect_timeout (int): Seconds to wait for the server when connecting
+        """
+        self.max_engines = max_engines
+        self.idle_timeout = idle_timeout
+        self.engine_options = {
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            'pool_timeout': pool_timeout,
+            'pool_recycle': pool_recycle,
+            'pool_pre_ping': True
+        }
+        self.connect_timeout = connect_timeout
+
+        # key -> [engine, created_at, last_used, uses]
+        self._engines = OrderedDict()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+        self._hits = 0
+        self._misses = 0
+        self._lru_evictions = 0
+        self._idle_evictions = 0
+
+    def _check_pid(self):
+        # Caller must hold the lock. Pooled connections must not be shared with a forked child.
+        if self._pid != os.getpid():
+            for engine, *_ in self._engines.values():
+                engine.dispose(close=False)
+            self._engines.clear()
+            self._pid = os.getpid()
+
+    def _evict_idle(self, now):
+        # Caller must hold the lock
+        if not self.idle_timeout:
+            return []
+
+        idle = [key for key, (_, _, last_used, _) in self._engines.items() if now - last_used > self.idle_timeout]
+        self._idle_evictions += len(idle)
+        return [self._engines.pop(key)[0] for key in idle]
+
+    def _create_engine(self, url):
+        connect_args = {}
+        if url.get_backend_name() == 'postgresql' and 'connect_timeout' not in url.query:
+            connect_args['connect_timeout'] = self.connect_timeout
+
+        engine = create_engine(url, connect_args=connect_args, **self.engine_options)
+
+        # Probe once when the engine is created; pool_pre_ping covers connections reused later
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception:
+            engine.dispose()
+            raise
+
+        return engine
+
+    def get(self, url):
+        """
+        Get the engine of a database, creating and probing it on first use
+
+        Args:
+            url (str or URL): Database URL
+
+        Returns:
+            Engine: Shared engine of the database
+
+        Raises:
+            Exception: If a new engine cannot connect
+        """
+        url = normalize_dsn(url)
+        key = url.render_as_string(hide_password=False)
+        disposed = []
+
+        with self._lock:
+            self._check_pid()
+            now = time.monotonic()
+            disposed.extend(self._evict_idle(now))
+
+            entry = self._engines.get(key)
+            if entry is not None:
+                self._engines.move_to_end(key)
+                entry[2] = now
+                entry[3] += 1
+                self._hits += 1
+
+        if entry is not None:
+            self._dispose(disposed)
+            return entry[0]
+
+        # Connect outside the lock so a slow or unreachable server does not block other targets
+        try:
+            engine = self._create_engine(url)
+        finally:
+            self._dispose(disposed)
+        disposed = []
+
+        with self._lock:
+            self._misses += 1
+            existing = self._engines.get(key)
+
+            if existing is not None:
+                # Another thread registered the same target meanwhile
+                disposed.append(engine)
+                engine = existing[0]
+                self._engines.move_to_end(key)
+                existing[2] = time.monotonic()
+                existing[3] += 1
+            else:
+                now = time.monotonic()
+                self._engines[key] = [engine, now, now, 1]
+
+                while len(self._engines) > self.max_engines:
+                    _, (evicted, *_) = self._engines.popitem(last=False)
+                    disposed.append(evicted)
+                    self._lru_evictions += 1
+
+        self._dispose(disposed)
+        return engine
+
+    def _dispose(self, engines):
+        # Connections still checked out are closed when returned; the pool is dropped after that
+        for engine in engines:
+            logger.debug(f"Disposing database engine for {engine.url.render_as_string(hide_password=True)}")
+            engine.dispose()
+
+    def clear(self):
+        """
+        Dispose every engine
+        """
+        with self._lock:
+            engines = [engine for engine, *_ in self._engines.values()]
+            self._engines.clear()
+        self._dispose(engines)
+
+    def stats(self):
+        """
+        Get registry and pool statistics
+
+        Returns:
+            dict: Registry counters plus, per engine, its target (without password), age,
+                idle time, uses and pool occupancy
+        """
+        with self._lock:
+            now = time.monotonic()
+            engines = [
+                {
+                    'url': engine.url.render_as_string(hide_password=True),
+                    'age': round(now - created_at, 1),
+                    'idle': round(now - last_used, 1),
+                    'uses': uses,
+                    'pool': {
+                        'size': engine.pool.size(),
+                        'checked_in': engine.pool.checkedin(),
+                        'checked_out': engine.pool.checkedout(),
+                        'overflow': engine.pool.overflow()
+                    } if hasattr(engine.pool, 'checkedout') else {'status': engine.pool.status()}
+                }
+                for engine, created_at, last_used, uses in reversed(list(self._engines.values()))
+            ]
+
+            return {
+                'engines': len(engines),
+                'max_engines': self.max_engines,
+                'hits': self._hits,
+                'misses': self._misses,
+                'lru_evictions': self._lru_evictions,
+                'idle_evictions': self._idle_evictions,
+                'targets': engines
+            }
@@ -0,0 +1,108 @@
+import re
+
+# Greedy wildcards in the configured patterns; made lazy so a match spans only the message it belongs to
+GREEDY_WILDCARD_RE = re.compile(r'(?<!\\)\.\*(?![?*+])')
+
+REGEX_SPECIAL_CHARS = set('.^$*+?{}[]\\|()')
+REGEX_QUANTIFIERS = set('*+?{')
+
+def required_literal(pattern):
+    """
+    Get the longest literal every match of a pattern must contain
+
+    Args:
+        pattern (str): Regular expression
+
+    Returns:
+        str or None: Lowercase literal, None if the pattern has no usable one
+    """
+    # Alternations, groups and classes make "required" hard to establish; such patterns are always confirmed
+    if any(char in pattern for char in '|()[]\\'):
+        return None
+
+    segments = []
+    current = []
+    for index, char in enumerate(pattern):
+        next_char = pattern[index + 1] if index + 1 < len(pattern) else ''
+        if char in REGEX_SPECIAL_CHARS or next_char in REGEX_QUANTIFIERS:
+            # A character followed by a quantifier is optional or repeated, so it ends the literal too
+            segments.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    segments.append(''.join(current))
+
+    literal = max(segments, key=len)
+    return literal.lower() if len(literal) >= 3 else None
+
+class ErrorMatcher:
+    """
+    Match error text against categorised patterns
+
+    Every pattern is compiled once, together with the longest literal its
+    matches must contain. The text is lowercased once and each pattern's
+    regular expression only runs when its literal occurs in it, so most
+    patterns cost one substring search instead of a regex scan.
+    """
+
+    def __init__(self, patterns):
+        """
+        Args:
+            patterns (dict): Category -> list of regular expressions, in priority order
+        """
+        self.categories = list(patterns)
+        self._patterns = [
+            (category, required_literal(pattern), re.compile(GREEDY_WILDCARD_RE.sub('.*?', pattern), re.IGNORECASE))
+            for category, category_patterns in patterns.items()
+            for pattern in category_patterns
+        ]
+
+    def match(self, text):
+        """
+        Find every category with a pattern matching the text
+
+        Args:
+            text (str): Error text
+
+        Returns:
+            dict: Category -> sorted list of (start, end) match offsets, in category priority order
+        """
+        found = {}
+        if not text:
+            return found
+
+        lowered = text.lower()
+        for category, literal, regex in self._patterns:
+            if literal is not None and literal not in lowered:
+                continue
+
+            spans = [match.span() for match in regex.finditer(text)]
+            if spans:
+                found.setdefault(category, []).extend(spans)
+
+        for spans in found.values():
+            spans.sort()
+
+        return found
+
+    def first(self, text):
+        """
+        Get the highest-priority matching category
+
+        Stops at the first matching pattern, like the error type of analyze_error.
+
+        Args:
+            text (str): Error text
+
+        Returns:
+            str or None: The category or None if nothing matches
+        """
+        if not text:
+            return None
+
+        lowered = text.lower()
+        for category, literal, regex in self._patterns:
+            if (literal is None or literal in lowered) and regex.search(text):
+                return category
+
+        return None
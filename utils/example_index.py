@@ -0,0 +1,292 @@
+import os
+import re
+import json
+import logging
+import threading
+
+from config import EXAMPLE_INDEX_PATH, POSTGRESQL_DOC_BASE_URL
+from utils.doc_parser import extract_code_examples, SQL_STATEMENT_RE
+from utils.doc_index import iter_snapshot_pages
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 2
+
+PROMPT_RE = re.compile(r'^\s*\w+[=-][>#]\s*')
+WORD_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+FUNCTION_CALL_RE = re.compile(r'\b([A-Za-z_][A-Za-z0-9_.]*)\s*\(')
+OBJECT_RE = re.compile(
+    r'\b(?:FROM|JOIN|INTO|UPDATE|TABLE|ON|INDEX|VIEW|REFERENCES|SEQUENCE|FUNCTION|TRIGGER)\s+'
+    r'(?:ONLY\s+|IF\s+(?:NOT\s+)?EXISTS\s+)?([A-Za-z_][A-Za-z0-9_.]*)',
+    re.IGNORECASE
+)
+
+# Words between the verb and the object type that do not change the command
+COMMAND_MODIFIERS = frozenset([
+    'OR', 'REPLACE', 'UNIQUE', 'TEMP', 'TEMPORARY', 'UNLOGGED', 'GLOBAL', 'LOCAL', 'RECURSIVE',
+    'TRUSTED', 'PROCEDURAL', 'CONSTRAINT', 'CONCURRENTLY'
+])
+
+# Verbs whose command name includes the object type, e.g. CREATE INDEX; COMMENT ON ... is just COMMENT
+COMPOUND_VERBS = frozenset(['CREATE', 'ALTER', 'DROP', 'REFRESH', 'IMPORT', 'SECURITY'])
+
+# Object types spelled with two words
+TWO_WORD_TYPES = frozenset(['MATERIALIZED', 'FOREIGN', 'EVENT', 'TEXT', 'ACCESS', 'USER', 'OPERATOR', 'DEFAULT'])
+
+# SQL words ignored when indexing the terms an example mentions
+SQL_KEYWORDS = frozenset([
+    'select', 'from', 'where', 'and', 'or', 'not', 'null', 'as', 'on', 'in', 'is', 'by', 'order',
+    'group', 'having', 'limit', 'offset', 'insert', 'into', 'values', 'update', 'set', 'delete',
+    'create', 'alter', 'drop', 'table', 'index', 'view', 'with', 'join', 'left', 'right', 'inner',
+    'outer', 'using', 'case', 'when', 'then', 'else', 'end', 'distinct', 'all', 'union', 'exists',
+    'primary', 'key', 'references', 'default', 'constraint', 'unique', 'check', 'returning', 'if',
+    'true', 'false', 'asc', 'desc', 'between', 'like', 'to', 'add', 'column', 'for', 'do'
+])
+
+def classify_example(sql):
+    """
+    Determine the leading SQL command of an example
+
+    Args:
+        sql (str): Example text
+
+    Returns:
+        str: Command name such as 'SELECT', 'CREATE INDEX' or 'ALTER TABLE'
+    """
+    match = SQL_STATEMENT_RE.search(sql)
+    statement = PROMPT_RE.sub('', sql[match.start():] if match else sql)
+    words = [word.upper() for word in WORD_RE.findall(statement[:200])]
+
+    if not words:
+        return 'OTHER'
+
+    verb = words[0]
+    if verb not in COMPOUND_VERBS:
+        return verb
+
+    rest = [word for word in words[1:] if word not in COMMAND_MODIFIERS]
+    if not rest:
+        return verb
+
+    if rest[0] in TWO_WORD_TYPES and len(rest) > 1:
+        return f"{verb} {rest[0]} {rest[1]}"
+
+    return f"{verb} {rest[0]}"
+
+def example_terms(sql):
+    """
+    Get the objects, functions and identifiers an example mentions
+
+    Args:
+        sql (str): Example text
+
+    Returns:
+        set: Lowercase terms
+    """
+    terms = {word.lower() for word in WORD_RE.findall(sql)} - SQL_KEYWORDS
+
+    # Qualified names are indexed as a whole and by their last part
+    for name in FUNCTION_CALL_RE.findall(sql) + OBJECT_RE.findall(sql):
+        name = name.lower()
+        terms.add(name)
+        terms.add(name.rsplit('.', 1)[-1])
+
+    return terms
+
+class ExampleIndex:
+    """
+    In-memory index of the SQL examples in the documentation
+
+    Examples are looked up by leading command (SELECT, CREATE INDEX, ...)
+    and by the tables, functions and other identifiers they mention.
+    """
+
+    def __init__(self, examples):
+        """
+        Args:
+            examples (list): [sql, url, command] triples
+        """
+        self.examples = examples
+        self.by_command = {}
+        self.by_term = {}
+
+        for example_id, (sql, _, command) in enumerate(examples):
+            self.by_command.setdefault(command, []).append(example_id)
+            for term in example_terms(sql):
+                self.by_term.setdefault(term, []).append(example_id)
+
+    def __len__(self):
+        return len(self.examples)
+
+    @classmethod
+    def build(cls, pages, base_url=POSTGRESQL_DOC_BASE_URL):
+        """
+        Build the index from documentation pages
+
+        Args:
+            pages (iterable): (file name, HTML content) pairs
+            base_url (str): URL the file names are relative to
+
+        Returns:
+            ExampleIndex: The built index
+        """
+        examples = []
+        seen = set()
+
+        for file_name, html_content in pages:
+            for sql in extract_code_examples(html_content):
+                sql = sql.strip()
+                if sql in seen:
+                    continue
+                seen.add(sql)
+                examples.append([sql, f"{base_url}{file_name}", classify_example(sql)])
+
+        return cls(examples)
+
+    def commands(self):
+        """
+        Get the indexed commands and their example counts
+
+        Returns:
+            dict: Command name -> number of examples
+        """
+        return {command: len(ids) for command, ids in sorted(self.by_command.items())}
+
+    def search(self, query, limit=10):
+        """
+        Find examples of a command or of examples mentioning given terms
+
+        Args:
+            query (str): A command such as "create index" or terms such as "jsonb_path_query"
+            limit (int): Maximum number of examples
+
+        Returns:
+            list: A list of dict containing command, sql and url
+        """
+        words = query.upper().split()
+        if not words:
+            return []
+
+        # Modifiers are dropped the way classify_example drops them: "create unique index" is CREATE INDEX
+        ids = self.by_command.get(' '.join(words[:1] + [word for word in words[1:] if word not in COMMAND_MODIFIERS]))
+
+        if ids is None:
+            # SQL keywords are not indexed as terms, so they are left out of the query too
+            words = {word.lower() for word in WORD_RE.findall(query)}
+            terms = words - SQL_KEYWORDS
+
+            if not terms:
+                # Only keywords, e.g. "insert returning": examples of the command that use the other keywords
+                ids = [
+                    example_id for example_id in self.by_command.get(classify_example(query), [])
+                    if words <= {word.lower() for word in WORD_RE.findall(self.examples[example_id][0])}
+                ]
+            else:
+                # All terms must be mentioned; rarest term first keeps the intersection small
+                postings = sorted((self.by_term.get(term, []) for term in terms), key=len)
+                if not postings[0]:
+                    return []
+
+                matches = set(postings[0])
+                for posting in postings[1:]:
+                    matches.intersection_update(posting)
+                ids = sorted(matches)
+
+        # Prefer short, focused examples
+        ids = sorted(ids[:limit * 20], key=lambda example_id: len(self.examples[example_id][0]))[:limit]
+
+        return [
+            {
+                'command': self.examples[example_id][2],
+                'sql': self.examples[example_id][0],
+                'url': self.examples[example_id][1]
+            }
+            for example_id in ids
+        ]
+
+    def save(self, path):
+        """
+        Write the examples to a JSON file; lookup tables are rebuilt on load
+
+        Args:
+            path (str): Destination file path
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': INDEX_FORMAT_VERSION, 'examples': self.examples}, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load the index from a JSON file
+
+        Args:
+            path (str): Index file path
+
+        Returns:
+            ExampleIndex: The loaded index
+        """
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        if data.get('format') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported example index format: {data.get('format')}")
+
+        return cls(data['examples'])
+
+# Loaded index, shared by all request threads
+_EXAMPLE_INDEX = None
+_EXAMPLE_INDEX_MTIME = None
+_EXAMPLE_INDEX_LOCK = threading.Lock()
+
+def build_example_index(source_dir, output_path=EXAMPLE_INDEX_PATH, base_url=POSTGRESQL_DOC_BASE_URL):
+    """
+    Build the SQL example index from a snapshot directory and save it
+
+    Args:
+        source_dir (str): Directory containing the documentation HTML files
+        output_path (str): Where to write the index
+        base_url (str): URL the snapshot file names are relative to
+
+    Returns:
+        ExampleIndex: The built index
+    """
+    index = ExampleIndex.build(iter_snapshot_pages(source_dir), base_url=base_url)
+    index.save(output_path)
+    logger.info(f"Built example index with {len(index)} examples")
+    return index
+
+def get_example_index(path=EXAMPLE_INDEX_PATH):
+    """
+    Get the prebuilt example index, loading it on first use or after a rebuild
+
+    Args:
+        path (str): Index file path
+
+    Returns:
+        ExampleIndex or None: The index or None if it has not been built
+    """
+    global _EXAMPLE_INDEX, _EXAMPLE_INDEX_MTIME
+
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    if _EXAMPLE_INDEX is not None and mtime == _EXAMPLE_INDEX_MTIME:
+        return _EXAMPLE_INDEX
+
+    with _EXAMPLE_INDEX_LOCK:
+        if _EXAMPLE_INDEX is None or mtime != _EXAMPLE_INDEX_MTIME:
+            try:
+                _EXAMPLE_INDEX = ExampleIndex.load(path)
+                _EXAMPLE_INDEX_MTIME = mtime
+                logger.info(f"Loaded example index with {len(_EXAMPLE_INDEX)} examples")
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Error loading example index {path}: {str(e)}")
+                return _EXAMPLE_INDEX
+
+    return _EXAMPLE_INDEX
@@ -0,0 +1,235 @@
+import os
+import time
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    DOC_HTTP_RATE, DOC_HTTP_BURST, DOC_HTTP_POOL_SIZE, DOC_HTTP_TIMEOUT,
+    DOC_HTTP_FAILURE_THRESHOLD, DOC_HTTP_RESET_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'PostgreSQL-Agent/1.0 (Documentation Helper)'
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter
+
+    Up to `capacity` requests go out immediately; beyond that callers
+    reserve the next free slot and wait only until it arrives, so a burst
+    is spread out at `rate` per second rather than queued behind a lock.
+    """
+
+    def __init__(self, rate, capacity):
+        if not rate > 0:
+            raise ValueError(f"Token bucket rate must be positive, got {rate!r} (DOC_HTTP_RATE)")
+        if not capacity >= 1:
+            raise ValueError(f"Token bucket capacity must be at least 1, got {capacity!r} (DOC_HTTP_BURST)")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.acquired = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self):
+        """
+        Take one token, sleeping only if the bucket is empty
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            # Going negative reserves a future slot for this caller
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+            self.acquired += 1
+            if wait:
+                self.throttled += 1
+                self.wait_seconds += wait
+
+        if wait:
+            time.sleep(wait)
+
+        return wait
+
+class CircuitOpenError(requests.RequestException):
+    """
+    Raised instead of sending a request while the circuit is open
+    """
+
+class CircuitBreaker:
+    """
+    Fail fast while an upstream service is unhealthy
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are rejected immediately. Once `reset_timeout` has passed a single
+    trial call is let through; its outcome closes or reopens the circuit.
+    A trial that never reports back is replaced by a new one after another
+    `reset_timeout`.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started = 0.0
+        self._lock = threading.Lock()
+
+        self.opened = 0
+        self.rejected = 0
+
+    def before_call(self):
+        """
+        Check whether a call may proceed
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+
+            now = time.monotonic()
+            if (self.state == self.OPEN and now - self._opened_at >= self.reset_timeout) or \
+                    (self.state == self.HALF_OPEN and now - self._trial_started >= self.reset_timeout):
+                # Let this caller through as the trial; others keep failing fast
+                self.state = self.HALF_OPEN
+                self._trial_started = now
+                return
+
+            self.rejected += 1
+
+        raise CircuitOpenError('Circuit open: postgresql.org is failing, not sending request')
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened += 1
+                    logger.warning(f"Opening circuit after {self._failures} consecutive failures")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self._failures,
+                'opened': self.opened,
+                'rejected': self.rejected
+            }
+
+class HttpClient:
+    """
+    Shared keep-alive HTTP client for postgresql.org
+
+    Requests reuse pooled connections, pass through a process-wide token
+    bucket and are guarded by a circuit breaker. The session is recreated
+    after a fork, since pooled sockets must not be shared between worker
+    processes.
+    """
+
+    def __init__(self, rate, burst, pool_size, timeout, failure_threshold, reset_timeout):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.limiter = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.headers['User-Agent'] = USER_AGENT
+                    self._session = session
+                    self._pid = os.getpid()
+
+        return self._session
+
+    def get(self, url, **kwargs):
+        """
+        Send a rate-limited GET request
+
+        Args:
+            url (str): Request URL
+            **kwargs: Passed to requests; timeout defaults to DOC_HTTP_TIMEOUT
+
+        Returns:
+            Response: The HTTP response
+
+        Raises:
+            CircuitOpenError: If postgresql.org has been failing and the circuit is open
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        self.breaker.before_call()
+
+        # Report every outcome, including unexpected exceptions, so a trial call never leaves the circuit half open
+        healthy = False
+        try:
+            self.limiter.acquire()
+            response = self.session.get(url, **kwargs)
+
+            # Client errors such as 404 say nothing about upstream health
+            healthy = response.status_code < 500
+        finally:
+            if healthy:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+        return response
+
+    def stats(self):
+        """
+        Get client statistics
+
+        Returns:
+            dict: Request and throttling counters, pool settings and circuit state
+        """
+        return {
+            'requests': self.limiter.acquired,
+            'throttled': self.limiter.throttled,
+            'throttle_wait_seconds': round(self.limiter.wait_seconds, 3),
+            'rate': self.limiter.rate,
+            'burst': self.limiter.capacity,
+            'pool_size': self.pool_size,
+            'circuit': self.breaker.stats()
+        }
+
+# Process-wide client used for every request to postgresql.org
+http_client = HttpClient(
+    DOC_HTTP_RATE, DOC_HTTP_BURST, DOC_HTTP_POOL_SIZE, DOC_HTTP_TIMEOUT,
+    DOC_HTTP_FAILURE_THRESHOLD, DOC_HTTP_RESET_TIMEOUT
+)
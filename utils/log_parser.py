@@ -0,0 +1,406 @@
+import re
+import csv
+import json
+import hashlib
+from datetime import datetime, timezone
+from functools import lru_cache
+
+LOG_FORMATS = ('stderr', 'csvlog', 'jsonlog')
+
+# PostgreSQL's default log_line_prefix since version 10
+DEFAULT_LOG_LINE_PREFIX = '%m [%p] '
+
+# Severities that start a log entry; DETAIL, HINT, STATEMENT etc. belong to the entry before them
+ENTRY_SEVERITIES = frozenset((
+    'DEBUG', 'DEBUG1', 'DEBUG2', 'DEBUG3', 'DEBUG4', 'DEBUG5',
+    'INFO', 'NOTICE', 'WARNING', 'LOG', 'ERROR', 'FATAL', 'PANIC'
+))
+ERROR_SEVERITIES = frozenset(('ERROR', 'FATAL', 'PANIC'))
+
+TIMESTAMP_PATTERN = r'\d{4}-\d\d-\d\d \d\d:\d\d:\d\d(?:\.\d+)?(?: [A-Za-z0-9+:-]+)?'
+
+# log_line_prefix escapes -> (field name or None, pattern)
+PREFIX_ESCAPES = {
+    'a': ('application', r'.*?'),
+    'u': ('user', r'.*?'),
+    'd': ('database', r'.*?'),
+    'r': (None, r'\S*'),
+    'h': (None, r'\S*'),
+    'b': (None, r'.*?'),
+    'p': (None, r'\d+'),
+    'P': (None, r'\d*'),
+    't': ('timestamp', TIMESTAMP_PATTERN),
+    'm': ('timestamp', TIMESTAMP_PATTERN),
+    'n': ('timestamp', r'\d+(?:\.\d+)?'),
+    'i': (None, r'.*?'),
+    'e': ('sqlstate', r'[0-9A-Z]{5}'),
+    'c': (None, r'[0-9a-f]+\.[0-9a-f]+'),
+    'l': (None, r'\d+'),
+    's': (None, TIMESTAMP_PATTERN),
+    'v': (None, r'\S*'),
+    'x': (None, r'\d*'),
+    'Q': (None, r'-?\d*'),
+}
+
+PREFIX_ESCAPE_RE = re.compile(r'%(-?\d*)(.)')
+
+# csvlog records start with the log time; a continuation line of a quoted multi-line field almost never does
+CSVLOG_RECORD_RE = re.compile(rb'\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.\d+ [^,]*,')
+
+# csvlog columns (stable since PostgreSQL 9.0; later versions only append columns)
+CSVLOG_FIELDS = {
+    'timestamp': 0,
+    'user': 1,
+    'database': 2,
+    'severity': 11,
+    'sqlstate': 12,
+    'message': 13,
+}
+
+TIME_BUCKETS = {
+    'minute': 16,
+    'hour': 13,
+    'day': 10,
+}
+
+@lru_cache(maxsize=32)
+def compile_log_line_prefix(log_line_prefix):
+    """
+    Build the regular expression of stderr log lines for a log_line_prefix
+
+    The expression matches the prefix, the severity and the message; the
+    escapes the analyzer aggregates on are captured as named groups.
+
+    Args:
+        log_line_prefix (str): log_line_prefix setting of the server
+
+    Returns:
+        re.Pattern: Expression with the groups severity and message, plus
+            timestamp, user, database, application and sqlstate where the prefix has them
+    """
+    parts = []
+    named = set()
+    optional = False
+    position = 0
+
+    for match in PREFIX_ESCAPE_RE.finditer(log_line_prefix):
+        parts.append(re.escape(log_line_prefix[position:match.start()]))
+        position = match.end()
+        padding, escape = match.groups()
+
+        if escape == '%':
+            parts.append('%')
+            continue
+        if escape == 'q':
+            # Everything after %q is omitted for processes without a session
+            parts.append('(?:')
+            optional = True
+            continue
+        if escape not in PREFIX_ESCAPES:
+            parts.append(r'.*?')
+            continue
+
+        name, pattern = PREFIX_ESCAPES[escape]
+        if escape == 'e':
+            # Processes without an error report log 00000
+            pattern = f'(?:{pattern})?'
+        if name and name not in named:
+            named.add(name)
+            pattern = f'(?P<{name}>{pattern})'
+        # Padded values are filled with spaces on either side
+        parts.append(rf' *{pattern} *' if padding else pattern)
+
+    parts.append(re.escape(log_line_prefix[position:]))
+    if optional:
+        parts.append(')?')
+
+    return re.compile('^' + ''.join(parts) + r'(?P<severity>[A-Z]+[0-9]?):  (?P<message>.*)', re.DOTALL)
+
+def detect_log_format(sample):
+    """
+    Guess the format of a server log from its first bytes
+
+    Args:
+        sample (bytes): Beginning of the log
+
+    Returns:
+        str: One of LOG_FORMATS
+    """
+    for line in sample.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(b'{'):
+            return 'jsonlog'
+        if CSVLOG_RECORD_RE.match(line):
+            return 'csvlog'
+        return 'stderr'
+
+    return 'stderr'
+
+def entry_start_matcher(log_format, log_line_prefix=DEFAULT_LOG_LINE_PREFIX):
+    """
+    Get a predicate telling whether a raw line starts a log entry
+
+    Used to move chunk boundaries to entry boundaries, so an entry is never
+    split between two chunks.
+
+    Args:
+        log_format (str): One of LOG_FORMATS
+        log_line_prefix (str): log_line_prefix of stderr logs
+
+    Returns:
+        callable: bytes -> bool
+    """
+    if log_format == 'jsonlog':
+        return lambda line: line.startswith(b'{')
+    if log_format == 'csvlog':
+        return lambda line: CSVLOG_RECORD_RE.match(line) is not None
+
+    regex = compile_log_line_prefix(log_line_prefix)
+
+    def is_entry_start(line):
+        match = regex.match(line.decode('utf-8', 'replace'))
+        return match is not None and match.group('severity') in ENTRY_SEVERITIES
+
+    return is_entry_start
+
+def parse_stderr_entries(lines, log_line_prefix=DEFAULT_LOG_LINE_PREFIX, continued_severities=ERROR_SEVERITIES):
+    """
+    Parse stderr log lines into entries
+
+    Tab-indented continuation lines of an error message are appended to
+    it. Secondary lines (DETAIL, HINT, STATEMENT, CONTEXT...) and their
+    continuations are skipped, so statement text never reaches the message.
+
+    Args:
+        lines (iterable): Decoded log lines
+        log_line_prefix (str): log_line_prefix of the server
+        continued_severities (frozenset): Severities whose continuation lines are kept,
+            e.g. LOG for multi-line statements and plans
+
+    Yields:
+        dict: Entry with severity, message, timestamp, user, database and sqlstate (None when absent)
+    """
+    regex = compile_log_line_prefix(log_line_prefix)
+    entry = None
+    continuation = []
+    continuing = False
+
+    for line in lines:
+        match = regex.match(line)
+
+        if match is None:
+            if continuing:
+                continuation.append(line.rstrip('\r\n'))
+            continue
+        if match.group('severity') not in ENTRY_SEVERITIES:
+            continuing = False
+            continue
+
+        if entry is not None:
+            if continuation:
+                entry['message'] += '\n' + '\n'.join(continuation)
+                continuation = []
+            yield entry
+
+        fields = match.groupdict()
+        entry = {
+            'severity': fields['severity'],
+            'message': fields['message'].rstrip('\r\n'),
+            'timestamp': fields.get('timestamp'),
+            'user': fields.get('user') or None,
+            'database': fields.get('database') or None,
+            'sqlstate': fields.get('sqlstate') or None,
+        }
+        continuing = entry['severity'] in continued_severities
+
+    if entry is not None:
+        if continuation:
+            entry['message'] += '\n' + '\n'.join(continuation)
+        yield entry
+
+def parse_csvlog_entries(lines):
+    """
+    Parse csvlog lines into entries
+
+    Args:
+        lines (iterable): Decoded log lines; quoted fields may span several lines
+
+    Yields:
+        dict: Entry with severity, message, timestamp, user, database and sqlstate
+    """
+    message_column = CSVLOG_FIELDS['message']
+
+    for row in csv.reader(lines):
+        if len(row) <= message_column:
+            continue
+
+        yield {
+            name: (row[column] or None) if name != 'message' else row[column]
+            for name, column in CSVLOG_FIELDS.items()
+        }
+
+def parse_jsonlog_entries(lines):
+    """
+    Parse jsonlog lines into entries
+
+    Args:
+        lines (iterable): Decoded log lines, one JSON object each
+
+    Yields:
+        dict: Entry with severity, message, timestamp, user, database and sqlstate
+    """
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(record, dict):
+            continue
+
+        yield {
+            'severity': record.get('error_severity'),
+            'message': record.get('message') or '',
+            'timestamp': record.get('timestamp'),
+            'user': record.get('user'),
+            'database': record.get('dbname'),
+            'sqlstate': record.get('state_code'),
+        }
+
+def parse_log_entries(lines, log_format, log_line_prefix=DEFAULT_LOG_LINE_PREFIX, continued_severities=ERROR_SEVERITIES):
+    """
+    Parse decoded log lines of any supported format into entries
+
+    Args:
+        lines (iterable): Decoded log lines
+        log_format (str): One of LOG_FORMATS
+        log_line_prefix (str): log_line_prefix of stderr logs
+        continued_severities (frozenset): Severities whose multi-line stderr messages are kept whole
+
+    Yields:
+        dict: Entry with severity, message, timestamp, user, database and sqlstate
+    """
+    if log_format == 'csvlog':
+        return parse_csvlog_entries(lines)
+    if log_format == 'jsonlog':
+        return parse_jsonlog_entries(lines)
+    return parse_stderr_entries(lines, log_line_prefix, continued_severities)
+
+def time_bucket(timestamp, bucket='hour'):
+    """
+    Truncate a log timestamp to its time bucket
+
+    Args:
+        timestamp (str): Timestamp as logged (%t, %m or %n, csvlog or jsonlog)
+        bucket (str): One of TIME_BUCKETS
+
+    Returns:
+        str or None: e.g. "2024-05-01 13" for an hour bucket, None if the timestamp is missing
+    """
+    if not timestamp:
+        return None
+
+    if timestamp[0].isdigit() and timestamp.replace('.', '', 1).isdigit():
+        # %n: Unix epoch
+        timestamp = datetime.fromtimestamp(float(timestamp), timezone.utc).strftime('%Y-%m-%d %H:%M')
+
+    return timestamp[:TIME_BUCKETS[bucket]]
+
+# "duration: 12.345 ms  statement: ..." (log_min_duration_statement) and "duration: ... ms  plan: ..." (auto_explain)
+DURATION_RE = re.compile(
+    r'duration: (?P<duration>\d+(?:\.\d+)?) ms(?:\s+(?P<kind>statement|execute|plan|parse|bind)\b[^:]*:\s*(?P<body>.*))?',
+    re.DOTALL
+)
+
+# Text-format auto_explain output: the plan starts at the first node line
+PLAN_QUERY_TEXT_RE = re.compile(r'Query Text:\s*(?P<query>.*?)\n(?=[^\n]*\((?:cost|actual)[ =])', re.DOTALL)
+PLAN_QUERY_LINE_RE = re.compile(r'Query Text:\s*(?P<query>[^\n]*)')
+
+# Query normalization, in application order
+QUERY_COMMENT_RE = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+QUERY_LITERAL_RE = re.compile(
+    r"(?P<dollar>\$(?P<tag>[A-Za-z_]*)\$.*?\$(?P=tag)\$)"
+    r"|[EeBbXxNn]?'(?:[^']|'')*'"
+    r"|\$\d+"
+    r"|(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?(?![\w.])",
+    re.DOTALL
+)
+QUERY_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+QUERY_VALUES_RE = re.compile(r'\bvalues\s*\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+QUERY_WHITESPACE_RE = re.compile(r'\s+')
+
+def parse_duration_message(message):
+    """
+    Parse the message of a slow statement or auto_explain entry
+
+    Durations logged for the parse and bind phases and durations without
+    a statement (log_duration) are not statements of their own and give None.
+
+    Args:
+        message (str): Log message, including continuation lines
+
+    Returns:
+        dict or None: duration (ms), kind ('statement' or 'plan'), query and plan (None for statements)
+    """
+    match = DURATION_RE.match(message)
+    if match is None or match.group('kind') in (None, 'parse', 'bind'):
+        return None
+
+    duration = float(match.group('duration'))
+    body = match.group('body').strip()
+
+    if match.group('kind') != 'plan':
+        return {'duration': duration, 'kind': 'statement', 'query': body, 'plan': None}
+
+    query = None
+    if body.startswith('{'):
+        # auto_explain.log_format = json
+        try:
+            query = json.loads(body).get('Query Text')
+        except (ValueError, AttributeError):
+            pass
+    else:
+        query_match = PLAN_QUERY_TEXT_RE.search(body) or PLAN_QUERY_LINE_RE.search(body)
+        if query_match:
+            query = query_match.group('query')
+
+    return {'duration': duration, 'kind': 'plan', 'query': (query or '').strip(), 'plan': body}
+
+def strip_query_literals(query):
+    """
+    Remove the comments of a statement and replace its literals and parameters with ?
+
+    The first, and per execution distinct, half of normalize_query;
+    executions of the same statement give the same result from here on.
+    """
+    if '--' in query or '/*' in query:
+        query = QUERY_COMMENT_RE.sub(' ', query)
+    return QUERY_LITERAL_RE.sub('?', query)
+
+def normalize_query(query, literals_stripped=False):
+    """
+    Reduce a statement to its shape, so executions with different values group together
+
+    Comments are removed, literals and parameters become ?, lists of
+    values collapse to (...), whitespace is collapsed and the text is
+    lowercased.
+
+    Args:
+        query (str): SQL statement
+        literals_stripped (bool): Whether the statement already went through strip_query_literals
+
+    Returns:
+        str: Normalized statement
+    """
+    if not literals_stripped:
+        query = strip_query_literals(query)
+    query = QUERY_WHITESPACE_RE.sub(' ', query).strip().rstrip(';').strip().lower()
+    query = QUERY_LIST_RE.sub('(...)', query)
+    return QUERY_VALUES_RE.sub('values (...)', query)
+
+def query_fingerprint(normalized_query):
+    """
+    Get a short stable identifier of a normalized statement
+    """
+    return hashlib.blake2b(normalized_query.encode('utf-8'), digest_size=8).hexdigest()
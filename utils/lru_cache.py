@@ -0,0 +1,161 @@
+import sys
+import time
+import zlib
+import threading
+from collections import OrderedDict
+
+class BoundedCache:
+    """
+    Thread-safe in-process LRU cache with a byte budget and per-entry TTL
+
+    When the stored size exceeds max_bytes the least recently used entries
+    are evicted, so the memory held by the cache stays below a known
+    ceiling. String values may optionally be stored zlib-compressed.
+    """
+
+    def __init__(self, max_bytes, ttl=None, compress=False, compress_min_size=1024):
+        """
+        Args:
+            max_bytes (int): Upper bound on the total size of stored values
+            ttl (float, optional): Default lifetime of an entry in seconds, None to keep until evicted
+            compress (bool): Compress string values with zlib
+            compress_min_size (int): Strings shorter than this are stored as-is
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.compress = compress
+        self.compress_min_size = compress_min_size
+
+        # key -> (stored value, size, expires_at, compressed)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        # Caller must hold the lock
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def get(self, key, default=None):
+        """
+        Get a value and mark it as recently used
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+
+        Returns:
+            The cached value or default if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self._misses += 1
+                return default
+
+            stored, size, expires_at, compressed = entry
+
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+
+        # Decompress outside the lock so readers do not serialise on it
+        if compressed:
+            return zlib.decompress(stored).decode('utf-8')
+
+        return stored
+
+    def set(self, key, value, ttl=None, size=None):
+        """
+        Store a value, evicting least recently used entries if over budget
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl (float, optional): Lifetime in seconds, defaults to the cache TTL
+            size (int, optional): Size of the value in bytes, estimated if not given
+
+        Returns:
+            bool: False if the value is larger than the whole budget and was not stored
+        """
+        compressed = False
+        stored = value
+
+        if self.compress and isinstance(value, str) and len(value) >= self.compress_min_size:
+            stored = zlib.compress(value.encode('utf-8'))
+            compressed = True
+
+        if size is None or compressed:
+            size = sys.getsizeof(stored)
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+
+        with self._lock:
+            self._remove(key)
+
+            if size > self.max_bytes:
+                return False
+
+            self._entries[key] = (stored, size, expires_at, compressed)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size, _, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+        return True
+
+    def pop(self, key):
+        """
+        Remove an entry
+
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        """
+        Remove all entries
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Get cache statistics
+
+        Returns:
+            dict: Entry count, stored bytes, budget, hit/miss/eviction counters and hit ratio
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else 0.0
+            }
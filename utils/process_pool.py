@@ -0,0 +1,16 @@
+import multiprocessing
+
+def pool_context():
+    """
+    Get the multiprocessing context for worker pools
+
+    Workers are started with forkserver, or spawn where it is unavailable,
+    never by forking the caller: a forked child would inherit the caller's
+    threads' locks (HTTP pools, loggers, a web server's worker threads)
+    in whatever state they were in.
+
+    Returns:
+        BaseContext: Context to pass as mp_context
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
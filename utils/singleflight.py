@@ -0,0 +1,76 @@
+import threading
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one execution
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for it and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) unless a call for key is already in flight
+
+        Args:
+            key: Identity of the call
+            func (callable): Function producing the result
+
+        Returns:
+            The result of the single in-flight execution
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executions += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self):
+        """
+        Get coalescing statistics
+
+        Returns:
+            dict: Executions, coalesced waiters and calls currently in flight
+        """
+        with self._lock:
+            return {
+                'executions': self._executions,
+                'coalesced': self._coalesced,
+                'in_flight': len(self._calls)
+            }
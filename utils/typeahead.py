@@ -0,0 +1,382 @@
+import os
+import re
+import json
+import bisect
+import logging
+import threading
+
+from config import TYPEAHEAD_INDEX_PATH, POSTGRESQL_DOC_BASE_URL
+from utils.doc_index import iter_snapshot_pages, TITLE_PREFIX_RE
+from utils.html_parser import extract_title
+
+logger = logging.getLogger(__name__)
+
+TYPEAHEAD_FORMAT_VERSION = 1
+
+# Suggestion kinds, in the order they are preferred when equally good
+KINDS = ('command', 'function', 'setting', 'page')
+KIND_ORDER = {kind: position for position, kind in enumerate(KINDS)}
+
+# SQL commands of the reference manual and their pages, available before any snapshot has been indexed.
+# Page names are listed, not derived: many do not follow the command name (SET ROLE is sql-set-role.html,
+# CREATE TEXT SEARCH CONFIGURATION is sql-createtsconfig.html)
+SQL_COMMANDS = (
+    ('ABORT', 'sql-abort.html'), ('ALTER AGGREGATE', 'sql-alteraggregate.html'),
+    ('ALTER COLLATION', 'sql-altercollation.html'), ('ALTER CONVERSION', 'sql-alterconversion.html'),
+    ('ALTER DATABASE', 'sql-alterdatabase.html'), ('ALTER DEFAULT PRIVILEGES', 'sql-alterdefaultprivileges.html'),
+    ('ALTER DOMAIN', 'sql-alterdomain.html'), ('ALTER EVENT TRIGGER', 'sql-altereventtrigger.html'),
+    ('ALTER EXTENSION', 'sql-alterextension.html'),
+    ('ALTER FOREIGN DATA WRAPPER', 'sql-alterforeigndatawrapper.html'),
+    ('ALTER FOREIGN TABLE', 'sql-alterforeigntable.html'), ('ALTER FUNCTION', 'sql-alterfunction.html'),
+    ('ALTER GROUP', 'sql-altergroup.html'), ('ALTER INDEX', 'sql-alterindex.html'),
+    ('ALTER LANGUAGE', 'sql-alterlanguage.html'), ('ALTER LARGE OBJECT', 'sql-alterlargeobject.html'),
+    ('ALTER MATERIALIZED VIEW', 'sql-altermaterializedview.html'), ('ALTER OPERATOR', 'sql-alteroperator.html'),
+    ('ALTER POLICY', 'sql-alterpolicy.html'), ('ALTER PROCEDURE', 'sql-alterprocedure.html'),
+    ('ALTER PUBLICATION', 'sql-alterpublication.html'), ('ALTER ROLE', 'sql-alterrole.html'),
+    ('ALTER ROUTINE', 'sql-alterroutine.html'), ('ALTER RULE', 'sql-alterrule.html'),
+    ('ALTER SCHEMA', 'sql-alterschema.html'), ('ALTER SEQUENCE', 'sql-altersequence.html'),
+    ('ALTER SERVER', 'sql-alterserver.html'), ('ALTER STATISTICS', 'sql-alterstatistics.html'),
+    ('ALTER SUBSCRIPTION', 'sql-altersubscription.html'), ('ALTER SYSTEM', 'sql-altersystem.html'),
+    ('ALTER TABLE', 'sql-altertable.html'), ('ALTER TABLESPACE', 'sql-altertablespace.html'),
+    ('ALTER TEXT SEARCH CONFIGURATION', 'sql-altertsconfig.html'), ('ALTER TRIGGER', 'sql-altertrigger.html'),
+    ('ALTER TYPE', 'sql-altertype.html'), ('ALTER USER', 'sql-alteruser.html'),
+    ('ALTER USER MAPPING', 'sql-alterusermapping.html'), ('ALTER VIEW', 'sql-alterview.html'),
+    ('ANALYZE', 'sql-analyze.html'), ('BEGIN', 'sql-begin.html'), ('CALL', 'sql-call.html'),
+    ('CHECKPOINT', 'sql-checkpoint.html'), ('CLOSE', 'sql-close.html'), ('CLUSTER', 'sql-cluster.html'),
+    ('COMMENT', 'sql-comment.html'), ('COMMIT', 'sql-commit.html'), ('COMMIT PREPARED', 'sql-commit-prepared.html'),
+    ('COPY', 'sql-copy.html'), ('CREATE ACCESS METHOD', 'sql-create-access-method.html'),
+    ('CREATE AGGREGATE', 'sql-createaggregate.html'), ('CREATE CAST', 'sql-createcast.html'),
+    ('CREATE COLLATION', 'sql-createcollation.html'), ('CREATE CONVERSION', 'sql-createconversion.html'),
+    ('CREATE DATABASE', 'sql-createdatabase.html'), ('CREATE DOMAIN', 'sql-createdomain.html'),
+    ('CREATE EVENT TRIGGER', 'sql-createeventtrigger.html'), ('CREATE EXTENSION', 'sql-createextension.html'),
+    ('CREATE FOREIGN DATA WRAPPER', 'sql-createforeigndatawrapper.html'),
+    ('CREATE FOREIGN TABLE', 'sql-createforeigntable.html'), ('CREATE FUNCTION', 'sql-createfunction.html'),
+    ('CREATE GROUP', 'sql-creategroup.html'), ('CREATE INDEX', 'sql-createindex.html'),
+    ('CREATE LANGUAGE', 'sql-createlanguage.html'), ('CREATE MATERIALIZED VIEW', 'sql-creatematerializedview.html'),
+    ('CREATE OPERATOR', 'sql-createoperator.html'), ('CREATE POLICY', 'sql-createpolicy.html'),
+    ('CREATE PROCEDURE', 'sql-createprocedure.html'), ('CREATE PUBLICATION', 'sql-createpublication.html'),
+    ('CREATE ROLE', 'sql-createrole.html'), ('CREATE RULE', 'sql-createrule.html'),
+    ('CREATE SCHEMA', 'sql-createschema.html'), ('CREATE SEQUENCE', 'sql-createsequence.html'),
+    ('CREATE SERVER', 'sql-createserver.html'), ('CREATE STATISTICS', 'sql-createstatistics.html'),
+    ('CREATE SUBSCRIPTION', 'sql-createsubscription.html'), ('CREATE TABLE', 'sql-createtable.html'),
+    ('CREATE TABLE AS', 'sql-createtableas.html'), ('CREATE TABLESPACE', 'sql-createtablespace.html'),
+    ('CREATE TEXT SEARCH CONFIGURATION', 'sql-createtsconfig.html'),
+    ('CREATE TRANSFORM', 'sql-createtransform.html'), ('CREATE TRIGGER', 'sql-createtrigger.html'),
+    ('CREATE TYPE', 'sql-createtype.html'), ('CREATE USER', 'sql-createuser.html'),
+    ('CREATE USER MAPPING', 'sql-createusermapping.html'), ('CREATE VIEW', 'sql-createview.html'),
+    ('DEALLOCATE', 'sql-deallocate.html'), ('DECLARE', 'sql-declare.html'), ('DELETE', 'sql-delete.html'),
+    ('DISCARD', 'sql-discard.html'), ('DO', 'sql-do.html'), ('DROP AGGREGATE', 'sql-dropaggregate.html'),
+    ('DROP DATABASE', 'sql-dropdatabase.html'), ('DROP DOMAIN', 'sql-dropdomain.html'),
+    ('DROP EXTENSION', 'sql-dropextension.html'), ('DROP FUNCTION', 'sql-dropfunction.html'),
+    ('DROP INDEX', 'sql-dropindex.html'), ('DROP MATERIALIZED VIEW', 'sql-dropmaterializedview.html'),
+    ('DROP OWNED', 'sql-drop-owned.html'), ('DROP POLICY', 'sql-droppolicy.html'),
+    ('DROP PROCEDURE', 'sql-dropprocedure.html'), ('DROP ROLE', 'sql-droprole.html'),
+    ('DROP SCHEMA', 'sql-dropschema.html'), ('DROP SEQUENCE', 'sql-dropsequence.html'),
+    ('DROP TABLE', 'sql-droptable.html'), ('DROP TABLESPACE', 'sql-droptablespace.html'),
+    ('DROP TRIGGER', 'sql-droptrigger.html'), ('DROP TYPE', 'sql-droptype.html'),
+    ('DROP USER', 'sql-dropuser.html'), ('DROP VIEW', 'sql-dropview.html'), ('END', 'sql-end.html'),
+    ('EXECUTE', 'sql-execute.html'), ('EXPLAIN', 'sql-explain.html'), ('FETCH', 'sql-fetch.html'),
+    ('GRANT', 'sql-grant.html'), ('IMPORT FOREIGN SCHEMA', 'sql-importforeignschema.html'),
+    ('INSERT', 'sql-insert.html'), ('LISTEN', 'sql-listen.html'), ('LOAD', 'sql-load.html'),
+    ('LOCK', 'sql-lock.html'), ('MERGE', 'sql-merge.html'), ('MOVE', 'sql-move.html'),
+    ('NOTIFY', 'sql-notify.html'), ('PREPARE', 'sql-prepare.html'),
+    ('PREPARE TRANSACTION', 'sql-prepare-transaction.html'), ('REASSIGN OWNED', 'sql-reassign-owned.html'),
+    ('REFRESH MATERIALIZED VIEW', 'sql-refreshmaterializedview.html'), ('REINDEX', 'sql-reindex.html'),
+    ('RELEASE SAVEPOINT', 'sql-release-savepoint.html'), ('RESET', 'sql-reset.html'), ('REVOKE', 'sql-revoke.html'),
+    ('ROLLBACK', 'sql-rollback.html'), ('ROLLBACK PREPARED', 'sql-rollback-prepared.html'),
+    ('ROLLBACK TO SAVEPOINT', 'sql-rollback-to.html'), ('SAVEPOINT', 'sql-savepoint.html'),
+    ('SECURITY LABEL', 'sql-security-label.html'), ('SELECT', 'sql-select.html'),
+    ('SELECT INTO', 'sql-selectinto.html'), ('SET', 'sql-set.html'),
+    ('SET CONSTRAINTS', 'sql-set-constraints.html'), ('SET ROLE', 'sql-set-role.html'),
+    ('SET SESSION AUTHORIZATION', 'sql-set-session-authorization.html'),
+    ('SET TRANSACTION', 'sql-set-transaction.html'), ('SHOW', 'sql-show.html'),
+    ('START TRANSACTION', 'sql-start-transaction.html'), ('TRUNCATE', 'sql-truncate.html'),
+    ('UNLISTEN', 'sql-unlisten.html'), ('UPDATE', 'sql-update.html'), ('VACUUM', 'sql-vacuum.html'),
+    ('VALUES', 'sql-values.html')
+)
+
+FUNCTION_RE = re.compile(r'<code class="function">([A-Za-z_][A-Za-z0-9_.]*)')
+SETTING_RE = re.compile(r'<code class="varname">([a-z_][a-z0-9_.]*)</code>')
+
+# Candidates examined per prefix lookup; keeps one-letter prefixes as cheap as longer ones
+PREFIX_SCAN_LIMIT = 200
+
+# Minimum share of trigrams a fuzzy match must have in common with the query
+FUZZY_MIN_SIMILARITY = 0.35
+
+def normalize(text):
+    """
+    Normalise text for matching: lowercase, single spaces, no surrounding space
+    """
+    return ' '.join(text.lower().split())
+
+def trigrams(text):
+    """
+    Get the character trigrams of a term, padded like pg_trgm
+
+    Args:
+        text (str): Normalised term
+
+    Returns:
+        set: Trigrams of the term
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TypeaheadIndex:
+    """
+    In-memory suggestion index over page titles, SQL commands, functions and settings
+
+    Keys are kept in a sorted array, so a prefix lookup is a binary search
+    followed by a short forward scan. Every word of a multi-word label is a
+    key too, so "index" suggests "CREATE INDEX". When no label matches the
+    prefix, labels sharing enough trigrams with the query are suggested.
+    """
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries (list): [label, kind, url] triples
+        """
+        self.entries = entries
+
+        keys = []
+        for entry_id, (label, _, _) in enumerate(entries):
+            words = normalize(label).split(' ')
+            for position in range(len(words)):
+                keys.append((' '.join(words[position:]), position, entry_id))
+        keys.sort()
+
+        self.keys = [key for key, _, _ in keys]
+        self.key_entries = [(position, entry_id) for _, position, entry_id in keys]
+
+        self.trigram_postings = {}
+        self.trigram_counts = []
+        for entry_id, (label, _, _) in enumerate(entries):
+            grams = trigrams(normalize(label))
+            self.trigram_counts.append(len(grams))
+            for gram in grams:
+                self.trigram_postings.setdefault(gram, []).append(entry_id)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @classmethod
+    def build(cls, pages, base_url=POSTGRESQL_DOC_BASE_URL):
+        """
+        Build the index from documentation pages
+
+        Args:
+            pages (iterable): (file name, HTML content) pairs
+            base_url (str): URL the file names are relative to
+
+        Returns:
+            TypeaheadIndex: The built index
+        """
+        entries = {}
+
+        def add(label, kind, url):
+            # The first occurrence wins, so names point at their defining page when seen there first
+            entries.setdefault((label, kind), url)
+
+        for file_name, html_content in pages:
+            url = f"{base_url}{file_name}"
+            title = TITLE_PREFIX_RE.sub('', extract_title(html_content) or '')
+
+            if file_name.startswith('sql-') and title:
+                add(title, 'command', url)
+            elif title:
+                add(title, 'page', url)
+
+            if file_name.startswith('functions'):
+                for name in FUNCTION_RE.findall(html_content):
+                    add(name, 'function', url)
+
+            if file_name.startswith('runtime-config'):
+                for name in SETTING_RE.findall(html_content):
+                    add(name, 'setting', url)
+
+        for command, page in SQL_COMMANDS:
+            add(command, 'command', f"{base_url}{page}")
+
+        return cls([[label, kind, url] for (label, kind), url in sorted(entries.items())])
+
+    @classmethod
+    def default(cls, base_url=POSTGRESQL_DOC_BASE_URL):
+        """
+        Build an index of the SQL commands only, used until a snapshot has been indexed
+        """
+        return cls.build([], base_url=base_url)
+
+    def _prefix_matches(self, prefix):
+        """
+        Get (rank, entry id) pairs of labels with a word starting with the prefix
+        """
+        start = bisect.bisect_left(self.keys, prefix)
+        matches = {}
+
+        for index in range(start, min(start + PREFIX_SCAN_LIMIT, len(self.keys))):
+            if not self.keys[index].startswith(prefix):
+                break
+
+            position, entry_id = self.key_entries[index]
+            label, kind, _ = self.entries[entry_id]
+
+            # Whole-label prefixes beat word prefixes; then preferred kinds and shorter labels
+            rank = (position > 0, KIND_ORDER[kind], len(label))
+            if entry_id not in matches or rank < matches[entry_id]:
+                matches[entry_id] = rank
+
+        return sorted((rank, entry_id) for entry_id, rank in matches.items())
+
+    def _fuzzy_matches(self, query, exclude):
+        """
+        Get (rank, entry id) pairs of labels similar to the query
+        """
+        query_grams = trigrams(query)
+        shared = {}
+        for gram in query_grams:
+            for entry_id in self.trigram_postings.get(gram, ()):
+                shared[entry_id] = shared.get(entry_id, 0) + 1
+
+        matches = []
+        for entry_id, count in shared.items():
+            if entry_id in exclude:
+                continue
+
+            similarity = count / (len(query_grams) + self.trigram_counts[entry_id] - count)
+
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                label, kind, _ = self.entries[entry_id]
+                matches.append(((-similarity, KIND_ORDER[kind], len(label)), entry_id))
+
+        matches.sort()
+        return matches
+
+    def suggest(self, query, limit=10, kinds=None):
+        """
+        Suggest labels for a partially typed query
+
+        Args:
+            query (str): Typed text
+            limit (int): Maximum number of suggestions
+            kinds (iterable, optional): Only suggest these kinds
+
+        Returns:
+            list: A list of dict containing label, kind, url and whether the match is fuzzy
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        kinds = set(kinds) if kinds else None
+        results = []
+        seen = set()
+
+        def collect(matches, fuzzy):
+            for _, entry_id in matches:
+                if len(results) >= limit:
+                    return
+                label, kind, url = self.entries[entry_id]
+                if kinds and kind not in kinds:
+                    continue
+                seen.add(entry_id)
+                results.append({'label': label, 'kind': kind, 'url': url, 'fuzzy': fuzzy})
+
+        collect(self._prefix_matches(prefix), False)
+
+        # Typo fallback, once the query is long enough to carry a meaningful trigram signal
+        if not results and len(prefix) >= 3:
+            collect(self._fuzzy_matches(prefix, seen), True)
+
+        return results
+
+    def save(self, path):
+        """
+        Write the entries to a JSON file; lookup arrays are rebuilt on load
+
+        Args:
+            path (str): Destination file path
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': TYPEAHEAD_FORMAT_VERSION, 'entries': self.entries}, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load the index from a JSON file
+
+        Args:
+            path (str): Index file path
+
+        Returns:
+            TypeaheadIndex: The loaded index
+        """
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        if data.get('format') != TYPEAHEAD_FORMAT_VERSION:
+            raise ValueError(f"Unsupported typeahead index format: {data.get('format')}")
+
+        return cls(data['entries'])
+
+# Loaded index, shared by all request threads
+_TYPEAHEAD_INDEX = None
+_TYPEAHEAD_INDEX_MTIME = None
+_TYPEAHEAD_INDEX_LOCK = threading.Lock()
+
+def build_typeahead_index(source_dir, output_path=TYPEAHEAD_INDEX_PATH, base_url=POSTGRESQL_DOC_BASE_URL):
+    """
+    Build the typeahead index from a snapshot directory and save it
+
+    Args:
+        source_dir (str): Directory containing the documentation HTML files
+        output_path (str): Where to write the index
+        base_url (str): URL the snapshot file names are relative to
+
+    Returns:
+        TypeaheadIndex: The built index
+    """
+    index = TypeaheadIndex.build(iter_snapshot_pages(source_dir), base_url=base_url)
+    index.save(output_path)
+    logger.info(f"Built typeahead index with {len(index)} entries")
+    return index
+
+def get_typeahead_index(path=TYPEAHEAD_INDEX_PATH):
+    """
+    Get the typeahead index, loading the prebuilt one on first use or after a rebuild
+
+    Falls back to an index of the SQL command names when none has been built.
+
+    Args:
+        path (str): Index file path
+
+    Returns:
+        TypeaheadIndex: The index
+    """
+    global _TYPEAHEAD_INDEX, _TYPEAHEAD_INDEX_MTIME
+
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+
+    if _TYPEAHEAD_INDEX is not None and mtime == _TYPEAHEAD_INDEX_MTIME:
+        return _TYPEAHEAD_INDEX
+
+    with _TYPEAHEAD_INDEX_LOCK:
+        if _TYPEAHEAD_INDEX is None or mtime != _TYPEAHEAD_INDEX_MTIME:
+            try:
+                _TYPEAHEAD_INDEX = TypeaheadIndex.load(path) if mtime is not None else TypeaheadIndex.default()
+                _TYPEAHEAD_INDEX_MTIME = mtime
+                logger.info(f"Loaded typeahead index with {len(_TYPEAHEAD_INDEX)} entries")
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Error loading typeahead index {path}: {str(e)}")
+                if _TYPEAHEAD_INDEX is None:
+                    _TYPEAHEAD_INDEX = TypeaheadIndex.default()
+
+    return _TYPEAHEAD_INDEX